@@ -0,0 +1,74 @@
+#include <Arduino.h>
+
+// Binary counterpart of serialtest.ino: sends (millis since start, data) as a
+// COBS-encoded frame with a CRC16 so the host can read it with
+// SerialReader(..., decoder=FrameDecoder('<Ii', ['time', 'data'])).
+
+struct Sample {
+    uint32_t time;  // ms since start
+    int32_t data;
+} __attribute__((packed));
+
+int32_t data = 0;
+unsigned long startTime;
+
+// CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF); matches Framing.crc16()
+uint16_t crc16(const uint8_t *buf, size_t len) {
+    uint16_t crc = 0xFFFF;
+    for (size_t i = 0; i < len; i++) {
+        crc ^= (uint16_t)buf[i] << 8;
+        for (uint8_t b = 0; b < 8; b++) {
+            crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+        }
+    }
+    return crc;
+}
+
+// Encode len bytes from in into out (needs len + len / 254 + 1 bytes); returns encoded length
+size_t cobsEncode(const uint8_t *in, size_t len, uint8_t *out) {
+    size_t read = 0, write = 1, codeIndex = 0;
+    uint8_t code = 1;
+    while (read < len) {
+        if (in[read] == 0) {
+            out[codeIndex] = code;
+            code = 1;
+            codeIndex = write++;
+            read++;
+        } else {
+            out[write++] = in[read++];
+            code++;
+            if (code == 0xFF) {
+                out[codeIndex] = code;
+                code = 1;
+                codeIndex = write++;
+            }
+        }
+    }
+    out[codeIndex] = code;
+    return write;
+}
+
+void sendFrame(const uint8_t *payload, size_t len) {
+    uint8_t body[sizeof(Sample) + 2];
+    uint8_t frame[sizeof(body) + sizeof(body) / 254 + 2];
+    memcpy(body, payload, len);
+    uint16_t crc = crc16(payload, len);
+    body[len] = crc & 0xFF;          // little-endian CRC
+    body[len + 1] = crc >> 8;
+    size_t n = cobsEncode(body, len + 2, frame);
+    frame[n++] = 0;                  // frame delimiter
+    Serial.write(frame, n);
+}
+
+void setup(){
+    Serial.begin(115200);
+    startTime = millis();
+}
+
+void loop(){
+    Sample s;
+    s.time = millis() - startTime;
+    s.data = data++;
+    sendFrame((const uint8_t *)&s, sizeof(s));
+    delay(10);
+}
@@ -0,0 +1,58 @@
+#include <Arduino.h>
+
+// Command responder for SerialWriter: every command arrives as "#<seq> <command>"
+// and is answered with the same "#<seq> " prefix, so the host can pipeline
+// commands and match the replies, e.g.
+//   writer = SerialWriter(reader, max_in_flight=8)
+//   writer.request("led on")   # -> "OK led on"
+// Lines printed without a tag still reach the reader's normal consumers.
+
+const int ledPin = LED_BUILTIN;
+char line[64];
+size_t len = 0;
+
+void handle(const char *tag, const char *command) {
+    Serial.print(tag);
+    if (strcmp(command, "led on") == 0) {
+        digitalWrite(ledPin, HIGH);
+        Serial.println("OK led on");
+    } else if (strcmp(command, "led off") == 0) {
+        digitalWrite(ledPin, LOW);
+        Serial.println("OK led off");
+    } else if (strcmp(command, "millis") == 0) {
+        Serial.println(millis());
+    } else {
+        Serial.print("ERR unknown command: ");
+        Serial.println(command);
+    }
+}
+
+void setup() {
+    pinMode(ledPin, OUTPUT);
+    Serial.begin(9600);
+    Serial.println("READY");  // e.g. SerialReader(..., ready='token', ready_token='READY')
+}
+
+void loop() {
+    while (Serial.available()) {
+        char c = Serial.read();
+        if (c == '\r') continue;
+        if (c != '\n') {
+            if (len < sizeof(line) - 1) line[len++] = c;
+            continue;
+        }
+        line[len] = '\0';
+        len = 0;
+        // Split "#<seq> <command>" into the tag (kept with its trailing space) and the command
+        char *space = strchr(line, ' ');
+        if (line[0] == '#' && space != NULL) {
+            char tag[16];
+            size_t tagLen = min((size_t)(space - line + 1), sizeof(tag) - 1);
+            memcpy(tag, line, tagLen);
+            tag[tagLen] = '\0';
+            handle(tag, space + 1);
+        } else {
+            handle("", line);
+        }
+    }
+}
@@ -14,6 +14,9 @@ setup(
     install_requires=[  # List your dependencies here
         'pyserial',  # Example dependency, add more as needed
     ],
+    extras_require={
+        'numpy': ['numpy'],  # columnar NumPy arrays in LineParser (falls back to array.array)
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: MIT License',
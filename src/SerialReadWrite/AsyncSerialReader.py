@@ -0,0 +1,176 @@
+import asyncio
+import os
+import serial
+from typing import Optional
+try:
+    from .SerialReader import split_lines
+except ImportError:
+    from SerialReader import split_lines
+
+class AsyncSerialReader:
+
+
+    def __init__(self, port: str, baud_rate: int = 9600, timeout: int = 1, queue_size: int = 4096, decode: bool = True):
+        """
+        Initialize an asyncio-driven serial reader for the specified port and baud rate.
+
+        Reads are driven by the event loop watching the port's file descriptor (loop.add_reader on POSIX),
+        so one process can serve many ports without a thread per port.
+
+        :param port: The serial port to connect to (e.g., '/dev/tty.*' in UNIX-based devices or 'COM3' in Windows based devices).
+        :param baud_rate: The baud rate for serial communication (default: 9600).
+        :param timeout: Read timeout in seconds, only used by the non-POSIX executor fallback (default: 1).
+        :param queue_size: Number of lines buffered before the oldest is dropped (default: 4096).
+        :param decode: Yield stripped UTF-8 strings; if False, yield raw bytes (default: True).
+        """
+        self.port = port
+        self.baud_rate = baud_rate
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self.decode = decode
+        self.dropped = 0           # lines lost because the queue was full
+        self.serial_connection: Optional[serial.Serial] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._rx_buf = bytearray()
+        self._fd: Optional[int] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._error: Optional[Exception] = None
+
+    async def connect(self) -> None:
+        """Open the serial connection and start watching it for incoming data."""
+        try:
+            self.serial_connection = serial.Serial(self.port, self.baud_rate, timeout=0)
+        except serial.SerialException as e:
+            print(f"Error: Could not open serial port {self.port}: {e}")
+            raise
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._closed = False
+        self._error = None
+        try:
+            self._fd = self.serial_connection.fileno()
+            self._loop.add_reader(self._fd, self._on_readable)
+        except (AttributeError, NotImplementedError, ValueError):
+            # No selectable file descriptor (e.g. Windows): fall back to blocking reads in the default executor
+            self._fd = None
+            self.serial_connection.timeout = self.timeout
+            self._poll_task = self._loop.create_task(self._poll_in_executor())
+        print(f"\nSuccessfully connected to Arduino on port {self.port}")
+
+    def _on_readable(self) -> None:
+        try:
+            data = self.serial_connection.read(self.serial_connection.in_waiting or 1)
+        except (serial.SerialException, OSError) as e:
+            self._finish(e)
+            return
+        if data:
+            self._feed(data)
+
+    async def _poll_in_executor(self) -> None:
+        conn = self.serial_connection
+        while not self._closed:
+            try:
+                data = await self._loop.run_in_executor(None, lambda: conn.read(conn.in_waiting or 1))
+            except (serial.SerialException, OSError, TypeError) as e:
+                if not self._closed:
+                    self._finish(e)
+                return
+            if data:
+                self._feed(data)
+
+    def _feed(self, data: bytes) -> None:
+        self._rx_buf += data
+        for line in split_lines(self._rx_buf, self.decode):
+            if self._queue.qsize() >= self.queue_size:
+                self._queue.get_nowait()
+                self.dropped += 1
+            self._queue.put_nowait(line)
+
+    def _finish(self, error: Optional[Exception] = None) -> None:
+        # Stop watching the port and wake any consumer waiting in readline()
+        if self._fd is not None and self._loop is not None:
+            self._loop.remove_reader(self._fd)
+            self._fd = None
+        if error is not None and self._error is None:
+            self._error = error
+            print(f"Error: Lost serial port {self.port}: {error}")
+        if not self._closed:
+            self._closed = True
+            if self._queue is not None:
+                self._queue.put_nowait(None)
+
+    async def readline(self):
+        """
+        Wait for and return the next complete line.
+
+        :return: The line, or None once the connection has been closed and all buffered lines consumed.
+        """
+        if self._queue is None:
+            raise Exception(f"Port {self.port} is not connected; call `await connect()` first.")
+        line = await self._queue.get()
+        if line is None:
+            self._queue.put_nowait(None)  # keep the end-of-stream marker for other consumers
+        return line
+
+    async def write(self, data) -> int:
+        """
+        Write data to the serial port without blocking the event loop.
+
+        :param data: A str (encoded as UTF-8) or bytes-like object.
+        :return: The number of bytes written.
+        """
+        if not self.serial_connection or not self.serial_connection.is_open:
+            raise Exception(f"Port {self.port} is not connected; call `await connect()` first.")
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        view = memoryview(data)
+        total = len(view)
+        if self._fd is None:
+            await self._loop.run_in_executor(None, self.serial_connection.write, data)
+            return total
+        fd = self._fd
+        while view:
+            try:
+                n = os.write(fd, view)
+                view = view[n:]
+                continue
+            except BlockingIOError:
+                pass
+            # Output buffer is full: let the loop tell us when the port is writable again
+            writable = self._loop.create_future()
+            self._loop.add_writer(fd, writable.set_result, None)
+            try:
+                await writable
+            finally:
+                self._loop.remove_writer(fd)
+        return total
+
+    async def close(self) -> None:
+        """Stop reading and close the serial connection."""
+        self._finish()
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self.serial_connection and self.serial_connection.is_open:
+            if hasattr(self.serial_connection, 'cancel_read'):
+                self.serial_connection.cancel_read()
+            self.serial_connection.close()
+            print(f"Closed serial connection on port {self.port}")
+
+    async def __aenter__(self) -> 'AsyncSerialReader':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def __aiter__(self) -> 'AsyncSerialReader':
+        return self
+
+    async def __anext__(self):
+        line = await self.readline()
+        if line is None:
+            raise StopAsyncIteration
+        return line
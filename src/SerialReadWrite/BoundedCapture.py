@@ -0,0 +1,128 @@
+from typing import BinaryIO, Dict, List, Optional, Union
+try:
+    from .LineParser import LineParser
+except ImportError:
+    from LineParser import LineParser
+
+
+class CaptureBuffer:
+
+
+    def __init__(self, capacity: int, stream: Optional[BinaryIO] = None):
+        """
+        Preallocated receive buffer for a bounded capture. Chunks are copied into place (no per-line objects, no
+        string concatenation); if the estimate was too small the buffer doubles, so the cost stays linear.
+        With a stream, complete lines are written out as they arrive and only the partial last line is kept.
+
+        :param capacity: Initial size in bytes.
+        :param stream: Binary file the complete lines are streamed to (default: None, keep everything in memory).
+        """
+        self._buf = bytearray(max(capacity, 1024))
+        self._pos = 0
+        self.stream = stream
+        self.lines = 0        # complete lines received
+        self.nbytes = 0       # bytes of complete lines received
+
+    def append(self, data: bytes, limit: Optional[int] = None) -> bytes:
+        """
+        Add a chunk. With limit, stop after that many more complete lines and return the bytes that follow them.
+
+        :return: The bytes beyond the limit (empty if the whole chunk was taken).
+        """
+        rest = b''
+        newlines = data.count(b'\n')
+        if limit is not None and newlines >= limit:
+            end = -1
+            for _ in range(limit):
+                end = data.find(b'\n', end + 1)
+            data, rest = data[:end + 1], data[end + 1:]
+            newlines = limit
+        n = len(data)
+        if self._pos + n > len(self._buf):
+            self._buf.extend(bytes(max(len(self._buf), self._pos + n - len(self._buf))))
+        self._buf[self._pos:self._pos + n] = data
+        self._pos += n
+        self.lines += newlines
+        if self.stream is not None and newlines:
+            self._write_complete()
+        return rest
+
+    def _write_complete(self) -> None:
+        end = self._buf.rfind(b'\n', 0, self._pos) + 1
+        self.stream.write(memoryview(self._buf)[:end])
+        self.nbytes += end
+        self._buf[:self._pos - end] = self._buf[end:self._pos]
+        self._pos -= end
+
+    def finish(self) -> bytes:
+        """Cut the buffer after its last complete line and return the partial line that follows."""
+        end = self._buf.rfind(b'\n', 0, self._pos) + 1
+        tail = bytes(self._buf[end:self._pos])
+        self._pos = end
+        if self.stream is None:
+            self.nbytes = end
+        return tail
+
+    @property
+    def data(self) -> memoryview:
+        return memoryview(self._buf)[:self._pos]
+
+
+class CaptureResult:
+
+
+    def __init__(self, data: memoryview, lines: int, nbytes: int, started: float, elapsed: float,
+                 filename: Optional[str] = None):
+        """
+        Outcome of SerialReader.capture(): the complete lines received, as one contiguous block of bytes.
+
+        :param data: The captured bytes (empty when the capture was streamed to disk).
+        :param lines: Number of complete lines captured.
+        :param nbytes: Number of bytes captured.
+        :param started: time.time() when the capture started.
+        :param elapsed: Seconds the capture took.
+        :param filename: File the capture was written to, if any.
+        """
+        self.data = data
+        self.line_count = lines
+        self.nbytes = nbytes
+        self.started = started
+        self.elapsed = elapsed
+        self.filename = filename
+
+    def __len__(self) -> int:
+        return self.line_count
+
+    def raw(self) -> bytes:
+        """The captured bytes, line terminators included."""
+        return bytes(self.data)
+
+    def lines(self, decode: bool = True) -> List[Union[str, bytes]]:
+        """The captured lines, stripped (str) or without their terminator (bytes)."""
+        if decode:
+            return [line.rstrip() for line in self.text().split('\n')[:-1]]
+        return [line.rstrip(b'\r') for line in self.raw().split(b'\n')[:-1]]
+
+    def text(self) -> str:
+        return self.raw().decode('utf-8', 'replace')
+
+    def arrays(self, parser: LineParser) -> Dict[str, object]:
+        """Parse every line into columns (NumPy arrays when NumPy is installed); see LineParser.take()."""
+        parser.reset()
+        parser.parse_batch(self.lines())
+        return parser.take()
+
+    def save(self, filename: str) -> None:
+        """Write the captured bytes to filename in one call."""
+        with open(filename, 'wb') as file:
+            file.write(self.data)
+        self.filename = filename
+
+    @property
+    def rate(self) -> float:
+        """Lines per second."""
+        return self.line_count / self.elapsed if self.elapsed > 0 else float('nan')
+
+    def __repr__(self) -> str:
+        return (f"CaptureResult({self.line_count} lines, {self.nbytes} bytes in {self.elapsed:.2f} s"
+                + (f", {self.filename}" if self.filename else "") + ")")
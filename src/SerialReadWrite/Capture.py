@@ -0,0 +1,242 @@
+import json
+import mmap
+import os
+import struct
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional, Union
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; CaptureFile falls back to struct.iter_unpack
+    np = None
+try:
+    from .LineParser import LineParser
+except ImportError:
+    from LineParser import LineParser
+
+
+MAGIC = b'SRWCAP01'
+HEADER_SIZE = 4096      # reserved header region; records start here so the header can be rewritten in place
+_PREFIX = struct.Struct('<8sI')  # magic, JSON header length
+_KIND_FORMATS = {'int': 'q', 'float': 'd'}
+_NUMPY_TYPES = {'d': '<f8', 'q': '<i8', 'Q': '<u8', 'I': '<u4', 'H': '<u2'}
+
+
+class CaptureWriter:
+
+
+    def __init__(self, filename: str, parser: Optional[LineParser] = None, raw_lines: bool = True,
+                 ports: Optional[List[str]] = None, flush_records: int = 4096):
+        """
+        Create an append-only binary capture file of fixed-width records.
+
+        Every record holds the host timestamp (float64 seconds since the epoch) and a port id, followed by the byte
+        offset/length of the raw line in the `<filename>.lines` sidecar (if raw_lines) and the parsed fields (if parser).
+        With a parser, lines it cannot parse are counted in parser.malformed and not recorded.
+
+        :param filename: The capture file to create (overwritten if it exists).
+        :param parser: LineParser with int/float fields whose values are stored in each record (default: None).
+        :param raw_lines: Keep the raw lines in the sidecar file and store their offsets (default: True).
+        :param ports: Initial port names; port ids index into this list, which grows as new ports are seen (default: None).
+        :param flush_records: Number of records buffered before they are written out (default: 4096).
+        """
+        if parser is None and not raw_lines:
+            raise ValueError("A capture needs a parser, raw_lines=True, or both")
+        self.filename = filename
+        self.parser = parser
+        self.raw_lines = raw_lines
+        self.ports = list(ports or [])
+        self.flush_records = flush_records
+        self.records_written = 0
+        fields = [('timestamp', 'd'), ('port', 'H')]
+        if raw_lines:
+            fields += [('line_offset', 'Q'), ('line_length', 'I')]
+        if parser is not None:
+            for name, kind in parser.fields.items():
+                if kind not in _KIND_FORMATS:
+                    raise ValueError(f"Field '{name}' has type '{kind}'; captures only store int and float fields")
+                fields.append((name, _KIND_FORMATS[kind]))
+        self.fields = fields
+        self.struct = struct.Struct('<' + ''.join(code for _, code in fields))
+        self._pending = bytearray()
+        self._pending_count = 0
+        self._lines_offset = 0
+        self._ports_index = {port: i for i, port in enumerate(self.ports)}
+        self._header_ports = None
+        self._file = open(filename, 'wb')
+        self._lines_file = open(filename + '.lines', 'wb') if raw_lines else None
+        self._write_header()
+
+    def _write_header(self) -> None:
+        header = json.dumps({
+            "version": 1,
+            "created": datetime.now().isoformat(),
+            "record_format": self.struct.format,
+            "fields": self.fields,
+            "ports": self.ports,
+            "lines_file": os.path.basename(self.filename) + '.lines' if self.raw_lines else None,
+        }).encode('utf-8')
+        if _PREFIX.size + len(header) > HEADER_SIZE:
+            raise ValueError("Capture header does not fit in the reserved header region (too many ports/fields)")
+        block = _PREFIX.pack(MAGIC, len(header)) + header
+        pos = self._file.tell()
+        self._file.seek(0)
+        self._file.write(block.ljust(HEADER_SIZE, b' '))
+        if pos > HEADER_SIZE:
+            self._file.seek(pos)
+        self._header_ports = len(self.ports)
+
+    def _port_id(self, port: Optional[str]) -> int:
+        port = port or ''
+        pid = self._ports_index.get(port)
+        if pid is None:
+            pid = len(self.ports)
+            self.ports.append(port)
+            self._ports_index[port] = pid
+        return pid
+
+    def write_line(self, line: Union[str, bytes], timestamp: Optional[float] = None, port: Optional[str] = None) -> None:
+        """
+        Append one received line.
+
+        :param line: The line as received (str or bytes, without the line terminator).
+        :param timestamp: Host receive time in seconds since the epoch (default: now).
+        :param port: Port the line came from (default: '').
+        """
+        self.write_lines((line,), timestamp, port)
+
+    def write_lines(self, lines: Iterable[Union[str, bytes]], timestamp: Optional[float] = None, port: Optional[str] = None) -> None:
+        """
+        Append a batch of lines that share one timestamp and port.
+
+        :param lines: The lines as received.
+        :param timestamp: Host receive time in seconds since the epoch (default: now).
+        :param port: Port the lines came from (default: '').
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        pid = self._port_id(port)
+        pack = self.struct.pack
+        parse = self.parser.parse if self.parser is not None else None
+        raw_chunks = []
+        for line in lines:
+            values = ()
+            if parse is not None:
+                values = parse(line)
+                if values is None:
+                    continue
+            if self.raw_lines:
+                data = line.encode('utf-8') if isinstance(line, str) else bytes(line)
+                self._pending += pack(timestamp, pid, self._lines_offset, len(data), *values)
+                raw_chunks.append(data)
+                raw_chunks.append(b'\n')
+                self._lines_offset += len(data) + 1
+            else:
+                self._pending += pack(timestamp, pid, *values)
+            self._pending_count += 1
+        if raw_chunks:
+            self._lines_file.write(b''.join(raw_chunks))
+        if self._pending_count >= self.flush_records:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records (and the header, if new ports were seen) to the file."""
+        if self._pending:
+            self._file.write(self._pending)
+            self.records_written += self._pending_count
+            self._pending = bytearray()
+            self._pending_count = 0
+        if self._header_ports != len(self.ports):
+            self._write_header()
+        self._file.flush()
+        if self._lines_file:
+            self._lines_file.flush()
+
+    def close(self) -> None:
+        """Flush and close the capture file."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        if self._lines_file:
+            self._lines_file.close()
+
+    def __enter__(self) -> 'CaptureWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class CaptureFile:
+
+
+    def __init__(self, filename: str):
+        """
+        Open a capture written by CaptureWriter for reading via mmap.
+
+        :param filename: The capture file.
+        """
+        self.filename = filename
+        with open(filename, 'rb') as file:
+            magic, length = _PREFIX.unpack(file.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{filename} is not a SerialReadWrite capture file")
+            self.header = json.loads(file.read(length).decode('utf-8'))
+        self.fields = [tuple(field) for field in self.header['fields']]
+        self.ports: List[str] = self.header['ports']
+        self.struct = struct.Struct(self.header['record_format'])
+        self._file = open(filename, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._count = max(size - HEADER_SIZE, 0) // self.struct.size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else None
+        self._lines_mmap = None
+        self._lines_file = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def dtype(self):
+        """The NumPy structured dtype of one record."""
+        if np is None:
+            raise ImportError("NumPy is required for CaptureFile.dtype()/array(); install with `pip install numpy`.")
+        return np.dtype([(name, _NUMPY_TYPES[code]) for name, code in self.fields])
+
+    def array(self):
+        """The records as a read-only NumPy structured array backed directly by the memory-mapped file (no copy)."""
+        return np.frombuffer(self._mmap, dtype=self.dtype(), count=self._count, offset=HEADER_SIZE)
+
+    def records(self):
+        """Iterate over the records as tuples (works without NumPy)."""
+        if not self._count:
+            return iter(())
+        end = HEADER_SIZE + self._count * self.struct.size
+        return self.struct.iter_unpack(memoryview(self._mmap)[HEADER_SIZE:end])
+
+    def line(self, offset: int, length: int) -> bytes:
+        """
+        Return a raw line from the `.lines` sidecar given a record's line_offset and line_length.
+        """
+        if self._lines_mmap is None:
+            lines_file = self.header.get('lines_file')
+            if not lines_file:
+                raise Exception(f"{self.filename} was captured without raw lines")
+            path = os.path.join(os.path.dirname(os.path.abspath(self.filename)), lines_file)
+            self._lines_file = open(path, 'rb')
+            self._lines_mmap = mmap.mmap(self._lines_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._lines_mmap[offset:offset + length]
+
+    def close(self) -> None:
+        for handle in (self._mmap, self._lines_mmap, self._file, self._lines_file):
+            if handle is not None:
+                try:
+                    handle.close()
+                except BufferError:
+                    pass  # a NumPy view still references the mapping; it is released with the view
+        self._mmap = self._lines_mmap = None
+
+    def __enter__(self) -> 'CaptureFile':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
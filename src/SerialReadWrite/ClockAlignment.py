@@ -0,0 +1,237 @@
+import math
+import re
+import time
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional, Union
+try:
+    from .LineParser import LineParser
+except ImportError:
+    from LineParser import LineParser
+
+
+# millis() printed by examples/serialtest: "Time since start: 1200  ... Data = 7"
+DEFAULT_DEVICE_TIME = r'Time since start:\s*(\d+)'
+
+
+class AlignedRecord(NamedTuple):
+    item: object                      # the line (or parsed record) as the reader would have delivered it
+    device_time: Optional[float]      # device clock in seconds (None if the line carries no timestamp)
+    host_time: float                  # host time.time() when the line was read
+    corrected_time: Optional[float]   # device_time mapped onto the host clock: when the device sent the line
+    latency: Optional[float]          # host_time - corrected_time, in seconds
+
+
+class ClockModel:
+
+
+    def __init__(self, bucket_s: float = 1.0, window: int = 300, reset_tolerance_s: float = 1.0):
+        """
+        Online fit of host_time = device_time + offset + drift * device_time.
+
+        Every sample is delayed by a non-negative transport latency, so the fit uses only the fastest sample of each
+        bucket_s of device time (the lower envelope) and is a least-squares line through the last `window` of those
+        minima. Latencies are therefore measured from the fastest path seen recently, which also absorbs the fixed
+        part of the transport delay.
+
+        :param bucket_s: Device seconds per envelope point (default: 1).
+        :param window: Envelope points fitted, i.e. the model's memory in buckets (default: 300).
+        :param reset_tolerance_s: A device clock going back by more than this is taken as a board reset and starts a new fit (default: 1).
+        """
+        self.bucket_s = bucket_s
+        self.window = window
+        self.reset_tolerance_s = reset_tolerance_s
+        self.offset = math.nan
+        self.drift = 0.0              # host seconds gained per device second (ppm = drift * 1e6)
+        self.resets = 0
+        self._points: deque = deque(maxlen=window)   # (device_time, host - device) of each bucket's fastest sample
+        self._bucket: Optional[int] = None
+        self._best: Optional[tuple] = None            # fastest sample of the current bucket
+        self._last_device: Optional[float] = None
+
+    def reset(self) -> None:
+        self.offset = math.nan
+        self.drift = 0.0
+        self._points.clear()
+        self._bucket = None
+        self._best = None
+        self._last_device = None
+
+    def update(self, device_time: float, host_time: float) -> None:
+        if self._last_device is not None and device_time < self._last_device - self.reset_tolerance_s:
+            self.resets += 1
+            self.reset()
+        self._last_device = device_time
+        diff = host_time - device_time
+        bucket = int(device_time // self.bucket_s)
+        if bucket != self._bucket:
+            if self._best is not None:
+                self._points.append(self._best)
+                self._fit()
+            self._bucket = bucket
+            self._best = (device_time, diff)
+        elif diff < self._best[1]:
+            self._best = (device_time, diff)
+        if len(self._points) < 2:
+            # Not enough history for a slope yet: offset from the fastest sample so far
+            fastest = min([self._best] + list(self._points), key=lambda p: p[1])
+            self.offset = fastest[1]
+
+    def _fit(self) -> None:
+        points = self._points
+        n = len(points)
+        if n < 2:
+            return
+        mx = sum(x for x, _ in points) / n
+        my = sum(y for _, y in points) / n
+        sxx = sum((x - mx) ** 2 for x, _ in points)
+        if sxx <= 0:
+            return
+        self.drift = sum((x - mx) * (y - my) for x, y in points) / sxx
+        # Keep every envelope point on or above the line: shift it down to the lowest residual
+        self.offset = my - self.drift * mx + min(y - (my + self.drift * (x - mx)) for x, y in points)
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.offset)
+
+    @property
+    def fitted(self) -> bool:
+        """True once the drift has been fitted (at least two completed buckets)."""
+        return len(self._points) >= 2
+
+    @property
+    def buckets(self) -> int:
+        """Envelope points the current fit is based on."""
+        return len(self._points)
+
+    def host_time(self, device_time: float) -> float:
+        """Map a device timestamp (seconds) onto the host clock."""
+        return device_time + self.offset + self.drift * device_time
+
+
+class ClockAlignment:
+
+
+    def __init__(self, device_time: Union[str, LineParser, Callable[[object], Optional[float]]] = DEFAULT_DEVICE_TIME,
+                 field: Optional[str] = None, units: float = 1e-3, bucket_s: float = 1.0, window: int = 300,
+                 latency_window: int = 2048, latency_alarm_s: Optional[float] = None,
+                 drift_alarm_ppm: Optional[float] = None, drift_min_buckets: int = 30, alarm_interval_s: float = 5.0,
+                 on_alarm: Optional[Callable[[str, str], None]] = None):
+        """
+        Align device timestamps (e.g. millis()) with host receive times: fit the clock offset and drift online,
+        annotate every record with its corrected send time and latency, keep latency percentiles and raise alarms on
+        latency spikes (buffering stalls, USB hiccups) or excessive drift.
+
+        :param device_time: How to find the device timestamp: a regex whose first group is the number, a LineParser
+            (with field; parsed records from SerialReader(parser=...) are read directly) or a function item -> value
+            (default: DEFAULT_DEVICE_TIME, the 'Time since start' of examples/serialtest).
+        :param field: LineParser field holding the timestamp.
+        :param units: Seconds per device time unit (default: 1e-3, milliseconds).
+        :param bucket_s: See ClockModel (default: 1).
+        :param window: See ClockModel (default: 300).
+        :param latency_window: Latest latencies kept for percentiles (default: 2048).
+        :param latency_alarm_s: Alarm when a latency exceeds this many seconds (default: None, off).
+        :param drift_alarm_ppm: Alarm when |drift| exceeds this many parts per million (default: None, off).
+        :param drift_min_buckets: Completed buckets the fit needs before drift alarms are raised; a slope fitted over a
+            few seconds is mostly latency jitter (default: 30, capped at window).
+        :param alarm_interval_s: Minimum seconds between two alarms of the same kind (default: 5).
+        :param on_alarm: Called with (kind, message) for each alarm; alarms are printed if None (default: None).
+        """
+        if isinstance(device_time, LineParser):
+            if field not in device_time.fields:
+                raise ValueError(f"field must name one of the parser's fields {tuple(device_time.fields)}")
+            self._extract = self._from_parser(device_time, list(device_time.fields).index(field))
+        elif isinstance(device_time, str):
+            self._extract = self._from_regex(re.compile(device_time))
+        else:
+            self._extract = device_time
+        self.units = units
+        self.model = ClockModel(bucket_s, window)
+        self.latencies: deque = deque(maxlen=latency_window)
+        self.latency_alarm_s = latency_alarm_s
+        self.drift_alarm_ppm = drift_alarm_ppm
+        self.drift_min_buckets = max(min(drift_min_buckets, window), 2)
+        self.alarm_interval_s = alarm_interval_s
+        self.on_alarm = on_alarm
+        self.alarms = 0
+        self.aligned = 0          # records with a device timestamp
+        self.unaligned = 0        # records without one
+        self.max_latency = 0.0
+        self._last_alarm = {}
+
+    @staticmethod
+    def _from_regex(regex: 're.Pattern') -> Callable[[object], Optional[float]]:
+        def extract(item) -> Optional[float]:
+            if isinstance(item, bytes):
+                item = item.decode('utf-8', 'replace')
+            m = regex.search(item) if isinstance(item, str) else None
+            return float(m.group(1)) if m else None
+        return extract
+
+    @staticmethod
+    def _from_parser(parser: LineParser, index: int) -> Callable[[object], Optional[float]]:
+        def extract(item) -> Optional[float]:
+            record = item if isinstance(item, tuple) else parser.parse(item)
+            return float(record[index]) if record is not None else None
+        return extract
+
+    def annotate(self, item, host_time: Optional[float] = None) -> AlignedRecord:
+        """Fold one received record into the model and return it with its corrected time and latency."""
+        host_time = time.time() if host_time is None else host_time
+        value = self._extract(item)
+        if value is None:
+            self.unaligned += 1
+            return AlignedRecord(item, None, host_time, None, None)
+        device_time = value * self.units
+        self.model.update(device_time, host_time)
+        corrected = self.model.host_time(device_time)
+        # The fit may still be above this sample's envelope point (its bucket is not folded in yet): never below 0
+        latency = max(host_time - corrected, 0.0)
+        self.aligned += 1
+        self.latencies.append(latency)
+        if latency > self.max_latency:
+            self.max_latency = latency
+        self._check_alarms(latency)
+        return AlignedRecord(item, device_time, host_time, corrected, latency)
+
+    def annotate_batch(self, items: list, host_time: Optional[float] = None) -> List[AlignedRecord]:
+        """annotate() every record of a bulk read, all received at host_time."""
+        host_time = time.time() if host_time is None else host_time
+        return [self.annotate(item, host_time) for item in items]
+
+    def _check_alarms(self, latency: float) -> None:
+        if self.latency_alarm_s is not None and latency > self.latency_alarm_s:
+            self._alarm('latency', f"latency {latency * 1e3:.1f} ms exceeds {self.latency_alarm_s * 1e3:.1f} ms")
+        if self.drift_alarm_ppm is not None and self.model.buckets >= self.drift_min_buckets and abs(self.model.drift) * 1e6 > self.drift_alarm_ppm:
+            self._alarm('drift', f"clock drift {self.model.drift * 1e6:+.0f} ppm exceeds {self.drift_alarm_ppm:.0f} ppm")
+
+    def _alarm(self, kind: str, message: str) -> None:
+        now = time.monotonic()
+        if now - self._last_alarm.get(kind, -math.inf) < self.alarm_interval_s:
+            return
+        self._last_alarm[kind] = now
+        self.alarms += 1
+        if self.on_alarm is not None:
+            self.on_alarm(kind, message)
+        else:
+            print(f"Warning: {message}")
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th quantile (0..1) of the recent latencies in seconds (None before the first)."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def summary(self) -> dict:
+        """Clock model and latency statistics as a JSON-serialisable dict."""
+        return {"offset_s": self.model.offset if self.model.ready else None, "drift_ppm": self.model.drift * 1e6,
+                "latency_p50_s": self.percentile(0.50), "latency_p95_s": self.percentile(0.95),
+                "latency_p99_s": self.percentile(0.99), "latency_max_s": self.max_latency,
+                "aligned": self.aligned, "unaligned": self.unaligned, "resets": self.model.resets, "alarms": self.alarms}
+
+    def format(self) -> str:
+        s = self.summary()
+        ms = lambda v: '-' if v is None else f"{v * 1e3:.2f} ms"
+        return (f"latency p50 {ms(s['latency_p50_s'])} p95 {ms(s['latency_p95_s'])} p99 {ms(s['latency_p99_s'])}"
+                f" max {ms(s['latency_max_s'])} | drift {s['drift_ppm']:+.1f} ppm")
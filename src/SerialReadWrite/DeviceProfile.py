@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import List, Optional
+from serial.tools import list_ports
+
+
+# USB vendor IDs of Arduino boards and the USB-serial bridges common on clones
+ARDUINO_VIDS = {
+    0x2341: 'Arduino',
+    0x2A03: 'Arduino (arduino.org)',
+    0x1A86: 'CH340',
+    0x0403: 'FTDI',
+    0x10C4: 'CP210x',
+}
+
+
+def describe_port(port: str) -> Optional[dict]:
+    """
+    Look a port up in the system's port list.
+
+    :param port: Device name (e.g., '/dev/ttyACM0' or 'COM3').
+    :return: {"port", "vid", "pid", "serial_number", "description"}, or None if the port is not listed.
+    """
+    for info in list_ports.comports():
+        if info.device == port:
+            return _info_dict(info)
+    return None
+
+
+def discover(vid: Optional[int] = None, pid: Optional[int] = None, serial_number: Optional[str] = None) -> List[dict]:
+    """
+    Enumerate serial ports and return the ones matching a USB identity.
+
+    :param vid: USB vendor ID to match (default: any of ARDUINO_VIDS).
+    :param pid: USB product ID to match (default: any).
+    :param serial_number: USB serial number to match (default: any).
+    :return: Matching ports as describe_port() dicts, sorted by device name.
+    """
+    matches = []
+    for info in list_ports.comports():
+        if info.vid is None:
+            continue
+        if (vid is None and info.vid not in ARDUINO_VIDS) or (vid is not None and info.vid != vid):
+            continue
+        if pid is not None and info.pid != pid:
+            continue
+        if serial_number is not None and info.serial_number != serial_number:
+            continue
+        matches.append(_info_dict(info))
+    return sorted(matches, key=lambda d: d["port"])
+
+
+def _info_dict(info) -> dict:
+    return {
+        "port": info.device,
+        "vid": info.vid,
+        "pid": info.pid,
+        "serial_number": info.serial_number,
+        "description": info.description,
+    }
+
+
+def _node_id(port: str) -> Optional[list]:
+    # Identity of the device node: it changes when the board is unplugged and the node recreated
+    try:
+        st = os.stat(port)
+    except (OSError, ValueError):
+        return None  # e.g. COM ports on Windows
+    return [st.st_ino, st.st_ctime_ns]
+
+
+class DeviceProfile:
+
+
+    def __init__(self, path: str = 'data/profile.json'):
+        """
+        Cache of the last board connected to successfully, so it can be reconnected to without naming the port.
+
+        The profile records the port, baud rate, the board's USB identity (VID/PID/serial number) and the identity
+        of its device node. resolve() checks it is not stale before it is used.
+
+        :param path: JSON file holding the profile, relative to the working directory (default: 'data/profile.json').
+        """
+        self.path = os.path.join(os.getcwd(), path)
+        self._writer: Optional[threading.Thread] = None
+
+    def load(self) -> Optional[dict]:
+        """Return the cached profile, or None if there is none (or it cannot be read)."""
+        try:
+            with open(self.path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, port: str, baud_rate: int, **settings) -> dict:
+        """
+        Record a successful connection. Enumerating ports and writing the file can take tens of milliseconds,
+        so it is done on a background thread; the process still waits for it before exiting.
+
+        :param port: The port that was connected to.
+        :param baud_rate: Its baud rate.
+        :param settings: Extra connection settings to remember (e.g., ready mode).
+        :return: The profile being written (USB identity fields are filled in by the background thread).
+        """
+        profile = {"port": port, "baud_rate": baud_rate, "last_connected": datetime.now().isoformat(), **settings}
+        self.wait()
+        self._writer = threading.Thread(target=self._write, args=(profile,), name="DeviceProfile")
+        self._writer.start()
+        return profile
+
+    def _write(self, profile: dict) -> None:
+        profile.update(describe_port(profile["port"]) or {})
+        profile["node"] = _node_id(profile["port"])
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as file:
+                json.dump(profile, file, indent=4)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Error: Could not save device profile {self.path}: {e}")
+
+    def wait(self) -> None:
+        """Wait for a pending save() to finish."""
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    def resolve(self) -> Optional[dict]:
+        """
+        Return the cached profile with "port" pointing at where the board is now, or None if it cannot be found.
+
+        If the device node is unchanged since the profile was saved, it is returned without enumerating ports.
+        Otherwise the board is looked up by its USB VID/PID/serial number, so a board that came back on a different
+        port (e.g. /dev/ttyACM1 after a replug) is still found.
+        """
+        profile = self.load()
+        if not profile or not profile.get("port"):
+            return None
+        port = profile["port"]
+        node = _node_id(port)
+        if node is not None and node == profile.get("node"):
+            return profile
+        if profile.get("vid") is None:
+            # No USB identity to check against (e.g. a virtual port): trust the path if it still exists
+            return profile if node is not None else None
+        matches = discover(profile["vid"], profile.get("pid"), profile.get("serial_number"))
+        if not matches:
+            return None
+        current = next((m for m in matches if m["port"] == port), matches[0])
+        profile.update(current)
+        return profile
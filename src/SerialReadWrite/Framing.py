@@ -0,0 +1,219 @@
+import binascii
+import struct
+from typing import List, Optional, Sequence, Union
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only FrameDecoder.as_array needs it
+    np = None
+
+
+# Framing modes
+COBS = 'cobs'      # COBS(payload + crc16) followed by a 0x00 delimiter
+LENGTH = 'length'  # SYNC + length byte + payload + crc16
+SYNC = b'\xa5\x5a'
+
+# struct format character -> NumPy dtype kind/size
+_NUMPY_CODES = {'b': 'i1', 'B': 'u1', 'h': 'i2', 'H': 'u2', 'i': 'i4', 'I': 'u4', 'l': 'i4', 'L': 'u4',
+                'q': 'i8', 'Q': 'u8', 'e': 'f2', 'f': 'f4', 'd': 'f8', '?': '?'}
+
+
+def crc16(data: bytes, crc: int = 0xFFFF) -> int:
+    """CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF), matching crc16() in examples/binaryframes."""
+    return binascii.crc_hqx(data, crc)
+
+
+def cobs_encode(data: bytes) -> bytes:
+    """Encode data with Consistent Overhead Byte Stuffing so that it contains no 0x00 bytes."""
+    out = bytearray()
+    for block in bytes(data).split(b'\0'):
+        # Each zero-delimited block is emitted in runs of at most 254 data bytes
+        while len(block) >= 254:
+            out.append(0xFF)
+            out += block[:254]
+            block = block[254:]
+        out.append(len(block) + 1)
+        out += block
+    return bytes(out)
+
+
+def cobs_decode(data: bytes) -> bytes:
+    """
+    Decode a COBS block (without the trailing 0x00 delimiter).
+
+    :raises ValueError: If data is not valid COBS.
+    """
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        code = data[i]
+        if code == 0:
+            raise ValueError("Unexpected zero byte in COBS data")
+        end = i + code
+        if end > n:
+            raise ValueError("Truncated COBS block")
+        out += data[i + 1:end]
+        i = end
+        if code != 0xFF and i < n:
+            out.append(0)
+    return bytes(out)
+
+
+def encode_frame(payload: bytes, framing: str = COBS) -> bytes:
+    """
+    Wrap a payload in a frame (including CRC16) ready to be written to the serial port.
+
+    :param payload: The packed payload (e.g. struct.pack(fmt, ...)).
+    :param framing: 'cobs' or 'length' (default: 'cobs').
+    """
+    if framing == COBS:
+        return cobs_encode(payload + struct.pack('<H', crc16(payload))) + b'\0'
+    if framing == LENGTH:
+        if len(payload) > 255:
+            raise ValueError(f"Length-prefixed payloads are limited to 255 bytes, got {len(payload)}")
+        body = bytes([len(payload)]) + payload
+        return SYNC + body + struct.pack('<H', crc16(body))
+    raise ValueError(f"Unsupported framing '{framing}' (expected '{COBS}' or '{LENGTH}')")
+
+
+class FrameDecoder:
+
+
+    def __init__(self, fmt: str, names: Optional[Sequence[str]] = None, framing: str = COBS, max_frame: int = 1024):
+        """
+        Incrementally decode CRC-checked binary frames carrying struct-described payloads.
+
+        :param fmt: struct format of the payload, e.g. '<Ii' for (uint32 millis, int32 data).
+        :param names: Optional field names, used by as_array() for the NumPy record fields.
+        :param framing: 'cobs' or 'length' (default: 'cobs').
+        :param max_frame: Discard input that grows past this many bytes without a frame boundary (default: 1024).
+        """
+        if framing not in (COBS, LENGTH):
+            raise ValueError(f"Unsupported framing '{framing}' (expected '{COBS}' or '{LENGTH}')")
+        self.struct = struct.Struct(fmt)
+        self.names = list(names) if names else None
+        self.framing = framing
+        self.max_frame = max_frame
+        self.frames = 0       # valid frames decoded
+        self.crc_errors = 0   # frames dropped because the CRC did not match
+        self.resyncs = 0      # times the decoder had to skip bytes to find the next frame boundary
+        self._buf = bytearray()
+
+    def feed(self, data: bytes, raw: bool = False) -> List[Union[tuple, bytes]]:
+        """
+        Add received bytes and return every complete, valid frame.
+
+        :param data: Bytes read from the serial port.
+        :param raw: Return payload bytes instead of unpacked tuples (default: False).
+        :return: A list of decoded payloads.
+        """
+        self._buf += data
+        payloads = self._feed_cobs() if self.framing == COBS else self._feed_length()
+        if raw:
+            return payloads
+        unpack = self.struct.unpack
+        return [unpack(p) for p in payloads]
+
+    def _check(self, body: bytes) -> Optional[bytes]:
+        # body = payload + little-endian CRC16 (over the payload, or length byte + payload)
+        if len(body) < 2 or crc16(body[:-2]) != int.from_bytes(body[-2:], 'little'):
+            self.crc_errors += 1
+            return None
+        return body[:-2]
+
+    def _feed_cobs(self) -> List[bytes]:
+        buf = self._buf
+        end = buf.rfind(b'\0')
+        if end < 0:
+            if len(buf) > self.max_frame:
+                buf.clear()
+                self.resyncs += 1
+            return []
+        blocks = bytes(buf[:end]).split(b'\0')
+        del buf[:end + 1]
+        payloads = []
+        size = self.struct.size
+        for block in blocks:
+            if not block:
+                continue
+            try:
+                body = cobs_decode(block)
+            except ValueError:
+                self.resyncs += 1
+                continue
+            payload = self._check(body)
+            if payload is None:
+                continue
+            if len(payload) != size:
+                self.resyncs += 1
+                continue
+            payloads.append(payload)
+        self.frames += len(payloads)
+        return payloads
+
+    def _feed_length(self) -> List[bytes]:
+        buf = self._buf
+        payloads = []
+        size = self.struct.size
+        pos = 0
+        while True:
+            start = buf.find(SYNC, pos)
+            if start < 0:
+                # Keep a possible partial sync byte at the end
+                keep = 1 if buf.endswith(SYNC[:1]) else 0
+                if len(buf) - pos - keep > 0:
+                    self.resyncs += 1
+                pos = len(buf) - keep
+                break
+            if start != pos:
+                self.resyncs += 1
+            if len(buf) < start + 3:
+                pos = start
+                break
+            length = buf[start + 2]
+            end = start + 3 + length + 2
+            if len(buf) < end:
+                pos = start
+                break
+            body = self._check(bytes(buf[start + 2:end]))
+            if body is None or length != size:
+                if body is not None:
+                    self.resyncs += 1
+                pos = start + 1  # false sync or corrupt frame: search again from the next byte
+                continue
+            payloads.append(body[1:])
+            pos = end
+        del buf[:pos]
+        self.frames += len(payloads)
+        return payloads
+
+    def dtype(self):
+        """The NumPy structured dtype equivalent to the payload struct format."""
+        if np is None:
+            raise ImportError("NumPy is required for FrameDecoder.dtype()/as_array(); install with `pip install numpy`.")
+        fmt = self.struct.format
+        order = {'<': '<', '>': '>', '!': '>', '=': '='}.get(fmt[:1], '=')
+        if fmt[:1] not in '<>!=':
+            raise ValueError("as_array() needs an explicit byte order ('<', '>', '!' or '=') so the layout has no padding")
+        fields = []
+        count = ''
+        for ch in fmt[1:]:
+            if ch.isdigit():
+                count += ch
+                continue
+            if ch not in _NUMPY_CODES:
+                raise ValueError(f"struct code '{ch}' has no NumPy equivalent")
+            n = int(count or 1)
+            count = ''
+            for _ in range(n):
+                fields.append(order + _NUMPY_CODES[ch] if ch != '?' else '?')
+        names = self.names or [f"f{i}" for i in range(len(fields))]
+        return np.dtype({'names': names, 'formats': fields})
+
+    def as_array(self, payloads: List[bytes]):
+        """
+        Convert raw payloads (from feed(..., raw=True)) to a NumPy structured array in one copy.
+
+        :param payloads: Payload bytes, each exactly struct.size long.
+        """
+        return np.frombuffer(b''.join(payloads), dtype=self.dtype())
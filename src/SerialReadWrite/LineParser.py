@@ -0,0 +1,220 @@
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; columns fall back to array.array
+    np = None
+
+
+# Regex fragment, converter, array.array typecode and NumPy dtype for each supported field type
+_FIELD_TYPES = {
+    'int':   (r'[-+]?\d+', int, 'q', 'int64'),
+    'float': (r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?', float, 'd', 'float64'),
+    'str':   (r'.*?', str, None, None),
+}
+
+_PLACEHOLDER = re.compile(r'\{(\w+)(?::(\w+))?\}')
+
+
+def compile_template(template: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Turn a line template into a regex with one named group per field.
+
+    Fields are written as `{name}` or `{name:type}` with type one of int, float or str (default: float).
+    Literal text is matched exactly, except that any run of whitespace matches one or more whitespace characters.
+
+    :param template: e.g. 'Time since start: {time:int}  ... Data = {data:int}'
+    :return: The regex pattern and a {name: type} mapping in field order.
+    """
+    pattern = []
+    types = {}
+    pos = 0
+    for m in _PLACEHOLDER.finditer(template):
+        pattern.append(_escape_literal(template[pos:m.start()]))
+        name, kind = m.group(1), m.group(2) or 'float'
+        if kind not in _FIELD_TYPES:
+            raise ValueError(f"Unsupported field type '{kind}' for field '{name}' (expected one of {tuple(_FIELD_TYPES)})")
+        if name in types:
+            raise ValueError(f"Duplicate field name '{name}' in template")
+        types[name] = kind
+        pattern.append(f"(?P<{name}>{_FIELD_TYPES[kind][0]})")
+        pos = m.end()
+    pattern.append(_escape_literal(template[pos:]))
+    return ''.join(pattern), types
+
+
+def _escape_literal(text: str) -> str:
+    return r'\s+'.join(re.escape(part) for part in re.split(r'\s+', text))
+
+
+class Column:
+
+    def __init__(self, kind: str, capacity: int = 1024):
+        """
+        A growable typed column. Numeric columns use a NumPy array (doubling on overflow) when NumPy is installed
+        and an array.array otherwise; str columns use a list.
+
+        :param kind: Field type: 'int', 'float' or 'str'.
+        :param capacity: Initial NumPy capacity in rows (default: 1024).
+        """
+        self.kind = kind
+        _, _, typecode, dtype = _FIELD_TYPES[kind]
+        self._size = 0
+        if dtype is None:
+            self._data = []
+        elif np is not None:
+            self._data = np.empty(capacity, dtype=dtype)
+        else:
+            self._data = array(typecode)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, values: Union[Sequence, 'np.ndarray']) -> None:
+        n = len(values)
+        if np is not None and isinstance(self._data, np.ndarray):
+            needed = self._size + n
+            if needed > len(self._data):
+                capacity = max(len(self._data), 1)
+                while capacity < needed:
+                    capacity *= 2
+                grown = np.empty(capacity, dtype=self._data.dtype)
+                grown[:self._size] = self._data[:self._size]
+                self._data = grown
+            self._data[self._size:needed] = values
+        else:
+            self._data.extend(values)
+        self._size += n
+
+    @property
+    def values(self):
+        """The filled part of the column (a NumPy view, array.array or list)."""
+        if np is not None and isinstance(self._data, np.ndarray):
+            return self._data[:self._size]
+        return self._data
+
+
+class LineParser:
+
+
+    def __init__(self, template: Optional[str] = None, regex: Optional[str] = None, types: Optional[Dict[str, str]] = None):
+        """
+        Compile a line format once and parse lines into typed records or columns.
+
+        Give either a template (see compile_template) or a regex with named groups plus an optional
+        {name: type} mapping (groups without an entry are parsed as float).
+
+        Example: LineParser('Time since start: {time:int}  ... Data = {data:int}') parses the output of examples/serialtest.
+
+        :param template: Line template with `{name:type}` fields.
+        :param regex: Regular expression with named groups, used instead of a template.
+        :param types: Field types for regex groups: 'int', 'float' or 'str'.
+        """
+        if (template is None) == (regex is None):
+            raise ValueError("Specify exactly one of template or regex")
+        if template is not None:
+            regex, types = compile_template(template)
+        self._regex = re.compile(regex)
+        names = list(self._regex.groupindex)
+        types = types or {}
+        self.fields = {name: types.get(name, 'float') for name in names}
+        self._converters = [_FIELD_TYPES[kind][1] for kind in self.fields.values()]
+        self._delimiter: Optional[str] = None
+        self._batch_regex: Optional[re.Pattern] = None   # CSV only: matches a whole '\n'-joined batch of valid rows
+        self.malformed = 0      # lines that did not match or failed conversion
+        self.parsed = 0         # lines successfully parsed
+        self.columns: Dict[str, Column] = {}
+        self.reset()
+
+    @classmethod
+    def csv(cls, names: List[str], kind: str = 'float', delimiter: str = ',') -> 'LineParser':
+        """
+        Parser for purely numeric delimited lines (e.g. '12,3.5,7'), which uses a vectorized NumPy path in parse_batch.
+
+        :param names: Column names, in order.
+        :param kind: Type of every column: 'int' or 'float' (default: 'float').
+        :param delimiter: Field separator (default: ',').
+        """
+        if kind not in ('int', 'float'):
+            raise ValueError(f"CSV columns must be 'int' or 'float', got '{kind}'")
+        number = _FIELD_TYPES[kind][0]
+        sep = r'\s*' + re.escape(delimiter) + r'\s*'
+        regex = r'\s*' + sep.join(f"(?P<{name}>{number})" for name in names) + r'\s*'
+        parser = cls(regex=regex, types={name: kind for name in names})
+        parser._delimiter = delimiter
+        # The same row without groups and with whitespace that cannot cross a line, so one fullmatch validates a batch
+        blank = r'[^\S\n]*'
+        row = blank + (blank + re.escape(delimiter) + blank).join([number] * len(names)) + blank
+        parser._batch_regex = re.compile(f"(?:{row}\n)*{row}")
+        return parser
+
+    def reset(self) -> None:
+        """Discard all collected columns."""
+        self.columns = {name: Column(kind) for name, kind in self.fields.items()}
+
+    def take(self) -> Dict[str, object]:
+        """Return the collected column values and start fresh columns."""
+        out = {name: column.values for name, column in self.columns.items()}
+        self.reset()
+        return out
+
+    def parse(self, line: Union[str, bytes]) -> Optional[tuple]:
+        """
+        Parse one line into a tuple of typed field values.
+
+        :param line: The line to parse (bytes are decoded as UTF-8).
+        :return: The record, or None if the line is malformed.
+        """
+        if isinstance(line, (bytes, bytearray)):
+            line = line.decode('utf-8', 'replace')
+        m = self._regex.fullmatch(line)
+        if m is None:
+            self.malformed += 1
+            return None
+        try:
+            record = tuple(convert(value) for convert, value in zip(self._converters, m.groupdict().values()))
+        except ValueError:
+            self.malformed += 1
+            return None
+        self.parsed += 1
+        return record
+
+    def parse_batch(self, lines: Iterable[Union[str, bytes]]) -> int:
+        """
+        Parse a batch of lines and append the values to the columns. Malformed lines are counted and skipped.
+
+        :param lines: The lines to parse.
+        :return: The number of rows appended.
+        """
+        lines = list(lines)
+        if not lines:
+            return 0
+        if self._delimiter is not None and np is not None:
+            rows = self._parse_numeric_batch(lines)
+            if rows is not None:
+                return rows
+        records = [r for r in map(self.parse, lines) if r is not None]
+        if records:
+            for column, values in zip(self.columns.values(), zip(*records)):
+                column.extend(values)
+        return len(records)
+
+    def _parse_numeric_batch(self, lines: list) -> Optional[int]:
+        # Vectorized path: convert the whole batch in one call. Falls back (returns None) on any irregular line.
+        ncols = len(self.fields)
+        lines = [line.decode('utf-8', 'replace') if isinstance(line, (bytes, bytearray)) else line for line in lines]
+        text = '\n'.join(lines)
+        # One regex pass over the whole batch: every row has ncols numbers as parse() accepts them (no 'nan'/'inf')
+        if self._batch_regex.fullmatch(text) is None:
+            return None
+        tokens = text.replace(self._delimiter, ' ').split()
+        dtype = next(iter(self.columns.values()))._data.dtype
+        try:
+            table = np.array(tokens, dtype=dtype).reshape(len(lines), ncols)
+        except (ValueError, OverflowError):  # e.g. an int beyond int64: let parse() handle it
+            return None
+        for i, column in enumerate(self.columns.values()):
+            column.extend(table[:, i])
+        self.parsed += len(lines)
+        return len(lines)
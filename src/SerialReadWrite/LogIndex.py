@@ -0,0 +1,152 @@
+import os
+import re
+import struct
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+ENTRY = struct.Struct('<dQ')  # host timestamp, byte offset of the line in the log
+_TIMESTAMP = re.compile(rb'\d+\.\d{6}\t')  # exactly what LogSink writes: f"{time.time():.6f}\t"
+
+
+def index_path(logfile: str) -> str:
+    """Path of the sidecar index for a log file."""
+    return logfile + '.idx'
+
+
+def split_timestamp(raw: bytes) -> Tuple[Optional[float], bytes]:
+    """
+    Split a timestamped log line ('<epoch seconds>\\t<line>', as written by LogSink(timestamps=True)).
+
+    Only the exact LogSink prefix counts, so device output such as '12\tvalue' is not taken for a timestamp.
+
+    :return: The timestamp (None if the line has no valid prefix) and the rest of the line.
+    """
+    match = _TIMESTAMP.match(raw)
+    if match is None:
+        return None, raw
+    return float(raw[:match.end() - 1]), raw[match.end():]
+
+
+def filter_lines(raws: Iterable[bytes], t_from: Optional[float] = None, t_to: Optional[float] = None) -> Iterator[Tuple[float, str]]:
+    """
+    Yield (timestamp, line) for the timestamped raw log lines with t_from <= timestamp <= t_to.
+
+    Lines without a timestamp are skipped; stops at the first line after t_to (timestamps increase through a log).
+    """
+    for raw in raws:
+        timestamp, rest = split_timestamp(raw)
+        if timestamp is None:
+            continue
+        if t_from is not None and timestamp < t_from:
+            continue
+        if t_to is not None and timestamp > t_to:
+            return
+        yield timestamp, rest.decode('utf-8', 'replace').rstrip('\r\n')
+
+
+class LogIndexer:
+
+
+    def __init__(self, index_file: str, every_lines: Optional[int] = 1000, every_bytes: Optional[int] = None):
+        """
+        Append sparse (timestamp -> byte offset) entries to a log's sidecar index while the log is written.
+
+        :param index_file: The index file to append to (see index_path()).
+        :param every_lines: Add an entry at least every this many lines (default: 1000).
+        :param every_bytes: Add an entry at least every this many bytes of log (default: None).
+        """
+        if not every_lines and not every_bytes:
+            raise ValueError("LogIndexer needs every_lines and/or every_bytes")
+        self.every_lines = every_lines
+        self.every_bytes = every_bytes
+        self._lines = None   # lines since the last entry; None forces an entry for the next line
+        self._bytes = 0
+        self._file = open(index_file, 'ab')
+
+    def add(self, timestamp: float, offset: int, nlines: int, nbytes: int) -> None:
+        """
+        Account for a write of nlines lines (nbytes bytes) starting at offset, all stamped with timestamp.
+        """
+        if (self._lines is None
+                or (self.every_lines and self._lines >= self.every_lines)
+                or (self.every_bytes and self._bytes >= self.every_bytes)):
+            self._file.write(ENTRY.pack(timestamp, offset))
+            self._lines = 0
+            self._bytes = 0
+        self._lines += nlines
+        self._bytes += nbytes
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class LogIndex:
+
+
+    def __init__(self, logfile: str):
+        """
+        Load the sidecar index of a timestamped log for fast time-range queries.
+
+        :param logfile: A log written by LogSink with indexing enabled (or indexed with LogIndex.rebuild).
+        """
+        self.logfile = logfile
+        path = index_path(logfile)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No index for {logfile}; build one with LogIndex.rebuild('{logfile}')")
+        with open(path, 'rb') as file:
+            data = file.read()
+        usable = len(data) - len(data) % ENTRY.size  # ignore a torn trailing entry
+        entries = list(ENTRY.iter_unpack(data[:usable]))
+        self.timestamps = [t for t, _ in entries]
+        self.offsets = [o for _, o in entries]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @staticmethod
+    def rebuild(logfile: str, every_lines: Optional[int] = 1000, every_bytes: Optional[int] = None) -> 'LogIndex':
+        """
+        Rebuild the sidecar index of an existing timestamped log with one sequential scan.
+
+        :param logfile: The log to index.
+        :param every_lines: Add an entry at least every this many lines (default: 1000).
+        :param every_bytes: Add an entry at least every this many bytes (default: None).
+        """
+        tmp = index_path(logfile) + '.tmp'
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        indexer = LogIndexer(tmp, every_lines, every_bytes)
+        offset = 0
+        with open(logfile, 'rb') as log:
+            for raw in log:
+                timestamp, _ = split_timestamp(raw)
+                if timestamp is not None:
+                    indexer.add(timestamp, offset, 1, len(raw))
+                offset += len(raw)
+        indexer.close()
+        os.replace(tmp, index_path(logfile))
+        print(f"Rebuilt index for {logfile} ({index_path(logfile)})")
+        return LogIndex(logfile)
+
+    def query(self, t_from: Optional[float] = None, t_to: Optional[float] = None) -> Iterator[Tuple[float, str]]:
+        """
+        Yield (timestamp, line) for every log line with t_from <= timestamp <= t_to.
+
+        Seeks straight to the last index entry before t_from, so only the requested range (plus at most one
+        index interval) is read. Assumes timestamps increase through the log.
+
+        :param t_from: Start time in seconds since the epoch (default: start of log).
+        :param t_to: End time in seconds since the epoch (default: end of log).
+        """
+        start = 0
+        if t_from is not None and self.timestamps:
+            i = bisect_left(self.timestamps, t_from) - 1
+            if i >= 0:
+                start = self.offsets[i]
+        with open(self.logfile, 'rb') as log:
+            log.seek(start)
+            yield from filter_lines(log, t_from, t_to)
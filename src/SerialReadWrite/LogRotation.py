@@ -0,0 +1,186 @@
+import gzip
+import json
+import lzma
+import os
+import queue
+import shutil
+import threading
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+try:
+    from .LogIndex import LogIndex, filter_lines
+except ImportError:
+    from LogIndex import LogIndex, filter_lines
+
+
+# Supported segment compression: name -> (file suffix, opener)
+COMPRESSORS = {
+    'gzip': ('.gz', gzip.open),
+    'lzma': ('.xz', lzma.open),
+}
+
+
+def manifest_path(logfile: str) -> str:
+    """Path of the segment manifest for a rotated log."""
+    return logfile + '.manifest.json'
+
+
+class SegmentManifest:
+
+
+    def __init__(self, logfile: str):
+        """
+        The ordered list of rotated segments of a log, stored as JSON next to it.
+
+        Each entry is {"seq", "file", "compressed", "start", "end", "lines"}; "file" is relative to the log's directory.
+
+        :param logfile: The live log file.
+        """
+        self.logfile = logfile
+        self.path = manifest_path(logfile)
+        self._lock = threading.Lock()
+        self.segments: List[dict] = []
+        self.reload()
+
+    def reload(self) -> None:
+        with self._lock:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as file:
+                    self.segments = json.load(file)["segments"]
+            else:
+                self.segments = []
+
+    def _save(self) -> None:
+        # Called with the lock held; write-then-rename so readers never see a partial manifest
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as file:
+            json.dump({"log": os.path.basename(self.logfile), "segments": self.segments}, file, indent=4)
+        os.replace(tmp, self.path)
+
+    def next_seq(self) -> int:
+        with self._lock:
+            return self.segments[-1]["seq"] + 1 if self.segments else 1
+
+    def add(self, entry: dict) -> None:
+        with self._lock:
+            self.segments.append(entry)
+            self._save()
+
+    def update(self, seq: int, **changes) -> None:
+        with self._lock:
+            for entry in self.segments:
+                if entry["seq"] == seq:
+                    entry.update(changes)
+            self._save()
+
+    def segment_path(self, entry: dict) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(self.logfile)), entry["file"])
+
+
+class Compressor:
+
+
+    def __init__(self, manifest: SegmentManifest, method: str = 'gzip'):
+        """
+        Background worker that compresses rotated segments so the writing thread never blocks on compression.
+
+        :param manifest: Manifest updated when a segment has been compressed.
+        :param method: 'gzip' or 'lzma' (default: 'gzip').
+        """
+        if method not in COMPRESSORS:
+            raise ValueError(f"Unsupported compression '{method}' (expected one of {tuple(COMPRESSORS)})")
+        self.manifest = manifest
+        self.method = method
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"Compressor-{manifest.logfile}", daemon=True)
+        self._thread.start()
+
+    def submit(self, entry: dict) -> None:
+        """Queue a rotated (uncompressed) segment for compression."""
+        self._queue.put(entry)
+
+    def _run(self) -> None:
+        suffix, opener = COMPRESSORS[self.method]
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                self._queue.task_done()
+                return
+            src = self.manifest.segment_path(entry)
+            dst = src + suffix
+            try:
+                with open(src, 'rb') as fin, opener(dst + '.tmp', 'wb') as fout:
+                    shutil.copyfileobj(fin, fout, 1 << 20)
+                os.replace(dst + '.tmp', dst)
+                self.manifest.update(entry["seq"], file=entry["file"] + suffix, compressed=self.method)
+                os.remove(src)
+                if os.path.exists(src + '.idx'):
+                    os.remove(src + '.idx')  # byte offsets do not apply to the compressed segment
+            except OSError as e:
+                print(f"Error: Could not compress log segment {src}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the worker after the queued segments are done (if wait) and join it."""
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+
+def _open_segment(manifest: SegmentManifest, entry: dict):
+    opener = COMPRESSORS[entry["compressed"]][1] if entry.get("compressed") else open
+    return opener(manifest.segment_path(entry), 'rb')
+
+
+def _iter_segment(manifest: SegmentManifest, entry: dict) -> Iterator[bytes]:
+    try:
+        handle = _open_segment(manifest, entry)
+    except FileNotFoundError:
+        # The segment was compressed since the manifest was read
+        manifest.reload()
+        entry = next(e for e in manifest.segments if e["seq"] == entry["seq"])
+        handle = _open_segment(manifest, entry)
+    with handle:
+        yield from handle
+
+
+def iter_log(logfile: str) -> Iterator[bytes]:
+    """
+    Stream the raw lines of a rotated log: every segment in the manifest (decompressing as needed), then the live file.
+
+    :param logfile: The live log file (as passed to LogSink).
+    """
+    manifest = SegmentManifest(logfile)
+    for entry in list(manifest.segments):
+        yield from _iter_segment(manifest, entry)
+    if os.path.exists(logfile):
+        with open(logfile, 'rb') as handle:
+            yield from handle
+
+
+def query_segments(logfile: str, t_from: Optional[float] = None, t_to: Optional[float] = None) -> Iterator[Tuple[float, str]]:
+    """
+    Yield (timestamp, line) between t_from and t_to from the rotated segments of a log (not the live file).
+
+    Segments outside the range (by their manifest start/end) are skipped. An uncompressed segment that still has its
+    `.idx` is read through LogIndex; compressed segments (whose index the Compressor removed) are streamed and filtered.
+
+    :param logfile: The live log file (as passed to LogSink).
+    :param t_from: Start time in seconds since the epoch (default: start of log).
+    :param t_to: End time in seconds since the epoch (default: end of log).
+    """
+    manifest = SegmentManifest(logfile)
+    for entry in list(manifest.segments):
+        if t_from is not None and datetime.fromisoformat(entry["end"]).timestamp() < t_from:
+            continue
+        if t_to is not None and datetime.fromisoformat(entry["start"]).timestamp() > t_to:
+            return
+        if not entry.get("compressed"):
+            try:
+                # Opens the segment before yielding anything, so a segment compressed meanwhile falls through below
+                yield from LogIndex(manifest.segment_path(entry)).query(t_from, t_to)
+                continue
+            except FileNotFoundError:
+                pass
+        yield from filter_lines(_iter_segment(manifest, entry), t_from, t_to)
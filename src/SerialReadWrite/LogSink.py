@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from typing import Iterable, Optional, Union
+from datetime import datetime
+try:
+    from .LogIndex import LogIndexer, index_path
+    from .LogRotation import Compressor, SegmentManifest
+except ImportError:
+    from LogIndex import LogIndexer, index_path
+    from LogRotation import Compressor, SegmentManifest
+
+
+def _as_line(item) -> str:
+    if isinstance(item, str):
+        return item
+    if isinstance(item, bytes):
+        return item.decode('utf-8', 'replace')
+    return str(item)
+
+
+class LogSink:
+
+
+    def __init__(self, filename: str, buffer_size: int = 65536, flush_lines: Optional[int] = 1000,
+                 flush_interval_ms: Optional[float] = 1000, fsync_interval_s: Optional[float] = None,
+                 timestamps: bool = False, index_every_lines: Optional[int] = None, index_every_bytes: Optional[int] = None,
+                 rotate_bytes: Optional[int] = None, rotate_interval_s: Optional[float] = None, compress: Optional[str] = 'gzip'):
+        """
+        Open a persistent, buffered append-only log file.
+
+        Lines are collected in the file's write buffer and flushed to the OS when flush_lines lines are pending,
+        when flush_interval_ms has elapsed since the last flush, or on close(), whichever comes first.
+
+        :param filename: The file to append to (created if missing).
+        :param buffer_size: Size of the write buffer in bytes (default: 65536).
+        :param flush_lines: Flush after this many pending lines; None disables the line trigger (default: 1000).
+        :param flush_interval_ms: Flush pending lines at least this often; None flushes only by line count or on close (default: 1000).
+        :param fsync_interval_s: If set, also fsync the file at most this often so data survives a power loss (default: None).
+        :param timestamps: Prefix each line with the host time as '<epoch seconds>\t' (default: False).
+        :param index_every_lines: Maintain a `<filename>.idx` time index with an entry at least every N lines; implies timestamps (default: None).
+        :param index_every_bytes: Maintain the time index with an entry at least every N bytes; implies timestamps (default: None).
+        :param rotate_bytes: Rotate the log into a numbered segment once it reaches this size (default: None).
+        :param rotate_interval_s: Rotate the log at least this often (default: None).
+        :param compress: Compress rotated segments on a background thread: 'gzip', 'lzma' or None (default: 'gzip').
+            Segments are listed in `<filename>.manifest.json`; read across all of them with LogRotation.iter_log().
+        """
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self.flush_lines = flush_lines
+        self.flush_interval_ms = flush_interval_ms
+        self.fsync_interval_s = fsync_interval_s
+        self.timestamps = timestamps or bool(index_every_lines or index_every_bytes)
+        self.index_every_lines = index_every_lines
+        self.index_every_bytes = index_every_bytes
+        self.rotate_bytes = rotate_bytes
+        self.rotate_interval_s = rotate_interval_s
+        self.lines_written = 0
+        self._pending = 0
+        self._last_fsync = time.monotonic()
+        self._lock = threading.Lock()
+        self._manifest: Optional[SegmentManifest] = None
+        self._compressor: Optional[Compressor] = None
+        if rotate_bytes or rotate_interval_s:
+            self._manifest = SegmentManifest(filename)
+            if compress:
+                self._compressor = Compressor(self._manifest, compress)
+        self._open()
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval_ms:
+            self._flusher = threading.Thread(target=self._flush_periodically, name=f"LogSink-{filename}", daemon=True)
+            self._flusher.start()
+
+    def _open(self) -> None:
+        self._file = open(self.filename, 'ab', buffering=self.buffer_size)
+        self._offset = self._file.tell()  # byte offset where the next line starts
+        self._indexer: Optional[LogIndexer] = None
+        if self.index_every_lines or self.index_every_bytes:
+            self._indexer = LogIndexer(index_path(self.filename), self.index_every_lines, self.index_every_bytes)
+        self._segment_opened = time.monotonic()
+        self._segment_start = datetime.now().isoformat()
+        self._segment_lines = 0
+
+    def _rotate_locked(self) -> None:
+        # Called with the lock held: move the live file aside as the next segment and start a fresh one.
+        # Only renames happen here; compression runs on the Compressor thread.
+        self._file.close()
+        if self._indexer is not None:
+            self._indexer.close()
+        seq = self._manifest.next_seq()
+        name = f"{os.path.basename(self.filename)}.{seq:05d}"
+        path = os.path.join(os.path.dirname(os.path.abspath(self.filename)), name)
+        os.replace(self.filename, path)
+        if os.path.exists(index_path(self.filename)):
+            os.replace(index_path(self.filename), index_path(path))
+        entry = {"seq": seq, "file": name, "compressed": None, "start": self._segment_start,
+                 "end": datetime.now().isoformat(), "lines": self._segment_lines}
+        self._manifest.add(entry)
+        if self._compressor is not None:
+            self._compressor.submit(dict(entry))
+        self._open()
+
+    def rotate(self) -> None:
+        """Rotate the log now (requires rotate_bytes or rotate_interval_s to be configured)."""
+        if self._manifest is None:
+            raise Exception("Log rotation is not enabled; set rotate_bytes and/or rotate_interval_s.")
+        with self._lock:
+            if not self._file.closed and self._offset > 0:
+                self._rotate_locked()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write(self, line: Union[str, bytes, list, object]) -> None:
+        """
+        Append one line (a newline is added). Also the write(item) of a Pipeline sink: a list, such as the output of
+        batch(), is written as one line per element, and other items (e.g. parsed records) as str(item).
+
+        :param line: The line to write.
+        """
+        if isinstance(line, list):
+            self.write_lines(map(_as_line, line))
+        else:
+            self.write_lines((_as_line(line),))
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """
+        Append several lines with a single buffered write.
+
+        :param lines: The lines to write (newlines are added).
+        """
+        lines = list(lines)
+        if not lines:
+            return
+        if self.timestamps:
+            timestamp = time.time()
+            prefix = f"{timestamp:.6f}\t"
+            data = (prefix + ('\n' + prefix).join(lines) + '\n').encode('utf-8')
+        else:
+            data = ('\n'.join(lines) + '\n').encode('utf-8')
+        with self._lock:
+            self._file.write(data)
+            if self._indexer is not None:
+                self._indexer.add(timestamp, self._offset, len(lines), len(data))
+            self._offset += len(data)
+            self._segment_lines += len(lines)
+            self._after_write(len(lines))
+            if self._manifest is not None and (
+                    (self.rotate_bytes and self._offset >= self.rotate_bytes)
+                    or (self.rotate_interval_s and time.monotonic() - self._segment_opened >= self.rotate_interval_s)):
+                self._pending = 0
+                self._rotate_locked()
+
+    def _after_write(self, count: int) -> None:
+        # Called with the lock held
+        self.lines_written += count
+        self._pending += count
+        if self.flush_lines and self._pending >= self.flush_lines:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._file.flush()
+        if self._indexer is not None:
+            self._indexer.flush()
+        self._pending = 0
+        if self.fsync_interval_s is not None and time.monotonic() - self._last_fsync >= self.fsync_interval_s:
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+
+    def _flush_periodically(self) -> None:
+        interval = self.flush_interval_ms / 1000.0
+        while not self._stop_event.wait(interval):
+            with self._lock:
+                if self._file.closed:
+                    return
+                if self._pending:
+                    self._flush_locked()
+
+    def flush(self) -> None:
+        """Flush pending lines to the operating system."""
+        with self._lock:
+            if not self._file.closed:
+                self._flush_locked()
+
+    def checkpoint(self) -> None:
+        """Flush pending lines and fsync so everything written so far is durable on disk."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._pending = 0
+                os.fsync(self._file.fileno())
+                self._last_fsync = time.monotonic()
+
+    def close(self) -> None:
+        """Flush, optionally fsync, and close the file."""
+        self._stop_event.set()
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            if self.fsync_interval_s is not None:
+                os.fsync(self._file.fileno())
+            self._file.close()
+            if self._indexer is not None:
+                self._indexer.close()
+        if self._flusher and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        if self._compressor is not None:
+            self._compressor.close()  # finish compressing segments already rotated
+
+    def __enter__(self) -> 'LogSink':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from typing import Callable, Optional
+
+
+class ReaderMetrics:
+
+    # Loop-time histogram: bucket i counts iterations that took < 2**i microseconds (last bucket: everything slower)
+    BUCKETS = 24
+
+    def __init__(self):
+        """
+        Always-on acquisition counters. Updates are plain integer increments made by the single reading thread,
+        so they cost next to nothing; snapshot() may be called from any thread.
+        """
+        self.started = time.time()
+        self.bytes_received = 0
+        self.lines_received = 0
+        self.decode_errors = 0
+        self.peak_in_waiting = 0
+        self.loop_histogram = [0] * ReaderMetrics.BUCKETS
+
+    def record_read(self, nbytes: int, nlines: int, in_waiting: int) -> None:
+        self.bytes_received += nbytes
+        self.lines_received += nlines
+        if in_waiting > self.peak_in_waiting:
+            self.peak_in_waiting = in_waiting
+
+    def record_loop(self, seconds: float) -> None:
+        bucket = int(seconds * 1e6).bit_length()
+        self.loop_histogram[min(bucket, ReaderMetrics.BUCKETS - 1)] += 1
+
+    def _loop_percentile(self, q: float) -> Optional[float]:
+        # Upper bound (seconds) of the histogram bucket holding the q-th quantile
+        total = sum(self.loop_histogram)
+        if not total:
+            return None
+        target = q * total
+        running = 0
+        for i, count in enumerate(self.loop_histogram):
+            running += count
+            if running >= target:
+                return (1 << i) / 1e6
+        return None
+
+    def snapshot(self, lines_dropped: int = 0, bytes_dropped: int = 0, buffered: int = 0, buffer_size: int = 0,
+                 since: Optional[dict] = None) -> dict:
+        """
+        Return the counters and derived rates as a JSON-serialisable dict.
+
+        :param since: A previous snapshot; bytes_per_s/lines_per_s are computed since it (default: since the start).
+        """
+        now = time.time()
+        bytes_received, lines_received = self.bytes_received, self.lines_received
+        uptime = max(now - self.started, 1e-9)
+        if since is None:
+            since = {"time": self.started, "bytes_received": 0, "lines_received": 0}
+        interval = max(now - since["time"], 1e-9)
+        return {
+            "time": now,
+            "uptime_s": uptime,
+            "bytes_received": bytes_received,
+            "lines_received": lines_received,
+            "decode_errors": self.decode_errors,
+            "lines_dropped": lines_dropped,
+            "bytes_dropped": bytes_dropped,
+            "peak_in_waiting": self.peak_in_waiting,
+            "buffered": buffered,
+            "buffer_size": buffer_size,
+            "bytes_per_s": (bytes_received - since["bytes_received"]) / interval,
+            "lines_per_s": (lines_received - since["lines_received"]) / interval,
+            "avg_bytes_per_s": bytes_received / uptime,
+            "avg_lines_per_s": lines_received / uptime,
+            "loop_time_p50_s": self._loop_percentile(0.50),
+            "loop_time_p99_s": self._loop_percentile(0.99),
+            "loop_histogram_us": {f"<{1 << i}": n for i, n in enumerate(self.loop_histogram) if n},
+        }
+
+
+class MetricsDumper:
+
+
+    def __init__(self, snapshot: Callable[[Optional[dict]], dict], filename: str, interval_s: float = 10.0):
+        """
+        Periodically append JSON snapshots (one object per line) to a file, e.g. for alerting when the host falls behind.
+
+        :param snapshot: Callable taking the previous snapshot (or None) and returning a new one (e.g. SerialReader.stats).
+        :param filename: File the JSON lines are appended to.
+        :param interval_s: Seconds between dumps (default: 10).
+        """
+        self.snapshot = snapshot
+        self.filename = filename
+        self.interval_s = interval_s
+        self._last: Optional[dict] = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"MetricsDumper-{filename}", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval_s):
+            self.dump()
+
+    def dump(self) -> None:
+        with open(self.filename, 'a') as file:
+            self._last = self.snapshot(self._last)
+            file.write(json.dumps(self._last) + '\n')
+
+    def close(self) -> None:
+        """Stop dumping (a final snapshot is written)."""
+        self._stop_event.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self.dump()
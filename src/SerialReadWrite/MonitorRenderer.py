@@ -0,0 +1,162 @@
+import re
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, Optional, TextIO
+
+
+# Label at the start of a line, e.g. "Temp" in "Temp = 21.5" or "Time since start" in "Time since start: 1200"
+_LABEL = re.compile(r'\s*([^=:]+?)\s*[=:]')
+
+
+def _is_hub_line(item) -> bool:
+    # SerialHub.HubLine, checked structurally so this module does not import the hub
+    return isinstance(item, tuple) and hasattr(item, 'port') and hasattr(item, 'line')
+
+
+def format_item(item) -> str:
+    """Display text of a monitor item: '[port] line' for SerialHub lines, str() of anything else."""
+    if _is_hub_line(item):
+        line = item.line.decode('utf-8', 'replace') if isinstance(item.line, bytes) else item.line
+        return f"[{item.port}] {line}"
+    if isinstance(item, bytes):
+        return item.decode('utf-8', 'replace')
+    return item if isinstance(item, str) else str(item)
+
+
+def default_key(item) -> str:
+    """Key of the 'latest' view: the port of a SerialHub line, the first field of a record, else the line's label
+    (unlabeled lines share one row)."""
+    if _is_hub_line(item):
+        return item.port
+    if isinstance(item, tuple):
+        return str(item[0]) if item else ''
+    text = format_item(item)
+    m = _LABEL.match(text)
+    return m.group(1) if m else ''
+
+
+class MonitorRenderer:
+
+    TAIL = 'tail'       # the newest lines of each tick
+    HEAD = 'head'       # the oldest lines of each tick
+    LATEST = 'latest'   # one line per key, redrawn in place
+
+    def __init__(self, refresh_hz: float = 30.0, max_lines: int = 100, view: str = TAIL,
+                 key: Callable[[object], str] = default_key, fmt: Callable[[object], str] = format_item,
+                 out: Optional[TextIO] = None):
+        """
+        Coalescing terminal renderer for the live monitor. Lines are collected as they arrive and written with a
+        single write() per refresh tick; at most max_lines per tick are shown and the rest are reported as
+        "N lines skipped", so a slow terminal never holds back acquisition.
+
+        :param refresh_hz: Terminal writes per second (default: 30).
+        :param max_lines: Lines shown per tick; only the newest ('tail') or oldest ('head') are kept, or the most
+            recently updated keys ('latest') (default: 100).
+        :param view: 'tail', 'head' or 'latest' (the last line per key, redrawn in place) (default: 'tail').
+        :param key: Key of a line for the 'latest' view (default: default_key).
+        :param fmt: Display text of a line (default: format_item).
+        :param out: Stream written to (default: sys.stdout).
+        """
+        if view not in (MonitorRenderer.TAIL, MonitorRenderer.HEAD, MonitorRenderer.LATEST):
+            raise ValueError(f"Unsupported view '{view}' (expected 'tail', 'head' or 'latest')")
+        self.refresh_hz = refresh_hz
+        self.interval = 1.0 / refresh_hz
+        self.max_lines = max_lines
+        self.view = view
+        self.key = key
+        self.fmt = fmt
+        self.out = out if out is not None else sys.stdout
+        self.lines_in = 0         # lines received
+        self.lines_shown = 0      # lines written to the terminal
+        self.renders = 0          # terminal writes
+        self._pending: deque = deque(maxlen=max_lines if view == MonitorRenderer.TAIL else None)
+        self._pending_count = 0   # lines received since the last render
+        self._latest: Dict[str, object] = {}     # key -> newest line, in first-seen order so rows keep their place
+        self._recency: OrderedDict = OrderedDict()  # the same keys, least recently updated first
+        self._unshown: set = set()                # keys whose newest line has not been drawn yet
+        self._replaced = 0                        # 'latest' lines overwritten or evicted before they were drawn
+        self._drawn = 0           # lines of the last 'latest' block, to redraw it in place
+        self._next_render = time.monotonic() + self.interval
+
+    @property
+    def lines_skipped(self) -> int:
+        if self.view == MonitorRenderer.LATEST:
+            return self._replaced
+        return self.lines_in - self.lines_shown - self._pending_count
+
+    @property
+    def due(self) -> float:
+        """Seconds until the next render is due (0 if it is)."""
+        return max(self._next_render - time.monotonic(), 0.0)
+
+    def add(self, items: Iterable) -> None:
+        """Collect received lines; nothing is written until tick() or flush()."""
+        for item in items:
+            self.lines_in += 1
+            self._pending_count += 1
+            if self.view == MonitorRenderer.LATEST:
+                self._add_latest(item)
+            elif self.view == MonitorRenderer.TAIL or len(self._pending) < self.max_lines:
+                self._pending.append(item)
+
+    def _add_latest(self, item) -> None:
+        key = self.key(item)
+        if key in self._unshown:
+            self._replaced += 1
+        self._unshown.add(key)
+        self._latest[key] = item
+        self._recency[key] = None
+        self._recency.move_to_end(key)
+        if len(self._latest) > self.max_lines:
+            # Forget the key updated longest ago; the other rows stay where they are
+            stale, _ = self._recency.popitem(last=False)
+            del self._latest[stale]
+            if stale in self._unshown:
+                self._unshown.discard(stale)
+                self._replaced += 1
+
+    def tick(self) -> bool:
+        """Render if the refresh interval has passed. Returns True if it rendered."""
+        now = time.monotonic()
+        if now < self._next_render:
+            return False
+        # Catch up without bursting if a render (i.e. the terminal) was slower than the interval
+        self._next_render = max(self._next_render + self.interval, now)
+        self.flush()
+        return True
+
+    def flush(self) -> None:
+        """Write everything collected since the last render in one write()."""
+        if not self._pending_count:
+            return
+        if self.view == MonitorRenderer.LATEST:
+            text = self._render_latest()
+        else:
+            shown = [self.fmt(item) for item in self._pending]
+            skipped = self._pending_count - len(shown)
+            if skipped:
+                marker = f"... {skipped} lines skipped ..."
+                shown = [marker] + shown if self.view == MonitorRenderer.TAIL else shown + [marker]
+            text = '\n'.join(shown) + '\n'
+            self.lines_shown += len(self._pending)
+            self._pending.clear()
+        self._pending_count = 0
+        self.out.write(text)
+        self.out.flush()
+        self.renders += 1
+
+    def _render_latest(self) -> str:
+        rows = [self.fmt(item) for item in self._latest.values()]  # each line already shows its key
+        self.lines_shown += len(self._unshown)
+        self._unshown.clear()
+        prefix = ''
+        if self._drawn and self.out.isatty():
+            prefix = f"\x1b[{self._drawn}F\x1b[J"  # back to the start of the previous block and clear it
+        elif self._drawn:
+            prefix = '---\n'
+        self._drawn = len(rows)
+        return prefix + '\n'.join(rows) + '\n'
+
+    def summary(self) -> str:
+        return f"{self.lines_in} lines received, {self.lines_shown} shown, {self.lines_skipped} skipped, {self.renders} refreshes"
@@ -0,0 +1,175 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+try:
+    from .LineParser import LineParser
+except ImportError:
+    from LineParser import LineParser
+
+
+# Per-worker state, set once by the pool initializer so the parser is not pickled with every chunk
+_worker_parse: Optional[Callable] = None
+_worker_checksum: Optional[str] = None
+
+
+def nmea_checksum_ok(line: str) -> Tuple[bool, str]:
+    """
+    Check an NMEA-style '<payload>*HH' line (HH = hex XOR of the payload characters, a leading '$' excluded).
+
+    :return: (valid, payload without the '$' and the checksum suffix)
+    """
+    payload, sep, digest = line.rpartition('*')
+    if not sep or len(digest) != 2:
+        return False, line
+    if payload.startswith('$'):
+        payload = payload[1:]
+    value = 0
+    for char in payload:
+        value ^= ord(char)
+    try:
+        return value == int(digest, 16), payload
+    except ValueError:
+        return False, line
+
+
+def init_worker(parser: Union[LineParser, Callable, None], checksum: Optional[str]) -> None:
+    """Set the parser and checksum parse_chunk() uses in this process (the pool initializer; also for inline use)."""
+    global _worker_parse, _worker_checksum
+    _worker_parse = parser.parse if isinstance(parser, LineParser) else parser
+    _worker_checksum = checksum
+
+
+def parse_chunk(data: bytes) -> Tuple[list, int, int]:
+    """
+    Decode, checksum and parse a chunk of complete lines (runs in a worker process).
+
+    :return: (records, malformed lines, lines failing the checksum)
+    """
+    records = []
+    malformed = bad_checksum = 0
+    for line in data.decode('utf-8', 'replace').split('\n'):
+        line = line.rstrip()
+        if not line:
+            continue
+        if _worker_checksum == 'nmea':
+            valid, line = nmea_checksum_ok(line)
+            if not valid:
+                bad_checksum += 1
+                continue
+        if _worker_parse is None:
+            records.append(line)
+            continue
+        record = _worker_parse(line)
+        if record is None:
+            malformed += 1
+        else:
+            records.append(record)
+    return records, malformed, bad_checksum
+
+
+class ParallelParser:
+
+
+    def __init__(self, parser: Union[LineParser, Callable, None] = None, checksum: Optional[str] = None,
+                 workers: Optional[int] = None, max_pending: Optional[int] = None):
+        """
+        Decode/validate/parse stage that runs in a pool of worker processes, so CPU-heavy parsing of many ports is not
+        limited by the GIL. Acquisition threads submit() byte chunks of complete lines; results() hands the records
+        back in submission order for each port.
+
+        Workers are started with 'forkserver' where available ('spawn' otherwise) rather than forked from a process
+        that is running acquisition threads, so the parser must be picklable and scripts need an
+        `if __name__ == "__main__":` guard.
+
+        :param parser: LineParser or picklable function line -> record (None: decoded lines only) (default: None).
+        :param checksum: 'nmea' to require and strip a '*HH' XOR checksum on every line (default: None).
+        :param workers: Worker processes (default: os.cpu_count()).
+        :param max_pending: Chunks being parsed before submit() blocks (default: 4 per worker).
+        """
+        if checksum not in (None, 'nmea'):
+            raise ValueError(f"Unsupported checksum '{checksum}' (expected 'nmea')")
+        self.parser = parser
+        self.checksum = checksum
+        self.workers = workers or os.cpu_count() or 1
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method),
+                                         initializer=init_worker, initargs=(parser, checksum))
+        self.max_pending = max_pending or 4 * self.workers
+        self.chunks = 0          # chunks parsed
+        self.malformed = 0       # lines the parser rejected
+        self.bad_checksum = 0    # lines failing the checksum
+        self.failed = 0          # chunks lost to a worker error (e.g. the parser raised, or a worker died)
+        self._ports: Dict[str, deque] = {}   # port -> deque of (timestamp, future), oldest first
+        self._pending = 0    # submitted, not returned by results() yet
+        self._running = 0    # submitted, not parsed yet
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+
+    def submit(self, port: str, data: bytes, timestamp: Optional[float] = None) -> None:
+        """
+        Queue a chunk of complete lines received on port. Blocks while max_pending chunks are being parsed.
+
+        :param port: Port the data came from; results keep the submission order per port.
+        :param data: Raw bytes ending with a line terminator.
+        :param timestamp: Receive time reported with the records (default: time.time()).
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._done:
+            self._done.wait_for(lambda: self._running < self.max_pending)
+            self._pending += 1
+            self._running += 1
+            future = self._pool.submit(parse_chunk, bytes(data))
+            self._ports.setdefault(port, deque()).append((timestamp, future))
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, _future) -> None:
+        with self._done:
+            self._running -= 1
+            self._done.notify_all()
+
+    def results(self, timeout: Optional[float] = 0) -> List[Tuple[str, float, list]]:
+        """
+        Return the finished chunks as (port, timestamp, records), in order per port. A chunk is only returned once
+        every earlier chunk of its port has been. Chunks whose worker failed are counted in `failed` and skipped.
+
+        :param timeout: Seconds to wait for at least one chunk (default: 0, don't wait; None waits forever).
+        """
+        out = []
+        with self._done:
+            self._done.wait_for(self._ready, timeout)
+            for port, queue in self._ports.items():
+                while queue and queue[0][1].done():
+                    timestamp, future = queue.popleft()
+                    self._pending -= 1
+                    try:
+                        records, malformed, bad_checksum = future.result()
+                    except Exception as e:
+                        self.failed += 1
+                        print(f"Error: Parsing a chunk from port {port} failed: {e!r}")
+                        continue
+                    self.chunks += 1
+                    self.malformed += malformed
+                    self.bad_checksum += bad_checksum
+                    out.append((port, timestamp, records))
+        return out
+
+    def _ready(self) -> bool:
+        return any(queue and queue[0][1].done() for queue in self._ports.values())
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def close(self, wait: bool = True) -> None:
+        """Shut the worker pool down (waiting for the submitted chunks if wait)."""
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self) -> 'ParallelParser':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
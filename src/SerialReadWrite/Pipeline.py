@@ -0,0 +1,234 @@
+import socket
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+# Stages: generator functions taking an iterable and yielding lazily, one item at a time.
+# Time-based stages use arrival time (time.monotonic() when the stage sees an item) and, being pull-based,
+# close a window when the first item after it arrives (or the stream ends).
+
+def filter_stage(items: Iterable, predicate: Callable[[Any], bool]) -> Iterator:
+    """Yield the items for which predicate(item) is true."""
+    for item in items:
+        if predicate(item):
+            yield item
+
+
+def map_stage(items: Iterable, fn: Callable[[Any], Any], skip_none: bool = False) -> Iterator:
+    """Yield fn(item) for every item (dropping None results if skip_none, e.g. unparseable lines)."""
+    for item in items:
+        result = fn(item)
+        if result is not None or not skip_none:
+            yield result
+
+
+def decimate_stage(items: Iterable, n: int) -> Iterator:
+    """Yield every n-th item (the first, then n-1 skipped, ...)."""
+    if n < 1:
+        raise ValueError(f"decimate factor must be at least 1, got {n}")
+    for i, item in enumerate(items):
+        if i % n == 0:
+            yield item
+
+
+def batch_stage(items: Iterable, n: Optional[int] = None, t: Optional[float] = None) -> Iterator[list]:
+    """
+    Group items into lists of n items and/or spanning at most t seconds (tumbling windows: each item in exactly one).
+
+    :param n: Maximum items per batch.
+    :param t: Maximum seconds between the first item of a batch and the last.
+    """
+    if n is None and t is None:
+        raise ValueError("batch needs a size n, a duration t, or both")
+    batch: list = []
+    start = 0.0
+    for item in items:
+        if t is not None:
+            now = time.monotonic()
+            if batch and now - start >= t:
+                yield batch
+                batch = []
+            if not batch:
+                start = now
+        batch.append(item)
+        if n is not None and len(batch) >= n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def sliding_stage(items: Iterable, size: Optional[int] = None, t: Optional[float] = None, step: int = 1) -> Iterator[tuple]:
+    """
+    Yield overlapping windows as tuples: the last `size` items and/or the items of the last t seconds,
+    every `step` items. Memory is bounded by the window, not the stream.
+
+    :param size: Window length in items.
+    :param t: Window length in seconds.
+    :param step: Items between emitted windows (default: 1).
+    """
+    if size is None and t is None:
+        raise ValueError("sliding window needs a size, a duration t, or both")
+    window: deque = deque(maxlen=size)
+    stamps: deque = deque(maxlen=size)
+    count = 0
+    for item in items:
+        window.append(item)
+        if t is not None:
+            now = time.monotonic()
+            stamps.append(now)
+            while stamps[0] < now - t:
+                stamps.popleft()
+                window.popleft()
+        count += 1
+        # The first full window is emitted, then one every `step` items
+        if (size is None or len(window) == size) and (count - (size or 1)) % step == 0:
+            yield tuple(window)
+
+
+def tee_stage(items: Iterable, sink: 'Sink') -> Iterator:
+    """Write every item to sink and pass it on."""
+    for item in items:
+        sink.write(item)
+        yield item
+
+
+class Sink(ABC):
+
+
+    def __init__(self):
+        """
+        Destination at the end of a pipeline. Anything with write(item) (and optionally close()) can be used as a sink,
+        e.g. LogSink for files; subclasses here cover callbacks and sockets.
+        """
+
+    @abstractmethod
+    def write(self, item: Any) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'Sink':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class CallbackSink(Sink):
+
+
+    def __init__(self, callback: Callable[[Any], None]):
+        """
+        Call callback(item) for every item.
+
+        :param callback: Function receiving each item.
+        """
+        super().__init__()
+        self.callback = callback
+
+    def write(self, item: Any) -> None:
+        self.callback(item)
+
+
+class SocketSink(Sink):
+
+
+    def __init__(self, address: Union[str, Tuple[str, int], socket.socket], encoding: str = 'utf-8'):
+        """
+        Send every item as a text line over a stream socket.
+
+        :param address: A connected socket, a (host, port) tuple for TCP or a path for a Unix domain socket.
+        :param encoding: Encoding of str(item) (default: 'utf-8'); bytes items are sent as they are.
+        """
+        super().__init__()
+        if isinstance(address, socket.socket):
+            self.socket = address
+        elif isinstance(address, str):
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(address)
+        else:
+            self.socket = socket.create_connection(address)
+        self.encoding = encoding
+
+    def write(self, item: Any) -> None:
+        data = item if isinstance(item, bytes) else str(item).encode(self.encoding)
+        self.socket.sendall(data + b'\n')
+
+    def close(self) -> None:
+        self.socket.close()
+
+
+class Pipeline:
+
+
+    def __init__(self, source: Iterable):
+        """
+        Lazily chained processing stages over a stream of items (e.g. SerialReader.pipeline()). Every method returns a
+        new Pipeline; nothing is read until it is iterated or run with to().
+
+            reader.pipeline().filter(lambda l: 'Data' in l).map(parser.parse, skip_none=True).batch(100).to(sink)
+
+        :param source: Any iterable, typically the (endless) line stream of a SerialReader.
+        """
+        self.source = source
+
+    def __iter__(self) -> Iterator:
+        return iter(self.source)
+
+    def filter(self, predicate: Callable[[Any], bool]) -> 'Pipeline':
+        return Pipeline(filter_stage(self.source, predicate))
+
+    def map(self, fn: Callable[[Any], Any], skip_none: bool = False) -> 'Pipeline':
+        return Pipeline(map_stage(self.source, fn, skip_none))
+
+    def decimate(self, n: int) -> 'Pipeline':
+        return Pipeline(decimate_stage(self.source, n))
+
+    def batch(self, n: Optional[int] = None, t: Optional[float] = None) -> 'Pipeline':
+        return Pipeline(batch_stage(self.source, n, t))
+
+    def tumbling(self, n: Optional[int] = None, t: Optional[float] = None) -> 'Pipeline':
+        """Non-overlapping windows of n items and/or t seconds (same as batch)."""
+        return self.batch(n, t)
+
+    def sliding(self, size: Optional[int] = None, t: Optional[float] = None, step: int = 1) -> 'Pipeline':
+        return Pipeline(sliding_stage(self.source, size, t, step))
+
+    def tee(self, sink: Sink) -> 'Pipeline':
+        return Pipeline(tee_stage(self.source, sink))
+
+    def take(self, n: int) -> List:
+        """Run the pipeline until n items came out and return them."""
+        result = []
+        if n <= 0:
+            return result
+        for item in self.source:
+            result.append(item)
+            if len(result) >= n:
+                break
+        return result
+
+    def to(self, *sinks: Sink, close: bool = True) -> int:
+        """
+        Run the pipeline, writing every item to each sink, until the source ends (or KeyboardInterrupt).
+
+        :param sinks: Objects with write(item), e.g. Sink subclasses or LogSink.
+        :param close: Close the sinks afterwards (default: True).
+        :return: The number of items written.
+        """
+        count = 0
+        try:
+            for item in self.source:
+                for sink in sinks:
+                    sink.write(item)
+                count += 1
+        finally:
+            if close:
+                for sink in sinks:
+                    if hasattr(sink, 'close'):
+                        sink.close()
+        return count
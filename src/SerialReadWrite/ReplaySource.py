@@ -0,0 +1,216 @@
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+try:
+    from .SerialReader import SerialReader
+    from .Capture import CaptureFile, MAGIC
+    from .LogIndex import split_timestamp
+    from .LogRotation import iter_log
+    from .Metrics import ReaderMetrics
+except ImportError:
+    from SerialReader import SerialReader
+    from Capture import CaptureFile, MAGIC
+    from LogIndex import split_timestamp
+    from LogRotation import iter_log
+    from Metrics import ReaderMetrics
+
+
+def iter_recording(filename: str) -> Iterator[Tuple[Optional[float], bytes]]:
+    """
+    Yield (timestamp, line) from a recording: a capture file (CaptureWriter with raw lines), a timestamped log
+    (LogSink(timestamps=True), including rotated segments) or plain text such as serial_output.txt (timestamp None).
+    Lines are raw bytes without their terminator.
+    """
+    with open(filename, 'rb') as file:
+        is_capture = file.read(len(MAGIC)) == MAGIC
+    if is_capture:
+        with CaptureFile(filename) as capture:
+            names = [name for name, _ in capture.fields]
+            if 'line_offset' not in names:
+                raise Exception(f"{filename} was captured without raw lines and cannot be replayed")
+            t, off, length = names.index('timestamp'), names.index('line_offset'), names.index('line_length')
+            for record in capture.records():
+                yield record[t], capture.line(record[off], record[length])
+        return
+    for raw in iter_log(filename):
+        raw = raw.rstrip(b'\r\n')
+        if raw:
+            yield split_timestamp(raw)
+
+
+class ReplayPort:
+
+    MAX_READY = 1 << 16  # released-but-unread bytes after which releasing pauses (bounds memory at unlimited speed)
+
+    def __init__(self, filename: str, speed: Optional[float] = 1.0, rate_hz: Optional[float] = None, loop: bool = False,
+                 timeout: Optional[float] = 1.0, on_finished=None):
+        """
+        Stand-in for serial.Serial that releases the bytes of a recording on the recorded schedule, so every
+        SerialReader read path (readline, bulk reads, the threaded reader) works on it unchanged.
+
+        :param filename: The recording (see iter_recording).
+        :param speed: Playback speed factor for timestamped recordings; None replays as fast as possible (default: 1.0).
+        :param rate_hz: Lines per second for recordings without timestamps, before speed; None as fast as possible.
+        :param loop: Start over at the end of the recording (default: False).
+        :param timeout: Read timeout in seconds, as for serial.Serial (default: 1.0).
+        :param on_finished: Called once when the recording has been fully read.
+        """
+        self.filename = filename
+        self.speed = speed
+        self.rate_hz = rate_hz
+        self.loop = loop
+        self.timeout = timeout
+        self.on_finished = on_finished
+        self.is_open = True
+        self.lines_replayed = 0
+        self._ready = bytearray()      # released bytes not read yet
+        self._next: Optional[Tuple[float, bytes]] = None   # (due time, line) of the next line to release
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._restart()
+
+    def _restart(self) -> None:
+        self._lines = iter_recording(self.filename)
+        self._t0: Optional[float] = None    # first timestamp of the recording
+        self._start = time.monotonic()
+        self._index = 0
+        self._next = None
+
+    def _schedule(self) -> bool:
+        # Load the next line and its due time; False at the end of the recording
+        while True:
+            try:
+                timestamp, line = next(self._lines)
+                break
+            except StopIteration:
+                if not self.loop or self._index == 0:
+                    return False
+                self._restart()
+        if self.speed is None:
+            due = 0.0
+        elif timestamp is not None:
+            if self._t0 is None:
+                self._t0 = timestamp
+            due = self._start + max(timestamp - self._t0, 0.0) / self.speed
+        elif self.rate_hz:
+            due = self._start + self._index / (self.rate_hz * self.speed)
+        else:
+            due = 0.0
+        self._index += 1
+        self._next = (due, line + b'\r\n')
+        return True
+
+    def _release(self) -> Optional[float]:
+        # Move every due line into _ready; returns the due time of the next pending line (None at the end)
+        now = time.monotonic()
+        while True:
+            if self._next is None and not self._schedule():
+                if self.is_open and not self._ready:
+                    self.is_open = False
+                    if self.on_finished is not None:
+                        self.on_finished()
+                return None
+            due, line = self._next
+            if due > now:
+                return due
+            if len(self._ready) >= ReplayPort.MAX_READY:
+                return now  # like a full receive buffer: release more once this has been read
+            self._ready += line
+            self.lines_replayed += 1
+            self._next = None
+
+    @property
+    def in_waiting(self) -> int:
+        with self._lock:
+            self._release()
+            return len(self._ready)
+
+    def _wait(self, until: Optional[float], predicate) -> None:
+        # Release lines until predicate() holds, the timeout expires or the recording ends
+        self._cancel.clear()
+        while True:
+            with self._lock:
+                due = self._release()
+                if predicate() or due is None:
+                    return
+            now = time.monotonic()
+            if until is not None and now >= until:
+                return
+            wake = due if until is None else min(due, until)
+            if self._cancel.wait(max(wake - now, 0)):
+                return
+
+    def read(self, size: int = 1) -> bytes:
+        until = None if self.timeout is None else time.monotonic() + self.timeout
+        self._wait(until, lambda: len(self._ready) > 0)
+        with self._lock:
+            data = bytes(self._ready[:size])
+            del self._ready[:size]
+        return data
+
+    def readline(self) -> bytes:
+        until = None if self.timeout is None else time.monotonic() + self.timeout
+        self._wait(until, lambda: b'\n' in self._ready)
+        with self._lock:
+            end = self._ready.find(b'\n') + 1 or len(self._ready)
+            data = bytes(self._ready[:end])
+            del self._ready[:end]
+        return data
+
+    def write(self, data: bytes) -> int:
+        return len(data)  # a recording cannot be written to
+
+    def cancel_read(self) -> None:
+        self._cancel.set()
+
+    def close(self) -> None:
+        self.is_open = False
+        self.cancel_read()
+
+
+class ReplaySource(SerialReader):
+
+
+    def __init__(self, filename: str, speed: Optional[float] = 1.0, rate_hz: Optional[float] = None, loop: bool = False,
+                 **kwargs):
+        """
+        Replay a recorded log or capture through the normal SerialReader interface (read_serial, read_serial_bulk,
+        threaded get/get_batch, lines()/pipeline(), display_to_command, stats, ...), to reproduce field issues and
+        load-test consumers without hardware.
+
+        :param filename: A capture file, a timestamped log (LogSink(timestamps=True)) or a plain text log.
+        :param speed: Replay at this multiple of the recorded timing; None replays as fast as possible (default: 1.0).
+        :param rate_hz: Lines per second for plain text recordings, which carry no timing; None as fast as possible (default: None).
+        :param loop: Start over at the end of the recording instead of finishing (default: False).
+        :param kwargs: Other SerialReader arguments (timeout, display_to_command, threaded, parser, aggregates, ...).
+        """
+        kwargs.setdefault('display_to_command', False)
+        kwargs.setdefault('profile', None)
+        super().__init__(port=filename, **kwargs)
+        self.filename = filename
+        self.speed = speed
+        self.rate_hz = rate_hz
+        self.loop = loop
+
+    def connect(self) -> None:
+        """Start the replay (the recording's clock starts now)."""
+        self.serial_connection = ReplayPort(self.filename, self.speed, self.rate_hz, self.loop, self.timeout,
+                                            on_finished=self._finished)
+        self.metrics = ReaderMetrics()
+        self._rx_buf = bytearray()
+        speed = "as fast as possible" if self.speed is None else f"at {self.speed:g}x"
+        print(f"\nReplaying {self.filename} {speed}")
+        if self.threaded:
+            self.start_reader()
+        elif self._displayToCmd:
+            self.display_to_command()
+
+    def _finished(self) -> None:
+        # End of the recording: let the threaded reader and the display loop wind down like on a closed port
+        if self._stop_event is not None:
+            self._stop_event.set()
+        self._displayToCmd = False
+
+    @property
+    def lines_replayed(self) -> int:
+        return self.serial_connection.lines_replayed if self.serial_connection is not None else 0
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from typing import Any, List, Optional
+
+
+class RingBuffer:
+
+    # Supported overflow policies
+    DROP_OLDEST = 'drop_oldest'
+    DROP_NEWEST = 'drop_newest'
+    BLOCK = 'block'
+    POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+    def __init__(self, capacity: int = 4096, overflow: str = DROP_OLDEST):
+        """
+        Initialize a bounded, thread-safe FIFO used to hand lines from the reader thread to consumers.
+
+        :param capacity: Maximum number of items held in the buffer (default: 4096).
+        :param overflow: What to do when the buffer is full: 'drop_oldest', 'drop_newest' or 'block' (default: 'drop_oldest').
+        """
+        if capacity <= 0:
+            raise ValueError(f"RingBuffer capacity must be positive, got {capacity}")
+        if overflow not in RingBuffer.POLICIES:
+            raise ValueError(f"Unsupported overflow policy '{overflow}' (expected one of {RingBuffer.POLICIES})")
+        self.capacity = capacity
+        self.overflow = overflow
+        self.dropped = 0           # number of items lost to overflow
+        self.dropped_bytes = 0     # total length of the str/bytes items lost to overflow
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Add an item to the buffer, applying the overflow policy when full.
+
+        :param item: The item to store.
+        :param timeout: Only used by the 'block' policy; maximum seconds to wait for free space (default: wait forever).
+        :return: True if the item was stored, False if it was dropped.
+        """
+        with self._not_full:
+            if self._closed:
+                return False
+            if len(self._items) >= self.capacity:
+                if self.overflow == RingBuffer.DROP_NEWEST:
+                    self._count_drop(item)
+                    return False
+                if self.overflow == RingBuffer.DROP_OLDEST:
+                    self._count_drop(self._items.popleft())
+                else:
+                    if not self._not_full.wait_for(lambda: self._closed or len(self._items) < self.capacity, timeout):
+                        self._count_drop(item)
+                        return False
+                    if self._closed:
+                        return False
+            self._items.append(item)
+            self._not_empty.notify()
+            return True
+
+    def _count_drop(self, item: Any) -> None:
+        self.dropped += 1
+        if isinstance(item, (str, bytes)):
+            self.dropped_bytes += len(item)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Remove and return the oldest item.
+
+        :param timeout: Maximum seconds to wait for an item (default: wait forever). Use 0 for a non-blocking call.
+        :return: The item, or None if the timeout expired or the buffer was closed and drained.
+        """
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._not_full.notify()
+            return item
+
+    def get_batch(self, n: int, timeout: Optional[float] = None) -> List[Any]:
+        """
+        Remove and return up to n items, waiting until n are available or the timeout expires.
+
+        :param n: Maximum number of items to return.
+        :param timeout: Maximum seconds to wait for n items (default: wait forever). Whatever is available when it expires is returned.
+        :return: A list of at most n items (possibly empty).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._not_empty:
+            while len(self._items) < n and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._not_empty.wait(remaining)
+            count = min(n, len(self._items))
+            batch = [self._items.popleft() for _ in range(count)]
+            if count:
+                self._not_full.notify_all()
+            return batch
+
+    def close(self) -> None:
+        """Mark the buffer closed and wake every waiting producer and consumer."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def __iter__(self):
+        """Yield items as they arrive until the buffer is closed and drained."""
+        while True:
+            item = self.get()
+            if item is None and self._closed:
+                return
+            if item is not None:
+                yield item
@@ -0,0 +1,270 @@
+import math
+import re
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batches are then folded in one value at a time
+    np = None
+
+
+# "name = value" / "name: value" pairs, e.g. "Time since start: 1200  ... Data = 7" -> start=1200, Data=7
+_PAIR = re.compile(r'([A-Za-z_]\w*)\s*[=:]\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)')
+
+
+def extract_channels(line: str) -> Dict[str, float]:
+    """Pull every 'name = number' (or 'name: number') pair out of a line."""
+    return {name: float(value) for name, value in _PAIR.findall(line)}
+
+
+class RunningStats:
+
+
+    def __init__(self):
+        """
+        Cumulative count, mean, variance, min and max of a numeric channel, updated in O(1) with Welford's algorithm
+        (numerically stable, no history kept). Batches are merged with Chan's parallel formula.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.first_time: Optional[float] = None
+        self.last_time: Optional[float] = None
+
+    def update(self, x: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if self.first_time is None:
+            self.first_time = now
+        self.last_time = now
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def update_batch(self, values: Sequence[float], now: Optional[float] = None) -> None:
+        """Fold a burst of values in at once (vectorized with NumPy when available)."""
+        n = len(values)
+        if n == 0:
+            return
+        if np is None:
+            for x in values:
+                self.update(x, now)
+            return
+        now = time.monotonic() if now is None else now
+        if self.first_time is None:
+            self.first_time = now
+        self.last_time = now
+        values = np.asarray(values, dtype=np.float64)
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (NaN with fewer than two values)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count > 1 else math.nan
+
+    @property
+    def rate(self) -> float:
+        """Values per second since the first one."""
+        span = (self.last_time - self.first_time) if self.count > 1 else 0.0
+        return (self.count - 1) / span if span > 0 else math.nan
+
+    def summary(self) -> dict:
+        return {"count": self.count, "mean": self.mean if self.count else math.nan, "std": self.std,
+                "min": self.min if self.count else math.nan, "max": self.max if self.count else math.nan, "rate": self.rate}
+
+
+class WindowStats:
+
+
+    def __init__(self, size: Optional[int] = None, t: Optional[float] = None):
+        """
+        Mean, variance, min, max and rate over a sliding window of the last `size` values and/or the last t seconds.
+
+        Every update is amortized O(1): mean/variance use Welford's algorithm with removal of expired values, min/max
+        use monotonic deques (the window's minimum/maximum is always at the front).
+
+        :param size: Window length in values.
+        :param t: Window length in seconds.
+        """
+        if size is None and t is None:
+            raise ValueError("WindowStats needs a size, a duration t, or both")
+        self.size = size
+        self.t = t
+        self._values: deque = deque()    # (time, value)
+        self._min: deque = deque()       # (index, value), values increasing
+        self._max: deque = deque()       # (index, value), values decreasing
+        self._next_index = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def update(self, x: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        index = self._next_index
+        self._next_index += 1
+        self._values.append((now, x))
+        n = len(self._values)
+        delta = x - self.mean
+        self.mean += delta / n
+        self._m2 += delta * (x - self.mean)
+        while self._min and self._min[-1][1] >= x:
+            self._min.pop()
+        self._min.append((index, x))
+        while self._max and self._max[-1][1] <= x:
+            self._max.pop()
+        self._max.append((index, x))
+        self._expire(now)
+
+    def update_batch(self, values: Sequence[float], now: Optional[float] = None) -> None:
+        """Fold a burst of values in; their arrival times are spread evenly since the previous update so rate stays meaningful."""
+        now = time.monotonic() if now is None else now
+        n = len(values)
+        if self.size is not None and n > self.size:
+            values = values[-self.size:]  # older values of the burst would be evicted straight away
+        previous = self._values[-1][0] if self._values else now
+        step = (now - previous) / n if n else 0.0
+        for i, x in enumerate(values, start=n - len(values) + 1):
+            self.update(float(x), previous + i * step)
+
+    def expire(self, now: Optional[float] = None) -> None:
+        """Drop values older than t seconds (called by update; call it before reading a time window that may be idle)."""
+        self._expire(time.monotonic() if now is None else now)
+
+    def _expire(self, now: float) -> None:
+        values = self._values
+        while values and ((self.size is not None and len(values) > self.size) or
+                          (self.t is not None and values[0][0] < now - self.t)):
+            _, y = values.popleft()
+            n = len(values)
+            if n == 0:
+                self.mean = self._m2 = 0.0
+            else:
+                delta = y - self.mean
+                self.mean -= delta / n
+                self._m2 -= delta * (y - self.mean)
+        # Index of the oldest value still in the window
+        first = self._next_index - len(values)
+        while self._min and self._min[0][0] < first:
+            self._min.popleft()
+        while self._max and self._max[0][0] < first:
+            self._max.popleft()
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1] if self._min else math.nan
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1] if self._max else math.nan
+
+    @property
+    def variance(self) -> float:
+        n = len(self._values)
+        return max(self._m2, 0.0) / (n - 1) if n > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if len(self._values) > 1 else math.nan
+
+    @property
+    def rate(self) -> float:
+        """Values per second within the window."""
+        n = len(self._values)
+        if n < 2:
+            return math.nan
+        span = self._values[-1][0] - self._values[0][0]
+        return (n - 1) / span if span > 0 else math.nan
+
+    def summary(self) -> dict:
+        n = len(self._values)
+        return {"count": n, "mean": self.mean if n else math.nan, "std": self.std, "min": self.min, "max": self.max,
+                "rate": self.rate}
+
+
+class ChannelStats:
+
+
+    def __init__(self, window: Optional[int] = 100, window_s: Optional[float] = None, channels: Optional[List[str]] = None):
+        """
+        Rolling statistics for every numeric channel of a stream: cumulative (RunningStats) and windowed (WindowStats).
+
+        Channels are created as they first appear unless a fixed list is given.
+
+        :param window: Window length in values (default: 100).
+        :param window_s: Window length in seconds (default: None).
+        :param channels: Only track these channels (default: all).
+        """
+        self.window = window
+        self.window_s = window_s
+        self.channels = channels
+        self.total: Dict[str, RunningStats] = {}
+        self.windowed: Dict[str, WindowStats] = {}
+
+    def _channel(self, name: str) -> Optional[WindowStats]:
+        if name not in self.windowed:
+            if self.channels is not None and name not in self.channels:
+                return None
+            self.total[name] = RunningStats()
+            self.windowed[name] = WindowStats(self.window, self.window_s)
+        return self.windowed[name]
+
+    def update(self, values: Dict[str, float], now: Optional[float] = None) -> None:
+        """Add one sample, e.g. {'Data': 7.0}."""
+        now = time.monotonic() if now is None else now
+        for name, x in values.items():
+            window = self._channel(name)
+            if window is not None:
+                self.total[name].update(x, now)
+                window.update(x, now)
+
+    def update_line(self, line: str, now: Optional[float] = None) -> None:
+        """Add the 'name = number' pairs found in a raw line."""
+        self.update(extract_channels(line), now)
+
+    def update_columns(self, columns: Dict[str, Sequence[float]], now: Optional[float] = None) -> None:
+        """Add a burst given as columns (e.g. LineParser.take()); cumulative aggregates are updated vectorized."""
+        now = time.monotonic() if now is None else now
+        for name, values in columns.items():
+            window = self._channel(name)
+            if window is not None and len(values):
+                self.total[name].update_batch(values, now)
+                window.update_batch(values, now)
+
+    def summary(self) -> Dict[str, dict]:
+        """{channel: {"total": {...}, "window": {...}}} with count, mean, std, min, max and rate."""
+        now = time.monotonic()
+        out = {}
+        for name, window in self.windowed.items():
+            window.expire(now)
+            out[name] = {"total": self.total[name].summary(), "window": window.summary()}
+        return out
+
+    def format(self) -> str:
+        """One line per channel with the windowed aggregates, for display."""
+        rows = []
+        for name, s in self.summary().items():
+            w = s["window"]
+            rows.append(f"{name:>12}: mean {w['mean']:10.4g}  std {w['std']:10.4g}  min {w['min']:10.4g}  max {w['max']:10.4g}"
+                        f"  {w['rate']:8.2f}/s  (n={s['total']['count']})")
+        return '\n'.join(rows)
@@ -0,0 +1,255 @@
+import os
+import selectors
+import threading
+import time
+import serial
+from typing import List, NamedTuple, Optional, Union
+try:
+    from .RingBuffer import RingBuffer
+    from .SerialReader import split_lines
+    from .ParallelParser import ParallelParser
+    from .MonitorRenderer import MonitorRenderer
+except ImportError:
+    from RingBuffer import RingBuffer
+    from SerialReader import split_lines
+    from ParallelParser import ParallelParser
+    from MonitorRenderer import MonitorRenderer
+
+
+class HubLine(NamedTuple):
+    port: str          # port the line was received on
+    timestamp: float   # host time (time.time()) at which the chunk containing the line was read
+    line: Union[str, bytes, tuple]   # a parsed record when the hub uses a ParallelParser
+
+
+class _PortState:
+    # Per-port bookkeeping attached to each selector key
+    __slots__ = ('port', 'connection', 'rx_buf', 'chunk', 'chunk_since')
+
+    def __init__(self, port: str, connection: serial.Serial):
+        self.port = port
+        self.connection = connection
+        self.rx_buf = bytearray()
+        self.chunk = bytearray()     # complete lines waiting to be handed to the ParallelParser
+        self.chunk_since = 0.0       # time.monotonic() when chunk got its first bytes
+
+
+class SerialHub:
+
+
+    def __init__(self, ports: List[str], baud_rate: int = 9600, buffer_size: int = 65536,
+                 overflow: str = RingBuffer.DROP_OLDEST, decode: bool = True, display_to_command: bool = False,
+                 parallel: Optional[ParallelParser] = None, chunk_bytes: int = 65536, max_delay: float = 0.05,
+                 monitor: Optional[MonitorRenderer] = None):
+        """
+        Initialize a hub that reads many serial ports from a single selector thread and merges their lines.
+
+        :param ports: The serial ports to connect to (e.g., ['/dev/ttyACM0', '/dev/ttyACM1']).
+        :param baud_rate: The baud rate used for every port (default: 9600).
+        :param buffer_size: Number of merged lines buffered before applying the overflow policy (default: 65536).
+        :param overflow: Overflow policy: 'drop_oldest', 'drop_newest' or 'block' (default: 'drop_oldest').
+        :param decode: Deliver stripped UTF-8 strings; if False, deliver raw bytes (default: True).
+        :param display_to_command: Print the merged stream after connecting (default: False).
+        :param parallel: Hand raw line chunks to this ParallelParser instead of splitting/decoding them on the selector
+            thread; HubLine.line is then the parsed record, in order per port (default: None).
+        :param chunk_bytes: With parallel, bytes of complete lines collected per port before a chunk is submitted (default: 64 KiB).
+        :param max_delay: With parallel, maximum seconds a partial chunk waits before it is submitted anyway (default: 0.05).
+        :param monitor: Render the merged stream through this coalescing MonitorRenderer instead of one print() per
+            line (default: None).
+        """
+        self.ports = list(ports)
+        self.baud_rate = baud_rate
+        self.buffer_size = buffer_size
+        self.overflow = overflow
+        self.decode = decode
+        self._displayToCmd = display_to_command
+        self.parallel = parallel
+        self.chunk_bytes = chunk_bytes
+        self.max_delay = max_delay
+        self.monitor = monitor
+        self._collector: Optional[threading.Thread] = None
+        self._states: List[_PortState] = []
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._buffer: Optional[RingBuffer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._wake_r: Optional[int] = None
+        self._wake_w: Optional[int] = None
+
+    def connect(self) -> None:
+        """Open every port and start the selector thread. Returns right away unless display_to_command is set."""
+        self._selector = selectors.DefaultSelector()
+        try:
+            for port in self.ports:
+                try:
+                    conn = serial.Serial(port, self.baud_rate, timeout=0)
+                except serial.SerialException as e:
+                    print(f"Error: Could not open serial port {port}: {e}")
+                    raise
+                state = _PortState(port, conn)
+                self._states.append(state)
+                self._selector.register(conn.fileno(), selectors.EVENT_READ, state)
+        except Exception:
+            self.close()
+            raise
+        # Self-pipe so close() can wake the selector immediately
+        self._wake_r, self._wake_w = os.pipe()
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._buffer = RingBuffer(self.buffer_size, self.overflow)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="SerialHub", daemon=True)
+        self._thread.start()
+        if self.parallel is not None:
+            self._collector = threading.Thread(target=self._collect, name="SerialHub-collector", daemon=True)
+            self._collector.start()
+        print(f"\nSuccessfully connected to {len(self._states)} Arduino port(s): {', '.join(self.ports)}")
+        if self._displayToCmd:
+            self.display_to_command()
+
+    def _run(self) -> None:
+        selector = self._selector
+        while not self._stop_event.is_set() and len(selector.get_map()) > 1:
+            waiting = self.parallel is not None and any(state.chunk for state in self._states)
+            for key, _ in selector.select(self.max_delay if waiting else None):
+                if key.data is None:
+                    continue  # woken up by close()
+                self._read_port(key.data)
+            if self.parallel is not None:
+                now = time.monotonic()
+                for state in self._states:
+                    if state.chunk and now - state.chunk_since >= self.max_delay:
+                        self._submit_chunk(state)
+        if self.parallel is None:
+            self._buffer.close()
+            return
+        for state in self._states:
+            if state.chunk:
+                self._submit_chunk(state)
+
+    def _read_port(self, state: _PortState) -> None:
+        conn = state.connection
+        try:
+            data = conn.read(conn.in_waiting or 1)
+        except (serial.SerialException, OSError) as e:
+            print(f"Error: Lost serial port {state.port}: {e}")
+            self._selector.unregister(conn.fileno())
+            return
+        if not data:
+            return
+        state.rx_buf += data
+        if self.parallel is not None:
+            # Only cut at line boundaries; decoding and parsing happen in the worker processes
+            end = state.rx_buf.rfind(b'\n')
+            if end >= 0:
+                if not state.chunk:
+                    state.chunk_since = time.monotonic()
+                state.chunk += state.rx_buf[:end + 1]
+                del state.rx_buf[:end + 1]
+                if len(state.chunk) >= self.chunk_bytes:
+                    self._submit_chunk(state)
+            return
+        lines = split_lines(state.rx_buf, self.decode)
+        if lines:
+            timestamp = time.time()
+            for line in lines:
+                self._buffer.put(HubLine(state.port, timestamp, line))
+
+    def _submit_chunk(self, state: _PortState) -> None:
+        self.parallel.submit(state.port, bytes(state.chunk))
+        state.chunk.clear()
+
+    def _collect(self) -> None:
+        # Move parsed chunks into the merged buffer, keeping each port's order
+        try:
+            while True:
+                reader = self._thread
+                finished = reader is None or not reader.is_alive()
+                for port, timestamp, records in self.parallel.results(timeout=0.1):
+                    for record in records:
+                        self._buffer.put(HubLine(port, timestamp, record))
+                if finished and not self.parallel.pending:
+                    break
+        finally:
+            # Consumers must not wait forever if this thread dies
+            self._buffer.close()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[HubLine]:
+        """
+        Return the next line from any port.
+
+        :param timeout: Maximum seconds to wait (default: wait forever).
+        :return: A HubLine(port, timestamp, line), or None if the timeout expired or the hub was closed and drained.
+        """
+        if self._buffer is None:
+            raise Exception("SerialHub is not connected; call connect() first.")
+        return self._buffer.get(timeout)
+
+    def get_batch(self, n: int, timeout: Optional[float] = None) -> List[HubLine]:
+        """
+        Return up to n lines from any port.
+
+        :param n: Maximum number of lines to return.
+        :param timeout: Maximum seconds to wait for n lines; whatever has arrived by then is returned (default: wait forever).
+        """
+        if self._buffer is None:
+            raise Exception("SerialHub is not connected; call connect() first.")
+        return self._buffer.get_batch(n, timeout)
+
+    def __iter__(self):
+        """Iterate over the merged stream until the hub is closed."""
+        if self._buffer is None:
+            raise Exception("SerialHub is not connected; call connect() first.")
+        return iter(self._buffer)
+
+    @property
+    def dropped(self) -> int:
+        """Number of lines lost to buffer overflow."""
+        return self._buffer.dropped if self._buffer is not None else 0
+
+    @property
+    def closed(self) -> bool:
+        """True once the merged buffer has been closed (every port lost or the hub closed)."""
+        return self._buffer is not None and self._buffer.closed
+
+    def display_to_command(self) -> None:
+        print("\n.......................Displaying Serial Monitor Output........................... \n")
+        if self.monitor is None:
+            for item in self:
+                print(f"[{item.port}] {item.line}")
+            return
+        try:
+            while True:
+                items = self._buffer.get_batch(self.buffer_size, timeout=self.monitor.due)
+                if not items and self._buffer.closed:
+                    break
+                self.monitor.add(items)
+                self.monitor.tick()
+        finally:
+            self.monitor.flush()
+
+    def close(self) -> None:
+        """Stop the selector thread and close every port."""
+        self._stop_event.set()
+        # Close the buffer first: with overflow='block' the selector thread may be waiting in put() on a full buffer
+        if self._buffer is not None:
+            self._buffer.close()
+        if self._wake_w is not None:
+            os.write(self._wake_w, b'\0')
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        if self._collector is not None:
+            self._collector.join()
+            self._collector = None
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._wake_r = self._wake_w = None
+        for state in self._states:
+            if state.connection.is_open:
+                state.connection.close()
+                print(f"Closed serial connection on port {state.port}")
+        self._states = []
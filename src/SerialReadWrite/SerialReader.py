@@ -1,21 +1,102 @@
 import serial
 import time
-from typing import Optional
-from datetime import datetime
-import json
+from typing import Callable, Iterator, Optional, Union
 import os
-import pickle
+import threading
+from datetime import datetime
+try:
+    from .RingBuffer import RingBuffer
+    from .LogSink import LogSink
+    from .LineParser import LineParser
+    from .Framing import FrameDecoder
+    from .Capture import CaptureWriter
+    from .Metrics import ReaderMetrics, MetricsDumper
+    from .DeviceProfile import DeviceProfile
+    from .Pipeline import Pipeline
+    from .RollingStats import ChannelStats
+    from .BoundedCapture import CaptureBuffer, CaptureResult
+    from .MonitorRenderer import MonitorRenderer
+    from .ClockAlignment import AlignedRecord, ClockAlignment
+except ImportError:
+    from RingBuffer import RingBuffer
+    from LogSink import LogSink
+    from LineParser import LineParser
+    from Framing import FrameDecoder
+    from Capture import CaptureWriter
+    from Metrics import ReaderMetrics, MetricsDumper
+    from DeviceProfile import DeviceProfile
+    from Pipeline import Pipeline
+    from RollingStats import ChannelStats
+    from BoundedCapture import CaptureBuffer, CaptureResult
+    from MonitorRenderer import MonitorRenderer
+    from ClockAlignment import AlignedRecord, ClockAlignment
+
+def split_lines(buf: bytearray, decode: bool = True, metrics: Optional['ReaderMetrics'] = None) -> list:
+    """
+    Remove every complete line from buf in a single pass, leaving the trailing partial line in place.
+
+    :param buf: Receive buffer; modified in place.
+    :param decode: Decode lines to stripped UTF-8 strings; if False, return raw bytes without the line terminator (default: True).
+    :param metrics: If given, invalid UTF-8 sequences (replaced by U+FFFD) are counted in metrics.decode_errors.
+    :return: A list of complete lines.
+    """
+    end = buf.rfind(b'\n')
+    if end < 0:
+        return []
+    with memoryview(buf) as view:
+        if decode:
+            try:
+                text = str(view[:end], 'utf-8')
+            except UnicodeDecodeError:
+                text = str(view[:end], 'utf-8', 'replace')
+                if metrics is not None:
+                    metrics.decode_errors += text.count('\ufffd')
+            lines = [line.rstrip() for line in text.split('\n')]
+        else:
+            lines = [line[:-1] if line.endswith(b'\r') else line for line in view[:end].tobytes().split(b'\n')]
+    del buf[:end + 1]
+    return lines
 
 class SerialReader:
 
 
-    def __init__(self, port: str, baud_rate: int = 9600, timeout: int = 1,display_to_command: bool = True, log: str = None):
+    def __init__(self, port: str, baud_rate: int = 9600, timeout: int = 1,display_to_command: bool = True, log: str = None,
+                 threaded: bool = False, buffer_size: int = 4096, overflow: str = RingBuffer.DROP_OLDEST,
+                 parser: Optional[LineParser] = None, decoder: Optional[FrameDecoder] = None,
+                 ready: str = 'sleep', ready_token: Optional[str] = None, ready_timeout: float = 5.0, suppress_reset: bool = False,
+                 profile: Optional[str] = 'data/profile.json', flow_control: Optional[str] = None, write_timeout: Optional[float] = None,
+                 aggregates: Optional[ChannelStats] = None, refresh_hz: float = 4.0, monitor: Optional[MonitorRenderer] = None,
+                 alignment: Optional[ClockAlignment] = None):
         """
         Initialize the SerialReader with the specified port and baud rate.
         
         :param port: The serial port to connect to (e.g., '/dev/tty.*' in UNIX-based devices or 'COM3' in Windows based devices).
         :param baud_rate: The baud rate for serial communication (default: 9600).
         :param timeout: The timeout for the serial connection in seconds (default: 1).
+        :param threaded: Acquire lines on a background reader thread; connect() then returns right away (default: False).
+        :param buffer_size: Number of lines the threaded mode buffers before applying the overflow policy (default: 4096).
+        :param overflow: Threaded-mode overflow policy: 'drop_oldest', 'drop_newest' or 'block' (default: 'drop_oldest').
+        :param parser: If given, read_serial, read_serial_bulk and the threaded reader deliver parsed records (tuples)
+            instead of lines; lines that do not parse are skipped (default: None).
+        :param decoder: Binary framed mode: read_frames() and the threaded reader deliver decoded frames instead of lines (default: None).
+        :param ready: How connect() decides the board is ready: 'sleep' waits `timeout` seconds, 'line' waits for the first
+            complete line, 'token' waits for a line containing ready_token (default: 'sleep').
+        :param ready_token: Text the firmware prints once it has booted (required for ready='token').
+        :param ready_timeout: Maximum seconds to wait in 'line'/'token' mode; 'line' mode then carries on with a warning,
+            'token' mode raises (default: 5.0).
+        :param suppress_reset: Open the port with DTR de-asserted so boards that reset on DTR (e.g. Uno) keep running (default: False).
+        :param profile: Device profile file updated after each successful connect(), used by load_last_config();
+            None disables it (default: 'data/profile.json').
+        :param flow_control: 'rtscts' (hardware) or 'xonxoff' (software) flow control; writes then wait while the board
+            signals it cannot accept more data (default: None).
+        :param write_timeout: Maximum seconds a write() may block, e.g. on flow control (default: wait forever).
+        :param aggregates: If given, display_to_command() folds every line into these rolling statistics and prints
+            them refresh_hz times per second instead of printing each raw line (default: None).
+        :param refresh_hz: Aggregate display refresh rate (default: 4).
+        :param monitor: If given, display_to_command() hands lines to this renderer, which writes them in coalesced,
+            rate-limited batches, instead of printing each line (default: None).
+        :param alignment: If given, every line (or parsed record) is delivered as an AlignedRecord carrying the device
+            timestamp, the host receive time, the corrected send time and the latency (default: None).
         """
         self.port = port           # of the computer where the arduino is connected
         self.baud_rate = baud_rate # of the serial communication
@@ -23,20 +104,66 @@ class SerialReader:
         self.serial_connection: Optional[serial.Serial] = None
         self._displayToCmd = display_to_command # dispaly to command option
         self.log = log
-        self._config_path = None
-        self._pkl_path = None
+        self.profile = profile
+        if flow_control not in (None, 'rtscts', 'xonxoff'):
+            raise ValueError(f"Unsupported flow control '{flow_control}' (expected 'rtscts' or 'xonxoff')")
+        self.flow_control = flow_control
+        self.write_timeout = write_timeout
+        self.aggregates = aggregates
+        self.refresh_hz = refresh_hz
+        self.monitor = monitor
+        self.alignment = alignment
+        self._line_filter: Optional[Callable[[list], list]] = None  # set by SerialWriter to take its responses out of the stream
+        self._profile: Optional[DeviceProfile] = None
+        self.threaded = threaded
+        self.buffer_size = buffer_size
+        self.overflow = overflow
+        self.parser = parser
+        self.decoder = decoder
+        if ready not in ('sleep', 'line', 'token'):
+            raise ValueError(f"Unsupported ready mode '{ready}' (expected 'sleep', 'line' or 'token')")
+        if ready == 'token' and not ready_token:
+            raise ValueError("ready='token' requires ready_token")
+        self.ready = ready
+        self.ready_token = ready_token
+        self.ready_timeout = ready_timeout
+        self.suppress_reset = suppress_reset
+        self._buffer: Optional[RingBuffer] = None
+        self._reader_thread: Optional[threading.Thread] = None
+        self._stop_event: Optional[threading.Event] = None
+        self._rx_buf = bytearray()  # reusable receive buffer; holds any partial line between bulk reads
+        self._sinks = {}            # filename -> LogSink used by write_to_file
+        self._capture: Optional[CaptureWriter] = None
+        self.metrics = ReaderMetrics()
+        self._metrics_dumper: Optional[MetricsDumper] = None
 
     def connect(self) -> None:
         """Open the serial connection."""
         try:
-            self.serial_connection = serial.Serial(self.port, self.baud_rate, timeout=self.timeout)
-            time.sleep(self.timeout)  # Wait for the connection to establish
-            if not self.serial_connection:
-                raise Exception("Connection timed out.")
+            self.serial_connection = serial.Serial(baudrate=self.baud_rate, timeout=self.timeout, write_timeout=self.write_timeout,
+                                                   rtscts=self.flow_control == 'rtscts', xonxoff=self.flow_control == 'xonxoff')
+            self.serial_connection.port = self.port
+            if self.suppress_reset:
+                self.serial_connection.dtr = False  # applied when the port is opened, so the board is not reset
+            self.serial_connection.open()
+            self.metrics = ReaderMetrics()
+            self._rx_buf = bytearray()
+            if self.ready == 'sleep':
+                time.sleep(self.timeout)  # Wait for the connection to establish
+            elif not self.wait_until_ready():
+                if self.ready == 'token':
+                    raise Exception(f"Connection timed out: no ready token from {self.port} within {self.ready_timeout}s.")
+                # A board that stays silent may still be fine; the wait has served as the sleep
+                print(f"Warning: No complete line from {self.port} within {self.ready_timeout}s; continuing anyway.")
             print(f"\nSuccessfully connected to Arduino on port {self.port}")
-            self.save_config()
-            SerialReader.pickle_config(self)
-            if self._displayToCmd:
+            if self.profile:
+                self._profile = self._profile or DeviceProfile(self.profile)
+                self._profile.save(self.port, self.baud_rate, ready=self.ready, ready_token=self.ready_token,
+                                   ready_timeout=self.ready_timeout, suppress_reset=self.suppress_reset,
+                                   flow_control=self.flow_control)
+            if self.threaded:
+                self.start_reader()
+            elif self._displayToCmd:
                 self.display_to_command()
         except serial.SerialException as e:
             print(f"Error: Could not open serial port {self.port}: {e}")
@@ -45,110 +172,533 @@ class SerialReader:
             print(e)
             raise
     
-    def save_config(self,filename='data/config.json') -> None:
-        cwd = os.getcwd()
-        if not os.path.exists(os.path.join(cwd,'data')):
-            os.mkdir(os.path.join(cwd,'data'))
-        if not self._config_path:
-            self._config_path = os.path.join(cwd,filename)
-        current_time = datetime.now().isoformat()
-        connect_config = {
-            "port": self.port,
-            "baud_rate": self.baud_rate,
-            "last_connected": current_time,  # You can dynamically get the current time
-            # "other_info": {
-            #     "device_name": self.device_name,
-            #     "firmware_version": firmware_version
-            # }
-        }
-
-        # Write the dictionary to a JSON file
-        with open(self._config_path, 'w') as file:
-            json.dump(connect_config, file, indent=4)
-        
-        print(f"Successfully saved connection configuration! ({self._config_path}).\n")
+    def wait_until_ready(self) -> bool:
+        """
+        Block until the board shows it is up: the first complete line ('line' mode) or a line containing
+        ready_token ('token' mode). In 'line' mode that first line is kept for the next read, since a board reset on
+        connect starts printing from its first line; with suppress_reset the board was not reset, so it may be a
+        partial line and is dropped. The token line and anything before it are always dropped.
 
-        
+        :return: True once ready, False if ready_timeout expired first.
+        """
+        conn = self.serial_connection
+        token = self.ready_token.encode('utf-8') if self.ready == 'token' else None
+        deadline = time.monotonic() + self.ready_timeout
+        timeout = conn.timeout
+        found = -1 if token else 0  # offset in _rx_buf from which the line ending the wait is searched
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                conn.timeout = min(remaining, timeout) if timeout is not None else remaining
+                data = conn.read(conn.in_waiting or 1)
+                if not data:
+                    continue
+                self._rx_buf += data
+                if found < 0:
+                    found = self._rx_buf.find(token)
+                    if found < 0:
+                        # Completed lines cannot contain the token any more; drop them to bound memory
+                        del self._rx_buf[:self._rx_buf.rfind(b'\n') + 1]
+                        continue
+                end = self._rx_buf.find(b'\n', found)
+                if end >= 0:
+                    if token or self.suppress_reset:
+                        del self._rx_buf[:end + 1]
+                    return True
+        finally:
+            conn.timeout = timeout
 
     def read_serial(self) -> Optional[str]:
-        """Read from the serial port and return the received data."""
-        if self.serial_connection and self.serial_connection.in_waiting > 0:
-            return self.serial_connection.readline().decode('utf-8').rstrip()
+        """Read from the serial port and return the received data (a parsed record if a parser is set)."""
+        waiting = self.serial_connection.in_waiting if self.serial_connection and self.serial_connection.is_open else 0
+        if waiting > 0 or self._rx_buf:
+            t0 = time.perf_counter()
+            receipt = time.time()
+            nl = self._rx_buf.find(b'\n')
+            if nl >= 0:
+                # Serve lines already received by the readiness check or a bulk read first
+                raw = bytes(self._rx_buf[:nl + 1])
+                del self._rx_buf[:nl + 1]
+            else:
+                raw = bytes(self._rx_buf) + self.serial_connection.readline()
+                self._rx_buf.clear()
+            try:
+                line = raw.decode('utf-8').rstrip()
+            except UnicodeDecodeError:
+                self.metrics.decode_errors += 1
+                raise
+            self.metrics.record_read(len(raw), 1, waiting)
+            self.metrics.record_loop(time.perf_counter() - t0)
+            if self._capture is not None:
+                self._capture.write_line(line, port=self.port)
+            item = self.parser.parse(line) if self.parser is not None else line
+            if self.alignment is not None and item is not None:
+                return self.alignment.annotate(item, receipt)
+            return item
         return None
+
+    def read_serial_bulk(self, decode: bool = True) -> list:
+        """
+        Read everything waiting on the serial port in one call and return the complete lines received.
+
+        Partial lines are kept in an internal buffer and completed by the next call.
+
+        :param decode: Decode lines to stripped UTF-8 strings; if False, return raw bytes without the line terminator (default: True).
+        :return: A list of complete lines, or of parsed records if a parser is set (empty if none are available yet).
+        """
+        if not self.serial_connection or not self.serial_connection.is_open:
+            return []
+        waiting = self.serial_connection.in_waiting
+        if waiting <= 0 and b'\n' not in self._rx_buf:  # lines left by the readiness check are still served
+            return []
+        t0 = time.perf_counter()
+        data = self.serial_connection.read(waiting) if waiting > 0 else b''
+        receipt = time.time()
+        self._rx_buf += data
+        lines = split_lines(self._rx_buf, decode, self.metrics)
+        if self._capture is not None and lines:
+            self._capture.write_lines(lines, port=self.port)
+        if self.parser is not None:
+            lines = [record for record in map(self.parser.parse, lines) if record is not None]
+        if self.alignment is not None and lines:
+            lines = self.alignment.annotate_batch(lines, receipt)
+        self.metrics.record_read(len(data), len(lines), waiting)
+        self.metrics.record_loop(time.perf_counter() - t0)
+        return lines
     
+    def lines(self) -> Iterator:
+        """
+        Yield received lines (or parsed records if a parser is set) as they arrive, until the reader is stopped or
+        the port closed. Uses the ring buffer in threaded mode, otherwise blocking bulk reads.
+        """
+        if self._buffer is not None:
+            yield from self._buffer
+            return
+        while self.serial_connection and self.serial_connection.is_open:
+            items = self.read_serial_bulk()
+            if items:
+                yield from items
+                continue
+            # Nothing waiting: block (up to timeout) for the next byte instead of polling
+            try:
+                data = self.serial_connection.read(1)
+            except (serial.SerialException, OSError, TypeError):
+                return
+            if data:
+                self._rx_buf += data
+                self.metrics.record_read(len(data), 0, 0)
+
+    def pipeline(self) -> Pipeline:
+        """Start a lazy processing pipeline (filter, map, decimate, batch, windows, sinks) over lines()."""
+        return Pipeline(self.lines())
+
+    def read_frames(self, raw: bool = False) -> list:
+        """
+        Read everything waiting on the serial port and return the binary frames it completes (binary framed mode).
+
+        :param raw: Return payload bytes (e.g. for decoder.as_array()) instead of unpacked tuples (default: False).
+        :return: A list of decoded payloads; corrupt frames are dropped and counted on the decoder.
+        """
+        if self.decoder is None:
+            raise Exception("Binary framed mode is not enabled; construct with decoder=FrameDecoder(...).")
+        if not self.serial_connection:
+            return []
+        waiting = self.serial_connection.in_waiting
+        if waiting <= 0:
+            return []
+        data = self.serial_connection.read(waiting)
+        frames = self.decoder.feed(data, raw)
+        self.metrics.record_read(len(data), len(frames), waiting)
+        return frames
+
+    def start_reader(self) -> None:
+        """Start the background reader thread that fills the ring buffer (threaded mode)."""
+        if self._reader_thread and self._reader_thread.is_alive():
+            return
+        if not self.serial_connection:
+            raise Exception(f"Cannot start reader: port {self.port} is not connected.")
+        self._buffer = RingBuffer(self.buffer_size, self.overflow)
+        self._stop_event = threading.Event()
+        self._reader_thread = threading.Thread(target=self._reader_loop, name=f"SerialReader-{self.port}", daemon=True)
+        self._reader_thread.start()
+
+    def stop_reader(self) -> None:
+        """Stop the background reader thread. Lines already buffered can still be consumed."""
+        if self._stop_event:
+            self._stop_event.set()
+            if self.serial_connection and hasattr(self.serial_connection, 'cancel_read'):
+                self.serial_connection.cancel_read()  # wake a blocked readline() (POSIX)
+        if self._buffer is not None:
+            self._buffer.close()
+        if self._reader_thread and self._reader_thread is not threading.current_thread():
+            self._reader_thread.join()
+        self._reader_thread = None
+
+    def _reader_loop(self) -> None:
+        # read() blocks on the port for at most self.timeout seconds, so the stop event is checked regularly.
+        # Whatever else is already waiting is pulled in the same call and split in bulk.
+        metrics = self.metrics
+        while not self._stop_event.is_set():
+            try:
+                waiting = self.serial_connection.in_waiting
+                data = self.serial_connection.read(waiting or 1)
+            except (serial.SerialException, OSError, TypeError) as e:
+                if not self._stop_event.is_set():
+                    print(f"Error: Reader thread on port {self.port} stopped: {e}")
+                break
+            if not data and b'\n' not in self._rx_buf:  # complete lines may be left by the readiness check
+                continue
+            receipt = time.time()
+            t0 = time.perf_counter()
+            if self.decoder is not None:
+                items = self.decoder.feed(data)
+            else:
+                self._rx_buf += data
+                items = split_lines(self._rx_buf, True, metrics)
+                if self._capture is not None and items:
+                    self._capture.write_lines(items, port=self.port)
+                if self._line_filter is not None and items:
+                    items = self._line_filter(items)
+                # Parsed after the filter, which sees raw lines (e.g. SerialWriter picking out its responses)
+                if self.parser is not None and items:
+                    items = [record for record in map(self.parser.parse, items) if record is not None]
+            if self.alignment is not None and items:
+                items = self.alignment.annotate_batch(items, receipt)
+            for item in items:
+                self._buffer.put(item)
+            metrics.record_read(len(data), len(items), waiting)
+            metrics.record_loop(time.perf_counter() - t0)
+        self._buffer.close()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Return the next buffered line (threaded mode).
+
+        :param timeout: Maximum seconds to wait for a line (default: wait forever).
+        :return: The line, or None if the timeout expired or the reader was stopped and drained.
+        """
+        if self._buffer is None:
+            raise Exception("Threaded reader is not running; construct with threaded=True and call connect().")
+        return self._buffer.get(timeout)
+
+    def get_batch(self, n: int, timeout: Optional[float] = None) -> list:
+        """
+        Return up to n buffered lines (threaded mode).
+
+        :param n: Maximum number of lines to return.
+        :param timeout: Maximum seconds to wait for n lines; whatever has arrived by then is returned (default: wait forever).
+        """
+        if self._buffer is None:
+            raise Exception("Threaded reader is not running; construct with threaded=True and call connect().")
+        return self._buffer.get_batch(n, timeout)
+
+    def __iter__(self):
+        """Iterate over received lines (threaded mode) until the reader is stopped."""
+        if self._buffer is None:
+            raise Exception("Threaded reader is not running; construct with threaded=True and call connect().")
+        return iter(self._buffer)
+
+    @property
+    def dropped(self) -> int:
+        """Number of lines lost to ring buffer overflow in threaded mode."""
+        return self._buffer.dropped if self._buffer is not None else 0
+
+    @property
+    def closed(self) -> bool:
+        """True once the threaded reader's buffer has been closed (port lost or reader stopped)."""
+        return self._buffer is not None and self._buffer.closed
+
+    def stats(self, since: Optional[dict] = None) -> dict:
+        """
+        Snapshot of the acquisition counters: bytes/lines received, decode errors, lines/bytes dropped by ring buffer
+        overflow, peak in_waiting, current rates and read-loop iteration time percentiles/histogram.
+
+        :param since: A previous stats() snapshot; bytes_per_s/lines_per_s are computed since it (default: since connect()).
+        """
+        buffer = self._buffer
+        return self.metrics.snapshot(
+            lines_dropped=buffer.dropped if buffer is not None else 0,
+            bytes_dropped=buffer.dropped_bytes if buffer is not None else 0,
+            buffered=len(buffer) if buffer is not None else 0,
+            buffer_size=self.buffer_size if buffer is not None else 0,
+            since=since)
+
+    def start_metrics_dump(self, filename: str, interval_s: float = 10.0) -> MetricsDumper:
+        """
+        Append a JSON stats() snapshot to filename every interval_s seconds until close().
+
+        :param filename: File the JSON lines are appended to.
+        :param interval_s: Seconds between snapshots (default: 10).
+        """
+        self.stop_metrics_dump()
+        self._metrics_dumper = MetricsDumper(self.stats, filename, interval_s)
+        return self._metrics_dumper
+
+    def stop_metrics_dump(self) -> None:
+        if self._metrics_dumper is not None:
+            self._metrics_dumper.close()
+            self._metrics_dumper = None
+
+    def update_aggregates(self, items: list) -> None:
+        """
+        Fold received lines (or parsed records) into self.aggregates. With a parser, each burst is aggregated per field
+        as a column (vectorized with NumPy); otherwise the lines' 'name = number' pairs are used.
+        """
+        if not items:
+            return
+        items = self._unaligned(items)
+        if self.parser is not None:
+            if not isinstance(items[0], tuple):
+                items = [record for record in map(self.parser.parse, items) if record is not None]
+            numeric = [(i, name) for i, (name, kind) in enumerate(self.parser.fields.items()) if kind != 'str']
+            self.aggregates.update_columns({name: [record[i] for record in items] for i, name in numeric})
+        else:
+            for line in items:
+                self.aggregates.update_line(line)
+
+    @staticmethod
+    def _unaligned(items: list) -> list:
+        # The displays show the lines themselves; the alignment annotations are for the records' consumers
+        if items and isinstance(items[0], AlignedRecord):
+            return [record.item for record in items]
+        return items
+
+    def _display_aggregates(self) -> None:
+        # Consume lines as fast as they arrive but only redraw the aggregates refresh_hz times per second
+        interval = 1.0 / self.refresh_hz
+        next_refresh = time.monotonic() + interval
+        while self._displayToCmd:
+            wait = max(next_refresh - time.monotonic(), 0)
+            if self._buffer is not None:
+                items = self._buffer.get_batch(self.buffer_size, timeout=wait)
+                if not items and self._buffer.closed:
+                    break
+            else:
+                items = self.read_serial_bulk()
+                if not items:
+                    time.sleep(min(wait, 0.01))
+            self.update_aggregates(items)
+            if time.monotonic() >= next_refresh:
+                next_refresh = max(next_refresh + interval, time.monotonic())
+                print(f"\n--- {datetime.now().strftime('%H:%M:%S')} ---\n{self.aggregates.format()}")
+        print(f"\n--- {datetime.now().strftime('%H:%M:%S')} (final) ---\n{self.aggregates.format()}")
+
+    def _display_monitor(self) -> None:
+        # Read in bulk as fast as lines arrive; the renderer writes to the terminal at most refresh_hz times per second
+        monitor = self.monitor
+        try:
+            while self._displayToCmd:
+                if self._buffer is not None:
+                    items = self._buffer.get_batch(self.buffer_size, timeout=monitor.due)
+                    if not items and self._buffer.closed:
+                        break
+                else:
+                    items = self.read_serial_bulk()
+                    if not items:
+                        time.sleep(min(monitor.due, 0.005))
+                monitor.add(self._unaligned(items))
+                monitor.tick()
+        finally:
+            monitor.flush()
+
     def display_to_command(self) -> Optional[str]:
         print("\n.......................Displaying Serial Monitor Output........................... \n")
+        if self.aggregates is not None:
+            self._display_aggregates()
+            return
+        if self.monitor is not None:
+            self._display_monitor()
+            return
+        if self._buffer is not None:
+            # Threaded mode: block on the ring buffer rather than polling the port
+            while self._displayToCmd:
+                data = self._buffer.get(timeout=self.timeout)
+                if data:
+                    print(data.item if isinstance(data, AlignedRecord) else data)
+                elif self._buffer.closed:
+                    return
+            return
         while self._displayToCmd:
             data = self.read_serial()
             if data:
-                print(data)
+                print(data.item if isinstance(data, AlignedRecord) else data)
             time.sleep(0.001)
 
+    def capture(self, duration: Optional[float] = None, count: Optional[int] = None, filename: Optional[str] = None,
+                stream: bool = False, max_bytes: Optional[int] = None) -> CaptureResult:
+        """
+        Capture a bounded block of complete lines: everything received for `duration` seconds, the next `count`
+        lines, or whichever limit is reached first.
+
+        Data is read in bulk into one preallocated buffer (sized from the baud rate for a duration), so memory and
+        time grow linearly with the amount captured. A partial line at the end is kept for the next read.
+
+        :param duration: Seconds to capture.
+        :param count: Lines to capture.
+        :param filename: Write the capture to this file: once at the end, or incrementally with stream (default: None).
+        :param stream: Write complete lines to filename as they arrive instead of keeping them in memory (default: False).
+        :param max_bytes: Initial buffer size (default: estimated from duration and baud rate, or 64 bytes per line).
+        :return: A CaptureResult (raw(), lines(), arrays(parser), save()).
+        """
+        if duration is None and count is None:
+            raise ValueError("capture() needs a duration, a count, or both")
+        if stream and not filename:
+            raise ValueError("stream=True requires a filename")
+        if self._buffer is not None:
+            raise Exception("capture() reads the port directly; stop the threaded reader first (stop_reader()).")
+        conn = self.serial_connection
+        if not conn or not conn.is_open:
+            raise Exception(f"Cannot capture: port {self.port} is not connected.")
+        if max_bytes is None:
+            # A UART carries at most baud/10 bytes per second (start + 8 data + stop bits)
+            estimates = [int(duration * self.baud_rate / 10) if duration is not None else None,
+                         count * 64 if count is not None else None]
+            max_bytes = min(e for e in estimates if e is not None) + 4096
+        file = open(filename, 'wb') if filename else None
+        buffer = CaptureBuffer(max_bytes, file if stream else None)
+        started = time.time()
+        t0 = time.monotonic()
+        deadline = None if duration is None else t0 + duration
+        timeout = conn.timeout
+        try:
+            pending = bytes(self._rx_buf)
+            self._rx_buf.clear()
+            while True:
+                if pending:
+                    pending = buffer.append(pending, None if count is None else count - buffer.lines)
+                if count is not None and buffer.lines >= count:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                waiting = conn.in_waiting
+                if waiting:
+                    pending = conn.read(waiting)
+                else:
+                    # Block for the next byte instead of polling, but not past the deadline
+                    wait = timeout if remaining is None else min(remaining, timeout if timeout is not None else remaining)
+                    if conn.timeout != wait:
+                        conn.timeout = wait
+                    pending = conn.read(1)
+                self.metrics.record_read(len(pending), 0, waiting)
+            self._rx_buf += buffer.finish() + pending
+            elapsed = time.monotonic() - t0
+            if file is not None and not stream:
+                file.write(buffer.data)
+        finally:
+            conn.timeout = timeout
+            if file is not None:
+                file.close()
+        data = buffer.data if not stream else memoryview(b'')
+        return CaptureResult(data, buffer.lines, buffer.nbytes, started, elapsed, filename)
+
     def log_serial_output(self,logtimesec: float = 5, file_out: str = "serial_output.txt") -> None:
-        t0 = time.time()
-        while time.time()-t0 > logtimesec:
-            self.log += (self.read_serial() + "\n")
-        self.write_to_file(file_out,self.log)
+        """Capture logtimesec seconds of output and append it to file_out, one line per received line."""
+        lines = self.capture(duration=logtimesec).lines()
+        self.log = '\n'.join(lines)
+        sink = self._sinks.get(file_out)
+        if sink is None:
+            sink = self.open_sink(file_out)
+        sink.write_lines(lines)
+
+    def write(self, data: Union[str, bytes]) -> int:
+        """
+        Write data to the board. Blocks while flow control holds the link (at most write_timeout seconds).
+        For queued, pipelined commands with response correlation use SerialWriter.
+
+        :param data: A str (encoded as UTF-8) or bytes-like object.
+        :return: The number of bytes written.
+        """
+        if not self.serial_connection or not self.serial_connection.is_open:
+            raise Exception(f"Cannot write: port {self.port} is not connected.")
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return self.serial_connection.write(data)
 
     def write_to_file(self, filename: str, data: str) -> None:
         """
         Write the received data to a file.
+
+        The file is kept open in a buffered LogSink until close(); see open_sink() to change the flush policy.
         
         :param filename: The name of the file where data will be written.
         :param data: The data to be written to the file.
         """
-        with open(filename, 'a') as file:  # Open file in append mode
-            file.write(data + '\n')
-        print(f"Data written to {filename}")
+        sink = self._sinks.get(filename)
+        if sink is None:
+            sink = self.open_sink(filename)
+        sink.write(data)
+
+    def open_sink(self, filename: str, **kwargs) -> LogSink:
+        """
+        Open (or reopen with new settings) the LogSink used by write_to_file for filename.
+
+        :param filename: The name of the file where data will be written.
+        :param kwargs: LogSink options (buffer_size, flush_lines, flush_interval_ms, fsync_interval_s).
+        """
+        old = self._sinks.pop(filename, None)
+        if old is not None:
+            old.close()
+        sink = LogSink(filename, **kwargs)
+        self._sinks[filename] = sink
+        return sink
+
+    def open_capture(self, filename: str, parser: Optional[LineParser] = None, raw_lines: bool = True, **kwargs) -> CaptureWriter:
+        """
+        Record every line read from now on into a binary capture file (see Capture.CaptureFile for readback).
+
+        :param filename: The capture file to create.
+        :param parser: LineParser whose int/float fields are stored in each record (default: None).
+        :param raw_lines: Keep the raw lines in a `.lines` sidecar (default: True).
+        :param kwargs: Further CaptureWriter options (e.g. flush_records).
+        """
+        self.close_capture()
+        self._capture = CaptureWriter(filename, parser=parser, raw_lines=raw_lines, ports=[self.port], **kwargs)
+        return self._capture
+
+    def close_capture(self) -> None:
+        """Stop recording to the capture file and close it."""
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
 
     def close(self) -> None:
         """Close the serial connection."""
+        self.stop_reader()
+        self._rx_buf.clear()  # a partial line cannot be completed once the port is closed
+        self.close_capture()
+        self.stop_metrics_dump()
+        for sink in self._sinks.values():
+            sink.close()
+        self._sinks = {}
+        if self._profile is not None:
+            self._profile.wait()  # so load_last_config() right after close() sees this connection
         if self.serial_connection and self.serial_connection.is_open:
             self.serial_connection.close()
             print(f"Closed serial connection on port {self.port}")
             
     @staticmethod
-    def load_last_config(obj_fp: str = 'data/SerialReaderObj.pkl',json_fp: str = 'data/config.json') -> Optional['SerialReader']:
-
-        cwd = os.getcwd()
-        pkl_path = os.path.join(cwd,obj_fp)
-        if os.path.exists(pkl_path):
-            # print(f"Loading last Serial Reader configuraiton ({pkl_path})....")
-            with open(pkl_path, 'rb') as file:
-                try:
-                    obj = pickle.load(file)
-                    print(f"SerialReader object loaded from {pkl_path}")
-                    return obj
-                except pickle.UnpicklingError as e:
-                    #print(f"Error loading SerialReader object: {e}")
-                    #return None
-                    pass
-        
-        json_path = os.path.join(cwd,json_fp)
-        if os.path.exists(json_path):
-            # Step 1: Load the JSON data from the file
-            with open(json_fp, 'r') as file:
-                data = json.load(file)
-
-            # Step 2: Access specific nodes (fields/values)
-            port = data.get("port")
-            baud_rate = data.get("baud_rate")
-            last_connected = data.get("last_connected")
-
-            # Return recontructed objet:
-            return SerialReader(port=port,baud_rate=baud_rate) #gj jason
-    
-    @staticmethod
-    def pickle_config(sr: 'SerialReader', filename = 'data/SerialReaderObj.pkl') -> None:
-        cwd = os.getcwd()
-        if not os.path.exists(os.path.join(cwd,'data')):
-            os.mkdir(os.path.join(cwd,'data'))
-        if not sr._pkl_path:
-            sr._pkl_path = os.path.join(cwd,filename)
-
-        with open(sr._pkl_path, 'wb') as file:
-            pickle.dump(sr, file)
-        print(f"SerialReader object saved to {sr._pkl_path}")
+    def load_last_config(profile_fp: str = 'data/profile.json', **kwargs) -> Optional['SerialReader']:
+        """
+        Recreate a SerialReader for the last board connected to successfully.
+
+        The cached device profile is checked for staleness first: if the board was replugged onto another port it is
+        found again by its USB VID/PID/serial number.
+
+        :param profile_fp: Device profile file written by connect() (default: 'data/profile.json').
+        :param kwargs: SerialReader arguments overriding the cached settings.
+        :return: An unconnected SerialReader, or None if there is no usable profile.
+        """
+        profile = DeviceProfile(profile_fp).resolve()
+        if profile is None:
+            return None
+        settings = {key: profile[key] for key in ('baud_rate', 'ready', 'ready_token', 'ready_timeout', 'suppress_reset',
+                                                                'flow_control')
+                    if profile.get(key) is not None}
+        settings.update(kwargs)
+        return SerialReader(port=profile["port"], profile=profile_fp, **settings)
 
 if __name__ == "__main__":
 
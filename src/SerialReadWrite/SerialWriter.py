@@ -0,0 +1,238 @@
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+import serial
+try:
+    from .SerialReader import SerialReader
+except ImportError:
+    from SerialReader import SerialReader
+
+
+class CommandTimeout(Exception):
+    """Raised by a command's result() when no response arrived within its timeout."""
+
+
+class PendingCommand(Future):
+
+
+    def __init__(self, seq: int, command: str, timeout: Optional[float]):
+        """
+        Future for a queued command; result() returns the response line (without its sequence tag).
+
+        :param seq: Sequence number the command was tagged with.
+        :param command: The command text.
+        :param timeout: Seconds to wait for the response once the command is on the wire (inf: forever).
+        """
+        super().__init__()
+        self.seq = seq
+        self.command = command
+        self.timeout = timeout
+        self.sent_at: Optional[float] = None      # time.monotonic() when written
+        self.answered_at: Optional[float] = None  # time.monotonic() when the response arrived
+        self.deadline: Optional[float] = None
+
+    @property
+    def round_trip(self) -> Optional[float]:
+        """Seconds between writing the command and receiving its response (None until answered)."""
+        return None if self.answered_at is None else self.answered_at - self.sent_at
+
+
+class SerialWriter:
+
+
+    def __init__(self, reader: SerialReader, max_in_flight: int = 1, timeout: float = 1.0, tagged: bool = True,
+                 tag: str = '#', terminator: str = '\n', queue_size: int = 1024):
+        """
+        Duplex command channel on top of a connected SerialReader: commands go through an outbound queue, up to
+        max_in_flight of them are on the wire at once, and responses are matched back to their command.
+
+        With tagged=True every command is sent as "<tag><seq> <command>" and the firmware must echo the prefix in its
+        reply ("#12 OK"); replies may then arrive in any order and untagged lines still reach the reader's normal
+        consumers. With tagged=False the next line received answers the oldest command in flight, so the firmware
+        must reply to every command, in order, and print nothing else.
+
+        The reader's threaded acquisition is started if it is not running. Flow control (rtscts/xonxoff) is
+        configured on the SerialReader; the writer thread then simply blocks while the board holds the link.
+
+        :param reader: A connected SerialReader.
+        :param max_in_flight: Commands sent before their responses arrive; 1 is classic stop-and-wait (default: 1).
+        :param timeout: Default seconds to wait for each response; float('inf') waits forever (default: 1.0).
+        :param tagged: Correlate responses by sequence tag instead of by order (default: True).
+        :param tag: Prefix of the sequence tag (default: '#').
+        :param terminator: Appended to every command (default: '\\n').
+        :param queue_size: Maximum queued (not yet sent) commands; send() blocks when full (default: 1024).
+        """
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+        self.reader = reader
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.tagged = tagged
+        self.tag = tag
+        self.terminator = terminator
+        self.queue_size = queue_size
+        self.timeouts = 0       # commands whose response did not arrive in time
+        self.late = 0           # responses that arrived after their command timed out (or were never asked for)
+        self._pattern = re.compile(re.escape(tag) + r'(\d+) ?(.*)', re.S)
+        self._seq = 0
+        self._queue: deque = deque()
+        self._in_flight: Dict[int, PendingCommand] = {}   # insertion-ordered: oldest first
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._closed = False
+        if reader._reader_thread is None:
+            reader.start_reader()
+        reader._line_filter = self._take_responses
+        self._thread = threading.Thread(target=self._run, name=f"SerialWriter-{reader.port}", daemon=True)
+        self._thread.start()
+
+    def send(self, command: str, timeout: Optional[float] = None) -> PendingCommand:
+        """
+        Queue a command and return right away.
+
+        :param command: Command text (without terminator).
+        :param timeout: Seconds to wait for its response (default: the writer's timeout).
+        :return: A PendingCommand; call result() to wait for the response.
+        """
+        with self._changed:
+            if self._closed:
+                raise Exception("SerialWriter is closed.")
+            self._changed.wait_for(lambda: self._closed or len(self._queue) < self.queue_size)
+            if self._closed:
+                raise Exception("SerialWriter is closed.")
+            self._seq = (self._seq + 1) % 100000
+            pending = PendingCommand(self._seq, command, self.timeout if timeout is None else timeout)
+            pending.set_running_or_notify_cancel()
+            self._queue.append(pending)
+            self._changed.notify_all()
+        return pending
+
+    def request(self, command: str, timeout: Optional[float] = None) -> str:
+        """Send a command and wait for its response (raises CommandTimeout if none arrives in time)."""
+        return self.send(command, timeout).result()
+
+    def send_many(self, commands: List[str], timeout: Optional[float] = None) -> List[PendingCommand]:
+        """Queue several commands; they are pipelined up to max_in_flight."""
+        return [self.send(command, timeout) for command in commands]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def _run(self) -> None:
+        while True:
+            with self._changed:
+                while not self._closed:
+                    now = time.monotonic()
+                    self._expire(now)
+                    if self._queue and len(self._in_flight) < self.max_in_flight:
+                        break
+                    deadlines = [p.deadline for p in self._in_flight.values() if p.deadline is not None]
+                    self._changed.wait(max(min(deadlines) - now, 0) if deadlines else None)
+                if self._closed:
+                    return
+                pending = self._queue.popleft()
+                pending.sent_at = time.monotonic()
+                if pending.timeout != float('inf'):
+                    pending.deadline = pending.sent_at + pending.timeout
+                self._in_flight[pending.seq] = pending
+                self._changed.notify_all()
+            line = f"{self.tag}{pending.seq} {pending.command}" if self.tagged else pending.command
+            try:
+                # Blocks while RTS/CTS or XON/XOFF flow control holds the link (up to the reader's write_timeout)
+                self.reader.write(line + self.terminator)
+            except serial.SerialTimeoutException as e:
+                # Flow control held the link past write_timeout: only this command is lost
+                with self._changed:
+                    failed = self._in_flight.pop(pending.seq, None)
+                    self._changed.notify_all()
+                if failed is not None:
+                    failed.set_exception(e)
+            except Exception as e:
+                # The port is gone (e.g. the reader was closed): nothing can be sent or answered any more
+                print(f"Error: SerialWriter on port {self.reader.port} stopped: {e}")
+                with self._changed:
+                    unanswered = self._stop_locked()
+                for p in unanswered:
+                    if p is pending:
+                        p.set_exception(e)
+                    elif not p.done():
+                        p.set_exception(Exception(f"SerialWriter stopped before '{p.command}' (seq {p.seq}) was answered: {e}"))
+                return
+
+    def _expire(self, now: float) -> None:
+        # Called with the lock held
+        for seq in [seq for seq, p in self._in_flight.items() if p.deadline is not None and p.deadline <= now]:
+            pending = self._in_flight.pop(seq)
+            self.timeouts += 1
+            pending.set_exception(CommandTimeout(f"No response to '{pending.command}' (seq {seq}) within {pending.timeout}s"))
+
+    def _take_responses(self, lines: list) -> list:
+        # Runs on the reader thread: resolve the responses, pass every other line through
+        others = []
+        answered = []
+        with self._changed:
+            for line in lines:
+                if self.tagged:
+                    m = self._pattern.match(line)
+                    if m is None:
+                        others.append(line)
+                        continue
+                    pending = self._in_flight.pop(int(m.group(1)), None)
+                    response = m.group(2)
+                else:
+                    if not self._in_flight:
+                        others.append(line)
+                        continue
+                    pending = self._in_flight.pop(next(iter(self._in_flight)))
+                    response = line
+                if pending is None:
+                    self.late += 1
+                    continue
+                answered.append((pending, response))
+            if answered:
+                self._changed.notify_all()
+        now = time.monotonic()
+        for pending, response in answered:
+            pending.answered_at = now
+            pending.set_result(response)
+        return others
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued command has been answered or timed out. Returns False if timeout expired first."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self._closed or not (self._queue or self._in_flight), timeout)
+
+    def _stop_locked(self) -> list:
+        # Called with the lock held: refuse further commands and take every unanswered one
+        self._closed = True
+        pending = list(self._queue) + list(self._in_flight.values())
+        self._queue.clear()
+        self._in_flight.clear()
+        self._changed.notify_all()
+        return pending
+
+    def close(self) -> None:
+        """Stop the writer; commands not yet answered are cancelled. The reader stays connected."""
+        with self._changed:
+            pending = self._stop_locked()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        if self.reader._line_filter == self._take_responses:
+            self.reader._line_filter = None
+        for p in pending:
+            if not p.done():
+                p.set_exception(Exception(f"SerialWriter closed before '{p.command}' (seq {p.seq}) was answered"))
+
+    def __enter__(self) -> 'SerialWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
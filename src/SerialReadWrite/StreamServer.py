@@ -0,0 +1,305 @@
+import os
+import selectors
+import socket
+import threading
+from collections import deque
+from typing import Iterator, List, Optional, Tuple, Union
+try:
+    from .SerialHub import HubLine
+except ImportError:
+    from SerialHub import HubLine
+
+
+# Most buffers handed to one sendmsg() call (the POSIX IOV_MAX minimum is 16, Linux allows 1024)
+MAX_IOV = 64
+
+
+def parse_address(address: Union[str, Tuple[str, int]]) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """
+    Turn 'host:port', ('host', port) or a filesystem path into (socket family, address).
+
+    :param address: TCP address or Unix socket path.
+    """
+    if isinstance(address, tuple):
+        return socket.AF_INET, address
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and '/' not in address:
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    return socket.AF_UNIX, address
+
+
+class _Client:
+
+
+    def __init__(self, sock: socket.socket, name: str):
+        self.socket = sock
+        self.name = name
+        self.pending: deque = deque()   # memoryviews of shared batch buffers, oldest first
+        self.pending_bytes = 0
+        self.dropped_bytes = 0
+        self.sent_bytes = 0
+
+
+class StreamServer:
+
+    # What to do when a client's queue is full
+    DISCONNECT = 'disconnect'
+    DROP = 'drop'
+
+    def __init__(self, source, address: Union[str, Tuple[str, int]], max_queue_bytes: int = 1 << 20,
+                 slow_client: str = DISCONNECT, batch_lines: int = 1024, timestamps: bool = False):
+        """
+        Own a reader and broadcast its line stream to any number of local subscribers over a Unix or TCP socket, so
+        a dashboard, a logger and an alerting script can share one serial port.
+
+        Every batch of lines is encoded once into a single buffer; each client's queue holds memoryviews of that
+        same buffer (no per-client copies) and is flushed with one sendmsg() call over several batches. A client
+        whose queue exceeds max_queue_bytes is disconnected (or, with slow_client='drop', misses those batches)
+        so it cannot hold back the others.
+
+        :param source: A threaded SerialReader or a SerialHub (anything with get_batch(n, timeout)).
+        :param address: Unix socket path, 'host:port' or (host, port) to listen on.
+        :param max_queue_bytes: Unsent bytes allowed per client (default: 1 MiB).
+        :param slow_client: 'disconnect' or 'drop' when a client falls behind (default: 'disconnect').
+        :param batch_lines: Maximum lines encoded into one buffer (default: 1024).
+        :param timestamps: Prefix SerialHub lines with their receive time (default: False).
+        """
+        if slow_client not in (StreamServer.DISCONNECT, StreamServer.DROP):
+            raise ValueError(f"Unsupported slow_client policy '{slow_client}' (expected 'disconnect' or 'drop')")
+        self.source = source
+        self.family, self.address = parse_address(address)
+        self.max_queue_bytes = max_queue_bytes
+        self.slow_client = slow_client
+        self.batch_lines = batch_lines
+        self.timestamps = timestamps
+        self.clients_dropped = 0
+        self.lines_sent = 0
+        self._clients: List[_Client] = []
+        self._lock = threading.Lock()
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._listener: Optional[socket.socket] = None
+        self._wake_r: Optional[int] = None
+        self._wake_w: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def clients(self) -> int:
+        return len(self._clients)
+
+    def start(self) -> None:
+        """Start listening and broadcasting (returns right away)."""
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.remove(self.address)  # stale socket from a previous run
+        self._listener = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(self.address)
+        self._listener.listen()
+        self._listener.setblocking(False)
+        if self.family == socket.AF_INET:
+            self.address = self._listener.getsockname()  # resolve port 0
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ, None)
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._stop_event.clear()
+        self._threads = [threading.Thread(target=self._pump, name="StreamServer-pump", daemon=True),
+                         threading.Thread(target=self._serve, name="StreamServer-io", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        print(f"Serving serial stream on {self.address}")
+
+    def serve_forever(self) -> None:
+        """start() and block until close() is called from another thread (or KeyboardInterrupt)."""
+        self.start()
+        try:
+            self._stop_event.wait()
+        finally:
+            self.close()
+
+    def _encode(self, items: list) -> bytes:
+        parts = []
+        for item in items:
+            if isinstance(item, HubLine):
+                line = item.line if isinstance(item.line, str) else item.line.decode('utf-8', 'replace')
+                line = f"{item.port}\t{line}"
+                if self.timestamps:
+                    line = f"{item.timestamp:.6f}\t{line}"
+            elif isinstance(item, bytes):
+                line = item.decode('utf-8', 'replace')
+            else:
+                line = item if isinstance(item, str) else str(item)
+            parts.append(line)
+        parts.append('')
+        return '\n'.join(parts).encode('utf-8')
+
+    def _pump(self) -> None:
+        # Take batches from the source, encode each once and queue the same buffer for every client
+        while not self._stop_event.is_set():
+            items = self.source.get_batch(1, timeout=0.2)
+            if not items:
+                if getattr(self.source, 'closed', False):
+                    # The source is gone (port lost or reader stopped): get_batch() no longer blocks, so stop serving
+                    print("Source closed; stopping the stream server")
+                    self._stop_event.set()
+                    self._wake()
+                    break
+                continue
+            items += self.source.get_batch(self.batch_lines - 1, timeout=0)
+            view = memoryview(self._encode(items))
+            with self._lock:
+                for client in self._clients:
+                    if client.pending_bytes < 0:
+                        continue  # already marked for removal
+                    if client.pending_bytes + len(view) > self.max_queue_bytes:
+                        client.dropped_bytes += len(view)
+                        if self.slow_client == StreamServer.DISCONNECT:
+                            client.pending.clear()
+                            client.pending_bytes = -1  # marks the client for removal by the IO thread
+                        continue
+                    client.pending.append(view)
+                    client.pending_bytes += len(view)
+                self.lines_sent += len(items)
+            self._wake()
+
+    def _wake(self) -> None:
+        try:
+            os.write(self._wake_w, b'\0')
+        except BlockingIOError:
+            pass  # the IO thread has wake-ups pending already
+
+    def _serve(self) -> None:
+        selector = self._selector
+        while not self._stop_event.is_set():
+            for key, events in selector.select():
+                if key.fileobj is self._listener:
+                    self._accept()
+                elif key.data is None:
+                    try:
+                        os.read(self._wake_r, 4096)
+                    except BlockingIOError:
+                        pass
+                else:
+                    client = key.data
+                    if events & selectors.EVENT_READ and not self._drain_input(client):
+                        self._remove(client, "disconnected")
+                        continue
+                    if events & selectors.EVENT_WRITE:
+                        self._flush(client)
+            self._update_interest()
+
+    def _accept(self) -> None:
+        try:
+            sock, peer = self._listener.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        sock.setblocking(False)
+        client = _Client(sock, str(peer) if peer else f"unix:{sock.fileno()}")
+        with self._lock:
+            self._clients.append(client)
+        self._selector.register(sock, selectors.EVENT_READ, client)
+        print(f"Subscriber {client.name} connected ({len(self._clients)} total)")
+
+    def _drain_input(self, client: _Client) -> bool:
+        # Subscribers only listen; anything they send is discarded. Returns False on EOF.
+        try:
+            return bool(client.socket.recv(4096))
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            return False
+
+    def _flush(self, client: _Client) -> None:
+        with self._lock:
+            views = list(client.pending)[:MAX_IOV]
+        if not views:
+            return
+        try:
+            if hasattr(client.socket, 'sendmsg'):
+                sent = client.socket.sendmsg(views)
+            else:
+                sent = client.socket.send(views[0])
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._remove(client, "disconnected")
+            return
+        client.sent_bytes += sent
+        with self._lock:
+            while sent and client.pending:
+                head = client.pending[0]
+                if sent >= len(head):
+                    client.pending.popleft()
+                    client.pending_bytes -= len(head)
+                    sent -= len(head)
+                else:
+                    client.pending[0] = head[sent:]  # a view of the rest; no copy
+                    client.pending_bytes -= sent
+                    sent = 0
+
+    def _update_interest(self) -> None:
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            if client.pending_bytes < 0:
+                self.clients_dropped += 1
+                self._remove(client, f"dropped: fell more than {self.max_queue_bytes} bytes behind")
+                continue
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.pending else 0)
+            if self._selector.get_key(client.socket).events != events:
+                self._selector.modify(client.socket, events, client)
+
+    def _remove(self, client: _Client, reason: str) -> None:
+        with self._lock:
+            if client not in self._clients:
+                return
+            self._clients.remove(client)
+        try:
+            self._selector.unregister(client.socket)
+        except (KeyError, ValueError):
+            pass
+        client.socket.close()
+        print(f"Subscriber {client.name} {reason} ({len(self._clients)} left)")
+
+    def close(self) -> None:
+        """Stop serving and disconnect every subscriber. The source is left open."""
+        if self._selector is None:
+            return
+        self._stop_event.set()
+        self._wake()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        for client in list(self._clients):
+            self._remove(client, "closed")
+        self._selector.close()
+        self._selector = None
+        self._listener.close()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.remove(self.address)
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def __enter__(self) -> 'StreamServer':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def subscribe(address: Union[str, Tuple[str, int]], encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    Connect to a StreamServer and yield its lines until the server goes away.
+
+    :param address: The server's Unix socket path, 'host:port' or (host, port).
+    """
+    family, address = parse_address(address)
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        with sock.makefile('r', encoding=encoding, newline='\n') as stream:
+            for line in stream:
+                yield line.rstrip('\n')
@@ -0,0 +1,134 @@
+import multiprocessing
+import os
+import select
+import threading
+import time
+from typing import Optional
+try:
+    import pty
+    import tty
+except ImportError:  # pseudo-terminals are POSIX-only
+    pty = tty = None
+
+
+class VirtualArduino:
+
+    DEFAULT_PATTERN = "Time since start: {time}  ... Data = {data}"  # same output as examples/serialtest
+
+    def __init__(self, pattern: str = DEFAULT_PATTERN, rate_hz: Optional[float] = 1.0, burst: int = 1,
+                 line_length: Optional[int] = None, baud_rate: Optional[int] = None, count: Optional[int] = None,
+                 use_process: bool = False):
+        """
+        Emulate a board printing lines over serial using a pseudo-terminal pair, so SerialReader can be exercised
+        (and benchmarked) without hardware. Connect a reader to `port` after start().
+
+        :param pattern: Line template; may use {time} (ms since start), {data} (line counter) and {sent}
+            (time.monotonic() when the line was written, for end-to-end latency measurements) (default: serialtest.ino output).
+        :param rate_hz: Bursts per second; None sends as fast as possible (default: 1.0).
+        :param burst: Lines sent back-to-back in each burst (default: 1).
+        :param line_length: Pad each line with '.' to this many characters, excluding the line terminator (default: None).
+        :param baud_rate: Throttle output to what a UART at this baud rate could carry (10 bits per byte) (default: None).
+        :param count: Stop after this many lines (default: run until stop()).
+        :param use_process: Emit from a child process instead of a thread so the generator's CPU use is not charged to the reader (default: False).
+        """
+        if pty is None:
+            raise Exception("VirtualArduino needs pseudo-terminal support (POSIX only).")
+        self.pattern = pattern
+        self.rate_hz = rate_hz
+        self.burst = burst
+        self.line_length = line_length
+        self.baud_rate = baud_rate
+        self.count = count
+        self.use_process = use_process
+        self.port: Optional[str] = None
+        self._master: Optional[int] = None
+        self._slave: Optional[int] = None
+        self._worker = None
+        self._stop_event = None
+
+    def start(self) -> str:
+        """Create the pseudo-terminal pair and start emitting lines. Returns the port name to connect to."""
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        os.set_blocking(self._master, False)
+        self.port = os.ttyname(self._slave)
+        if self.use_process:
+            ctx = multiprocessing.get_context('fork')
+            self._stop_event = ctx.Event()
+            self._worker = ctx.Process(target=self._run, name="VirtualArduino", daemon=True)
+        else:
+            self._stop_event = threading.Event()
+            self._worker = threading.Thread(target=self._run, name="VirtualArduino", daemon=True)
+        self._worker.start()
+        return self.port
+
+    def _format(self, start: float, data: int) -> bytes:
+        now = time.monotonic()
+        line = self.pattern.format(time=int((now - start) * 1000), data=data, sent=f"{now:.6f}")
+        if self.line_length and len(line) < self.line_length:
+            line = line + '.' * (self.line_length - len(line))
+        return (line + '\r\n').encode('ascii')
+
+    def _run(self) -> None:
+        start = time.monotonic()
+        next_burst = start
+        byte_budget_start = start
+        sent_bytes = 0
+        data = 0
+        while not self._stop_event.is_set():
+            if self.count is not None and data >= self.count:
+                return
+            n = self.burst if self.count is None else min(self.burst, self.count - data)
+            chunk = b''.join(self._format(start, data + i) for i in range(n))
+            data += n
+            if not self._write(chunk):
+                return
+            sent_bytes += len(chunk)
+            if self.baud_rate:
+                # Stay within the UART's byte rate
+                ahead = byte_budget_start + sent_bytes * 10 / self.baud_rate - time.monotonic()
+                if ahead > 0:
+                    time.sleep(ahead)
+            if self.rate_hz:
+                next_burst += 1.0 / self.rate_hz
+                delay = next_burst - time.monotonic()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+
+    def _write(self, chunk: bytes) -> bool:
+        # Write all of chunk, waiting (interruptibly) while the reader is not keeping up
+        view = memoryview(chunk)
+        while view:
+            try:
+                view = view[os.write(self._master, view):]
+            except BlockingIOError:
+                select.select([], [self._master], [], 0.1)
+                if self._stop_event.is_set():
+                    return False
+            except OSError:
+                return False  # reader side went away
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait until `count` lines have been sent (or the emitter stops)."""
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def stop(self) -> None:
+        """Stop emitting and close the pseudo-terminal."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def __enter__(self) -> 'VirtualArduino':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
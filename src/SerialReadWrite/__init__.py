@@ -1,3 +1,23 @@
 # __init__.py inside serialreadwrite/
 from .SerialReader import *  # This will expose all functions from serialtest.py
-from .program import *
\ No newline at end of file
+from .program import *
+from .AsyncSerialReader import *
+from .SerialHub import *
+from .LogSink import *
+from .LineParser import *
+from .Framing import *
+from .Capture import *
+from .LogIndex import *
+from .LogRotation import *
+from .VirtualArduino import *
+from .Metrics import *
+from .DeviceProfile import *
+from .SerialWriter import *
+from .Pipeline import *
+from .RollingStats import *
+from .StreamServer import *
+from .ReplaySource import *
+from .ParallelParser import *
+from .BoundedCapture import *
+from .MonitorRenderer import *
+from .ClockAlignment import *
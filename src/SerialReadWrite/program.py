@@ -1,12 +1,40 @@
 import argparse
+import os
+from datetime import datetime
 from typing import Optional  # Import Optional from typing
-from SerialReader import * # Adjust the import based on the actual structure
+try:
+    import numpy as np
+except ImportError:  # only needed for capture --npz
+    np = None
+try:
+    from .SerialReader import *
+    from .SerialHub import SerialHub
+    from .LogIndex import LogIndex, index_path
+    from .LogRotation import manifest_path, query_segments
+    from .DeviceProfile import discover
+    from .RollingStats import ChannelStats
+    from .StreamServer import StreamServer
+    from .ReplaySource import ReplaySource
+    from .MonitorRenderer import MonitorRenderer
+    from .ClockAlignment import ClockAlignment, DEFAULT_DEVICE_TIME
+except ImportError:
+    from SerialReader import * # Adjust the import based on the actual structure
+    from SerialHub import SerialHub
+    from LogIndex import LogIndex, index_path
+    from LogRotation import manifest_path, query_segments
+    from DeviceProfile import discover
+    from RollingStats import ChannelStats
+    from StreamServer import StreamServer
+    from ReplaySource import ReplaySource
+    from MonitorRenderer import MonitorRenderer
+    from ClockAlignment import ClockAlignment, DEFAULT_DEVICE_TIME
 
 class Program:
 
     _parser: argparse.ArgumentParser       = argparse.ArgumentParser(description="SerialReadWrite CLI for interacting with Arduino")
     _args_in: Optional[argparse.Namespace] = None 
     _SerialReader: Optional[SerialReader]  = None  # SerialReader can be None or an instance
+    _SerialHub: Optional[SerialHub]        = None  # used instead of _SerialReader when several ports are given
 
     @staticmethod
     def main() -> int:
@@ -40,16 +68,66 @@ class Program:
 
         # 'connect' command to detect and connect to Arduino boards
         read_parser = subparsers.add_parser('read', help="Connect and read serial output from Arduino boards")
-        read_parser.add_argument('-p','--port', help="Specify the serial port (e.g., /dev/tty.* or COM3)")
-        read_parser.add_argument('-br','--baud_rate', type=int, default=9600, help="Specify the baud rate (default: 9600)")
+        read_parser.add_argument('-p','--port', action='append', help="Specify the serial port (e.g., /dev/tty.* or COM3); repeat to read several ports."
+                                                                     " Without it, reconnect to the last board (or the only Arduino found)")
+        read_parser.add_argument('-br','--baud_rate', type=int, help="Specify the baud rate (default: last board's, else 9600)")
+        read_parser.add_argument('-l','--log', help="Read from a timestamped log file (written by LogSink) instead of a serial port")
+        read_parser.add_argument('--from', dest='t_from', type=Program.parse_time, help="With --log: start time (epoch seconds or ISO 8601)")
+        read_parser.add_argument('--to', dest='t_to', type=Program.parse_time, help="With --log: end time (epoch seconds or ISO 8601)")
+        read_parser.add_argument('--rebuild-index', action='store_true', help="With --log: rebuild the log's time index before reading")
+        read_parser.add_argument('--replay', help="Replay a recorded log or capture through the reader instead of a serial port")
+        read_parser.add_argument('--speed', type=float, default=1.0, help="With --replay: speed factor, 0 for as fast as possible (default: 1)")
+        read_parser.add_argument('--rate_hz', type=float, help="With --replay of a plain text log: lines per second (default: as fast as possible)")
+        read_parser.add_argument('-a','--aggregate', action='store_true', help="Show rolling statistics of the 'name = number' values instead of every line")
+        read_parser.add_argument('--window', type=int, default=100, help="With --aggregate: window length in values (default: 100)")
+        Program.add_monitor_args(read_parser)
+        Program.add_ready_args(read_parser)
         # ADD MORE FUCNTIOANLITY:`pyduino show` should show the sherial monitor from the last successful connection
         #connect_parser.add_argument('--hide',action='store_true',help="Hide the serial output to the command window.")
 
         # 'connect' command to detect and connect to Arduino boards
         connect_parser = subparsers.add_parser('connect', help="Detect and connect to Arduino boards")
-        connect_parser.add_argument('-p','--port', required=True, help="Specify the serial port (e.g., /dev/tty.* or COM3)")
+        connect_parser.add_argument('-p','--port', action='append', required=True, help="Specify the serial port (e.g., /dev/tty.* or COM3); repeat to connect several ports")
         connect_parser.add_argument('-br','--baud_rate', type=int, default=9600, help="Specify the baud rate (default: 9600)")
         connect_parser.add_argument('-s','--show',action='store_true',help="Hide the serial output to the command window.")
+        Program.add_monitor_args(connect_parser)
+        Program.add_ready_args(connect_parser)
+
+        # 'stats' command to watch acquisition rates and health
+        stats_parser = subparsers.add_parser('stats', help="Connect and print live acquisition rates and counters")
+        stats_parser.add_argument('-p','--port', required=True, help="Specify the serial port (e.g., /dev/tty.* or COM3)")
+        stats_parser.add_argument('-br','--baud_rate', type=int, default=9600, help="Specify the baud rate (default: 9600)")
+        stats_parser.add_argument('-i','--interval', type=float, default=1.0, help="Seconds between printed updates (default: 1)")
+        stats_parser.add_argument('--json', help="Also append a JSON snapshot to this file periodically")
+        stats_parser.add_argument('--json_interval', type=float, default=10.0, help="Seconds between JSON snapshots (default: 10)")
+        stats_parser.add_argument('--align', action='store_true', help="Align device timestamps with the host clock and show latency percentiles and drift")
+        stats_parser.add_argument('--device_time', default=DEFAULT_DEVICE_TIME, help="With --align: regex whose first group is the device time (default: 'Time since start' in ms)")
+        stats_parser.add_argument('--device_units', type=float, default=1e-3, help="With --align: seconds per device time unit (default: 0.001)")
+        stats_parser.add_argument('--latency_alarm_ms', type=float, help="With --align: warn when a line's latency exceeds this")
+        stats_parser.add_argument('--drift_alarm_ppm', type=float, help="With --align: warn when the clock drift exceeds this")
+        Program.add_ready_args(stats_parser)
+
+        # 'serve' command to share one port with many local consumers
+        serve_parser = subparsers.add_parser('serve', help="Own the serial port(s) and broadcast the stream to subscribers over a socket")
+        serve_parser.add_argument('-p','--port', action='append', required=True, help="Specify the serial port (e.g., /dev/tty.* or COM3); repeat to serve several ports")
+        serve_parser.add_argument('-br','--baud_rate', type=int, default=9600, help="Specify the baud rate (default: 9600)")
+        serve_parser.add_argument('-a','--address', default='data/serial.sock', help="Unix socket path or host:port to listen on (default: data/serial.sock)")
+        serve_parser.add_argument('--max_queue_kb', type=int, default=1024, help="Unsent KiB allowed per subscriber before it counts as slow (default: 1024)")
+        serve_parser.add_argument('--slow_client', choices=['disconnect', 'drop'], default='disconnect', help="Disconnect slow subscribers or drop the data they miss (default: disconnect)")
+        serve_parser.add_argument('--timestamps', action='store_true', help="With several ports: prefix lines with their receive time")
+        Program.add_ready_args(serve_parser)
+
+        # 'capture' command for bounded calibration runs
+        capture_parser = subparsers.add_parser('capture', help="Capture a fixed duration or number of lines to a file")
+        capture_parser.add_argument('-p','--port', required=True, help="Specify the serial port (e.g., /dev/tty.* or COM3)")
+        capture_parser.add_argument('-br','--baud_rate', type=int, default=9600, help="Specify the baud rate (default: 9600)")
+        capture_parser.add_argument('-d','--duration', type=float, help="Seconds to capture")
+        capture_parser.add_argument('-n','--count', type=int, help="Lines to capture (with --duration: whichever comes first)")
+        capture_parser.add_argument('-o','--output', default='data/capture.txt', help="File the raw lines are written to (default: data/capture.txt)")
+        capture_parser.add_argument('--stream', action='store_true', help="Write lines as they arrive instead of once at the end")
+        capture_parser.add_argument('--template', help="LineParser template (e.g. 'Time since start: {time:int}  ... Data = {data:int}') for --npz")
+        capture_parser.add_argument('--npz', help="Also save the parsed columns to this NumPy .npz file (needs --template)")
+        Program.add_ready_args(capture_parser)
 
         # # Monitor command: Make it simple som that after an ardunio board has been connected you can jsut say monitor to load the alst connection
         # #                   and start the monitoring process
@@ -62,6 +140,170 @@ class Program:
 
 
 
+    @staticmethod
+    def add_ready_args(parser: argparse.ArgumentParser) -> None:
+        """Add the connection readiness options shared by the subcommands that open a port."""
+        parser.add_argument('--ready', choices=['sleep', 'line', 'token'],
+                            help="How to detect that the board is up: fixed sleep, first complete line, or --ready_token (default: line)")
+        parser.add_argument('--ready_token', help="With --ready token: text the firmware prints once it has booted")
+        parser.add_argument('--ready_timeout', type=float, help="Maximum seconds to wait for the board; --ready line then carries on anyway (default: 5)")
+        parser.add_argument('--no_reset', action='store_true', default=None, help="Keep DTR low when opening the port so the board is not reset")
+
+    @staticmethod
+    def ready_kwargs(args: argparse.Namespace, defaults: bool = True) -> dict:
+        """SerialReader keyword arguments for the readiness options given; with defaults, fill in the CLI defaults for the rest."""
+        given = dict(ready=args.ready, ready_token=args.ready_token, ready_timeout=args.ready_timeout, suppress_reset=args.no_reset)
+        kwargs = {key: value for key, value in given.items() if value is not None}
+        return {**dict(ready='line', ready_timeout=5.0, suppress_reset=False), **kwargs} if defaults else kwargs
+
+    @staticmethod
+    def add_monitor_args(parser: argparse.ArgumentParser) -> None:
+        """Add the live monitor display options."""
+        parser.add_argument('--refresh_hz', type=float, help="Display refresh rate (default: 30, or 4 with --aggregate)")
+        parser.add_argument('--view', choices=['tail', 'head', 'latest'], default='tail',
+                            help="Per refresh show the newest lines, the oldest lines, or the latest line per key (default: tail)")
+        parser.add_argument('--max_lines', type=int, default=100, help="Lines shown per refresh; the rest are counted as skipped (default: 100)")
+
+    @staticmethod
+    def monitor_kwargs(args: argparse.Namespace) -> dict:
+        """SerialReader/SerialHub keyword arguments for the coalesced monitor display (unless --aggregate replaces it)."""
+        if getattr(args, 'aggregate', False):
+            return {}
+        return dict(monitor=MonitorRenderer(refresh_hz=args.refresh_hz or 30.0, max_lines=args.max_lines, view=args.view))
+
+    @staticmethod
+    def aggregate_kwargs(args: argparse.Namespace) -> dict:
+        """SerialReader keyword arguments for read --aggregate."""
+        if not args.aggregate:
+            return {}
+        return dict(aggregates=ChannelStats(window=args.window), refresh_hz=args.refresh_hz or 4.0)
+
+    @staticmethod
+    def alignment_kwargs(args: argparse.Namespace) -> dict:
+        """SerialReader keyword arguments for stats --align."""
+        if not args.align:
+            return {}
+        latency_alarm = args.latency_alarm_ms / 1e3 if args.latency_alarm_ms is not None else None
+        return dict(alignment=ClockAlignment(args.device_time, units=args.device_units, latency_alarm_s=latency_alarm,
+                                             drift_alarm_ppm=args.drift_alarm_ppm))
+
+    @staticmethod
+    def last_reader(args: argparse.Namespace) -> SerialReader:
+        """SerialReader for `read` without -p: the last-good board from the device profile, else the only Arduino attached."""
+        overrides = Program.ready_kwargs(args, defaults=False)  # the profile remembers the board's own settings
+        if args.baud_rate:
+            overrides['baud_rate'] = args.baud_rate
+        overrides.update(Program.aggregate_kwargs(args))
+        overrides.update(Program.monitor_kwargs(args))
+        reader = SerialReader.load_last_config(display_to_command=True, **overrides)
+        if reader is not None:
+            return reader
+        boards = discover()
+        if len(boards) != 1:
+            found = ', '.join(f"{b['port']} ({b['description']})" for b in boards) or "none"
+            raise Exception(f"No previous board to reconnect to and no single Arduino found ({found}); specify one with -p.")
+        overrides = {**Program.ready_kwargs(args), 'baud_rate': 9600, **overrides}
+        return SerialReader(port=boards[0]["port"], display_to_command=True, **overrides)
+
+    @staticmethod
+    def parse_time(value: str) -> float:
+        """Parse a CLI time given as epoch seconds or an ISO 8601 date/time (local time if no offset)."""
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid time '{value}' (expected epoch seconds or ISO 8601)")
+
+    @staticmethod
+    def read_log(logfile: str, t_from: Optional[float] = None, t_to: Optional[float] = None, rebuild: bool = False) -> None:
+        """Print the lines of a timestamped log between t_from and t_to using its sidecar index (rotated segments first)."""
+        if os.path.exists(manifest_path(logfile)):
+            for timestamp, line in query_segments(logfile, t_from, t_to):
+                print(f"{datetime.fromtimestamp(timestamp).isoformat()} {line}")
+        if rebuild or not os.path.exists(index_path(logfile)):
+            index = LogIndex.rebuild(logfile)
+        else:
+            index = LogIndex(logfile)
+        for timestamp, line in index.query(t_from, t_to):
+            print(f"{datetime.fromtimestamp(timestamp).isoformat()} {line}")
+
+    @staticmethod
+    def show_stats(port: str, baud_rate: int, interval: float = 1.0, json_file: Optional[str] = None, json_interval: float = 10.0,
+                   **kwargs) -> None:
+        """Read a port on the threaded reader and print its stats() every interval seconds until interrupted."""
+        Program._SerialReader = SerialReader(port=port, baud_rate=baud_rate, display_to_command=False, threaded=True, **kwargs)
+        reader = Program._SerialReader
+        reader.connect()
+        if json_file:
+            reader.start_metrics_dump(json_file, json_interval)
+        try:
+            last = None
+            next_print = time.monotonic() + interval
+            while True:
+                reader.get_batch(4096, timeout=max(next_print - time.monotonic(), 0))
+                if time.monotonic() < next_print:
+                    continue
+                next_print += interval
+                s = last = reader.stats(last)
+                p99 = s['loop_time_p99_s']
+                print(f"{s['lines_per_s']:9.1f} lines/s {s['bytes_per_s']:10.0f} B/s | total {s['lines_received']} lines"
+                      f" | dropped {s['lines_dropped']} | decode errors {s['decode_errors']}"
+                      f" | peak in_waiting {s['peak_in_waiting']} | buffered {s['buffered']}/{s['buffer_size']}"
+                      f" | loop p99 {'-' if p99 is None else f'{p99 * 1e3:.3f} ms'}"
+                      + (f" | {reader.alignment.format()}" if reader.alignment is not None else ""))
+        finally:
+            reader.close()
+
+    @staticmethod
+    def capture(args: argparse.Namespace) -> None:
+        """Connect, capture --duration seconds and/or --count lines to --output, and optionally save parsed columns."""
+        if args.duration is None and args.count is None:
+            raise Exception("capture needs --duration and/or --count")
+        if args.npz and not args.template:
+            raise Exception("--npz needs --template to parse the lines")
+        if args.npz and np is None:
+            raise Exception("--npz needs NumPy (pip install numpy)")
+        if os.path.dirname(args.output):
+            os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        Program._SerialReader = reader = SerialReader(port=args.port, baud_rate=args.baud_rate, display_to_command=False,
+                                                      **Program.ready_kwargs(args))
+        reader.connect()
+        try:
+            result = reader.capture(args.duration, args.count, filename=args.output, stream=args.stream)
+        finally:
+            reader.close()
+        print(f"Captured {result.line_count} lines ({result.nbytes} bytes) in {result.elapsed:.2f} s to {args.output}")
+        if args.npz:
+            if args.stream:  # the lines were not kept in memory; read them back once
+                with open(args.output, 'rb') as file:
+                    result = CaptureResult(memoryview(file.read()), result.line_count, result.nbytes, result.started,
+                                           result.elapsed, args.output)
+            parser = LineParser(args.template)
+            columns = result.arrays(parser)
+            np.savez(args.npz, **{name: np.asarray(values) for name, values in columns.items()})
+            print(f"Parsed {parser.parsed} lines ({parser.malformed} malformed) into {args.npz}")
+
+    @staticmethod
+    def serve(args: argparse.Namespace) -> None:
+        """Read the given port(s) on a background thread and broadcast the lines until interrupted."""
+        if len(args.port) > 1:
+            Program._SerialHub = source = SerialHub(args.port, baud_rate=args.baud_rate)
+        else:
+            Program._SerialReader = source = SerialReader(port=args.port[0], baud_rate=args.baud_rate, display_to_command=False,
+                                                          threaded=True, **Program.ready_kwargs(args))
+        source.connect()
+        if args.address and os.path.dirname(args.address) and ':' not in args.address:
+            os.makedirs(os.path.dirname(args.address), exist_ok=True)
+        server = StreamServer(source, args.address, max_queue_bytes=args.max_queue_kb * 1024,
+                              slow_client=args.slow_client, timestamps=args.timestamps)
+        try:
+            server.serve_forever()
+        finally:
+            source.close()
+
     @staticmethod
     def handle_args(args: argparse.Namespace) -> None:
         if args.command == 'connect':
@@ -69,20 +311,57 @@ class Program:
             _disp_to_cmd = False; 
             if args.show:
                 _disp_to_cmd = True
+            if len(args.port) > 1:
+                Program._SerialHub = SerialHub(args.port, baud_rate=args.baud_rate, display_to_command = _disp_to_cmd,
+                                               **Program.monitor_kwargs(args))
+                Program._SerialHub.connect()
+                return
             # Create serial reaer object
-            Program._SerialReader = SerialReader(port=args.port, baud_rate=args.baud_rate, display_to_command = _disp_to_cmd)
+            Program._SerialReader = SerialReader(port=args.port[0], baud_rate=args.baud_rate, display_to_command = _disp_to_cmd,
+                                                 **Program.ready_kwargs(args), **Program.monitor_kwargs(args))
             Program._SerialReader.connect()
             return
         
         if args.command == 'read':
+            if args.log:
+                Program.read_log(args.log, args.t_from, args.t_to, args.rebuild_index)
+                return
+            if args.replay:
+                Program._SerialReader = ReplaySource(args.replay, speed=args.speed or None, rate_hz=args.rate_hz,
+                                                     display_to_command=True, **Program.aggregate_kwargs(args),
+                                                     **Program.monitor_kwargs(args))
+                Program._SerialReader.connect()
+                return
             # Create serial reaer object
             if not args.port:
-                pass
-            Program._SerialReader = SerialReader(port=args.port, baud_rate=args.baud_rate, display_to_command = True)
+                Program._SerialReader = Program.last_reader(args)
+                Program._SerialReader.connect()
+                return
+            baud_rate = args.baud_rate or 9600
+            if len(args.port) > 1:
+                if args.aggregate:
+                    raise Exception("--aggregate reads a single port; pass one -p or drop --aggregate.")
+                Program._SerialHub = SerialHub(args.port, baud_rate=baud_rate, display_to_command = True,
+                                               **Program.monitor_kwargs(args))
+                Program._SerialHub.connect()
+                return
+            Program._SerialReader = SerialReader(port=args.port[0], baud_rate=baud_rate, display_to_command = True,
+                                                 **Program.ready_kwargs(args), **Program.aggregate_kwargs(args),
+                                                 **Program.monitor_kwargs(args))
             Program._SerialReader.connect()
             return
         
-        elif args.commmand == 'help':
+        elif args.command == 'serve':
+            Program.serve(args)
+
+        elif args.command == 'capture':
+            Program.capture(args)
+
+        elif args.command == 'stats':
+            Program.show_stats(args.port, args.baud_rate, args.interval, args.json, args.json_interval, **Program.ready_kwargs(args),
+                               **Program.alignment_kwargs(args))
+
+        elif args.command == 'help':
             Program._parser.print_help()
 
         else:
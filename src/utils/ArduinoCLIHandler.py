@@ -1,15 +1,41 @@
 import subprocess
 import platform
 import os
-from typing import Optional
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
 import time
 from .utils import input_with_timeout
+from .BuildCache import BuildCache
+
+
+class BoardResult(NamedTuple):
+    board: str      # serial port for uploads, FQBN for compiles
+    action: str     # 'compile' or 'upload'
+    ok: bool
+    seconds: float
+    output: str     # arduino-cli's combined stdout/stderr (or the error)
+
+
+def print_progress(result: BoardResult, done: int, total: int) -> None:
+    """Default progress callback of the batch operations: one status line per finished board."""
+    status = "ok" if result.ok else "FAILED"
+    print(f"[{done}/{total}] {result.action} {result.board}: {status} ({result.seconds:.1f} s)")
+    if not result.ok and result.output:
+        print("    " + result.output.strip().splitlines()[-1])
+
 
 class ArduinoCLIHandler:
 
     _recommendation_given = False  # Class-level flag
     _arduino_cli_installed = False
     _package_manager = None
+    _probe_cache: Dict[str, dict] = {}       # command -> probe result, valid while PATH and the executable are unchanged
+    _probe_lock = threading.Lock()
+    PROBE_CACHE_FILE = 'data/toolchain.json'
+    BUILD_DIR = 'data/build'
     
     def __init__(self):
         """
@@ -70,7 +96,7 @@ class ArduinoCLIHandler:
         print("It is recommended to install `ardunio-cli` on your machine to enable automation of Arudino boards with this SerialReadWrite console application.\n")
         if ArduinoCLIHandler._recommendation_given:  # Class-level flag
             out = input_with_timeout("Would you like to know how where/how to install ardunio-cli? (Y/n):", 2.5)
-            if out.lower() == "y" or out is "":
+            if out.lower() == "y" or out == "":
                 ArduinoCLIHandler.print_rec()
                 return
         
@@ -108,18 +134,71 @@ class ArduinoCLIHandler:
         # Return none if no package manager is found
         return None
     
+    @staticmethod
+    def probe(command: str, refresh: bool = False) -> Optional[dict]:
+        """
+        Run `command --version` once and remember the result, in this process and in PROBE_CACHE_FILE for later runs.
+        The cached result is reused until PATH changes or the executable is replaced (path or mtime differs).
+
+        :param command: Executable to probe (e.g., arduino-cli, brew).
+        :param refresh: Ignore the caches and run the command again (default: False).
+        :return: {"path", "mtime", "PATH", "ok", "version"}, or None if the command is not on PATH.
+        """
+        path = shutil.which(command) if command else None
+        if path is None:
+            return None  # nothing to run
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        key = {"path": path, "mtime": mtime, "PATH": os.environ.get("PATH", "")}
+        with ArduinoCLIHandler._probe_lock:
+            if not refresh:
+                cached = ArduinoCLIHandler._probe_cache.get(command)
+                if cached is None:
+                    cached = ArduinoCLIHandler._load_probes().get(command)
+                if cached is not None and all(cached.get(k) == v for k, v in key.items()):
+                    ArduinoCLIHandler._probe_cache[command] = cached
+                    return cached
+            try:
+                result = subprocess.run([path, "--version"], capture_output=True, text=True)
+                entry = dict(key, ok=result.returncode == 0, version=(result.stdout or result.stderr).strip())
+            except OSError as e:
+                entry = dict(key, ok=False, version=str(e))
+            ArduinoCLIHandler._probe_cache[command] = entry
+            probes = ArduinoCLIHandler._load_probes()
+            probes[command] = entry
+            ArduinoCLIHandler._save_probes(probes)
+            return entry
+
+    @staticmethod
+    def _load_probes() -> Dict[str, dict]:
+        try:
+            with open(ArduinoCLIHandler.PROBE_CACHE_FILE) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_probes(probes: Dict[str, dict]) -> None:
+        path = ArduinoCLIHandler.PROBE_CACHE_FILE
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp = path + '.tmp'
+            with open(tmp, 'w') as file:
+                json.dump(probes, file, indent=4)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Error: Could not save toolchain cache {path}: {e}")
+
     @staticmethod
     def is_command_available(command: str) -> bool:
         """
         Check if a given command is available on the system (e.g., brew, apt-get, choco).
+        The check is cached (see probe()).
         """
-        try:
-            subprocess.run([command, "--version"], capture_output=True, check=True)
-            return True
-        except subprocess.CalledProcessError:
-            return False
-        except FileNotFoundError:
-            return False
+        entry = ArduinoCLIHandler.probe(command)
+        return entry is not None and entry["ok"]
 
     @staticmethod
     def install_arduino_cli_with_manager(manager: str) -> None:
@@ -174,20 +253,19 @@ class ArduinoCLIHandler:
     @staticmethod
     def check_arduino_cli_installed() -> bool:
         """
-        Check if 'arduino-cli' is installed by running 'arduino-cli --version'.
+        Check if 'arduino-cli' is installed by running 'arduino-cli --version' (cached, see probe()).
         Returns True if installed, False otherwise.
         """
-        try:
-            result = subprocess.run(["arduino-cli", "--version"], capture_output=True, text=True, check=True)
-            print(f"arduino-cli version: {result.stdout.strip()}")
-            ArduinoCLIHandler._arduino_cli_installed = True
-            return True
-        except subprocess.CalledProcessError:
-            print("Error: 'arduino-cli' is installed but returned an error.")
-            return False
-        except FileNotFoundError:
+        entry = ArduinoCLIHandler.probe("arduino-cli")
+        if entry is None:
             print("'arduino-cli' is not installed.")
             return False
+        if not entry["ok"]:
+            print("Error: 'arduino-cli' is installed but returned an error.")
+            return False
+        print(f"arduino-cli version: {entry['version']}")
+        ArduinoCLIHandler._arduino_cli_installed = True
+        return True
 
     @staticmethod
     def check_and_install_arduino_cli() -> None:
@@ -214,3 +292,165 @@ class ArduinoCLIHandler:
             else:
                 # If no package manager found, recommend installation manually
                 ArduinoCLIHandler.recommend_arduino_cli_installation()
+
+    @staticmethod
+    def _require_cli() -> str:
+        entry = ArduinoCLIHandler.probe("arduino-cli")
+        if entry is None or not entry["ok"]:
+            raise Exception("arduino-cli is required to build and upload sketches (see check_and_install_arduino_cli()).")
+        return entry["path"]
+
+    @staticmethod
+    def _run_cli(action: str, board: str, args: List[str], timeout: Optional[float] = None) -> BoardResult:
+        # Run one arduino-cli command; failures are reported in the result, not raised, so one board can't stop a batch
+        t0 = time.monotonic()
+        try:
+            result = subprocess.run([ArduinoCLIHandler._require_cli()] + args, capture_output=True, text=True, timeout=timeout)
+            ok, output = result.returncode == 0, (result.stdout + result.stderr).strip()
+        except subprocess.TimeoutExpired:
+            ok, output = False, f"timed out after {timeout} s"
+        except Exception as e:
+            ok, output = False, str(e)
+        return BoardResult(board, action, ok, time.monotonic() - t0, output)
+
+    @staticmethod
+    def build_path(fqbn: str) -> str:
+        """Build directory used for a board type (one per FQBN, so boards of the same type share a build)."""
+        return os.path.join(ArduinoCLIHandler.BUILD_DIR, fqbn.replace(':', '_'))
+
+    @staticmethod
+    def compile_sketch(sketch: str, fqbn: str, build_path: Optional[str] = None, timeout: Optional[float] = None,
+                       cache: Optional[BuildCache] = None) -> BoardResult:
+        """
+        Compile a sketch for one board type.
+
+        :param sketch: Sketch directory or .ino file.
+        :param fqbn: Fully qualified board name (e.g., arduino:avr:uno).
+        :param build_path: Where to put the build (default: build_path(fqbn)).
+        :param timeout: Seconds before giving up (default: None).
+        :param cache: Reuse the build stored in this BuildCache when nothing the build depends on changed (default: None).
+        """
+        build_path = build_path or ArduinoCLIHandler.build_path(fqbn)
+        key = None
+        if cache is not None:
+            t0 = time.monotonic()
+            try:
+                ArduinoCLIHandler._require_cli()  # the key includes its version; report a missing CLI like _run_cli()
+            except Exception as e:
+                return BoardResult(fqbn, "compile", False, time.monotonic() - t0, str(e))
+            key = cache.key(sketch, fqbn, ArduinoCLIHandler.probe("arduino-cli")["version"])
+            if cache.restore(key, build_path):
+                return BoardResult(fqbn, "compile", True, time.monotonic() - t0, f"build cache hit {key[:12]}")
+        result = ArduinoCLIHandler._run_cli("compile", fqbn, ["compile", "--fqbn", fqbn, "--build-path", build_path, sketch], timeout)
+        if key is not None and result.ok:
+            cache.store(key, build_path, fqbn=fqbn, sketch=os.path.abspath(sketch))
+        return result
+
+    @staticmethod
+    def upload_sketch(sketch: str, port: str, fqbn: str, input_dir: Optional[str] = None,
+                      timeout: Optional[float] = None) -> BoardResult:
+        """
+        Upload a sketch to the board on port. With input_dir, the binaries compiled there are flashed without rebuilding.
+
+        :param sketch: Sketch directory or .ino file.
+        :param port: Serial port of the board (e.g., /dev/ttyACM0 or COM3).
+        :param fqbn: Fully qualified board name (e.g., arduino:avr:uno).
+        :param input_dir: Directory holding the compiled binaries (default: None, arduino-cli compiles first).
+        :param timeout: Seconds before giving up (default: None).
+        """
+        args = ["upload", "-p", port, "--fqbn", fqbn]
+        if input_dir:
+            args += ["--input-dir", input_dir]
+        return ArduinoCLIHandler._run_cli("upload", port, args + [sketch], timeout)
+
+    @staticmethod
+    def list_boards() -> List[Tuple[str, str]]:
+        """Return (port, fqbn) for every connected board arduino-cli recognizes."""
+        result = ArduinoCLIHandler._run_cli("list", "", ["board", "list", "--format", "json"])
+        if not result.ok:
+            raise Exception(f"arduino-cli board list failed: {result.output}")
+        try:
+            data = json.loads(result.output)
+        except ValueError:
+            raise Exception(f"Unexpected output from arduino-cli board list: {result.output[:200]}")
+        if isinstance(data, dict):
+            data = data.get("detected_ports", [])  # arduino-cli >= 0.35; older versions return the list itself
+        boards = []
+        for entry in data:
+            port = entry.get("port", {}).get("address") or entry.get("address")
+            for match in entry.get("matching_boards") or entry.get("boards") or []:
+                if port and match.get("fqbn"):
+                    boards.append((port, match["fqbn"]))
+                    break
+        return boards
+
+    @staticmethod
+    def _fan_out(jobs: Sequence[Tuple[str, Callable[[], BoardResult]]], workers: Optional[int],
+                 progress: Optional[Callable[[BoardResult, int, int], None]]) -> Dict[str, BoardResult]:
+        # Run the jobs on a thread pool (arduino-cli does the work in subprocesses) and report each as it finishes
+        results = {}
+        if not jobs:
+            return results
+        with ThreadPoolExecutor(max_workers=workers or len(jobs)) as pool:
+            futures = {pool.submit(job): name for name, job in jobs}
+            for future in as_completed(futures):
+                result = results[futures[future]] = future.result()
+                if progress is not None:
+                    progress(result, len(results), len(jobs))
+        return results
+
+    @staticmethod
+    def compile_many(sketch: str, fqbns: Sequence[str], workers: Optional[int] = None, timeout: Optional[float] = None,
+                     progress: Optional[Callable[[BoardResult, int, int], None]] = print_progress,
+                     cache: Optional[BuildCache] = None) -> Dict[str, BoardResult]:
+        """
+        Compile a sketch for several board types in parallel (each distinct FQBN once).
+
+        :param workers: Concurrent compiles (default: os.cpu_count()).
+        :param progress: Called with (result, finished, total) as each compile ends; None for silence (default: print_progress).
+        :param cache: BuildCache to reuse unchanged builds from; its hit rate is printed afterwards (default: None).
+        :return: {fqbn: BoardResult}
+        """
+        ArduinoCLIHandler._require_cli()
+        fqbns = list(dict.fromkeys(fqbns))
+        jobs = [(fqbn, lambda fqbn=fqbn: ArduinoCLIHandler.compile_sketch(sketch, fqbn, timeout=timeout, cache=cache))
+                for fqbn in fqbns]
+        results = ArduinoCLIHandler._fan_out(jobs, workers or min(len(jobs), os.cpu_count() or 1), progress)
+        if cache is not None:
+            print(cache.report())
+        return results
+
+    @staticmethod
+    def upload_many(sketch: str, boards: Sequence[Tuple[str, str]], workers: Optional[int] = None, compile: bool = True,
+                    timeout: Optional[float] = None,
+                    progress: Optional[Callable[[BoardResult, int, int], None]] = print_progress,
+                    cache: Optional[BuildCache] = None) -> List[BoardResult]:
+        """
+        Flash a sketch to many boards at once: each board type is compiled once, then every board is uploaded in
+        parallel, so a rack of boards takes about as long as the slowest one instead of the sum of all of them.
+
+        :param sketch: Sketch directory or .ino file.
+        :param boards: (port, fqbn) pairs, e.g. from list_boards().
+        :param workers: Concurrent uploads (default: one per board).
+        :param compile: Compile first; if False, upload the builds already in build_path(fqbn) (default: True).
+        :param timeout: Seconds before a single compile or upload is abandoned (default: None).
+        :param progress: Called with (result, finished, total) as each board finishes; None for silence (default: print_progress).
+        :param cache: BuildCache for the compile step, so unchanged firmware is not rebuilt (default: None).
+        :return: One BoardResult per board, in the order given (the compile's result for boards whose build failed).
+        """
+        ArduinoCLIHandler._require_cli()
+        builds = {}
+        if compile:
+            builds = ArduinoCLIHandler.compile_many(sketch, [fqbn for _, fqbn in boards], timeout=timeout, progress=progress,
+                                                    cache=cache)
+        jobs = []
+        for port, fqbn in boards:
+            if fqbn in builds and not builds[fqbn].ok:
+                continue
+            jobs.append((port, lambda port=port, fqbn=fqbn: ArduinoCLIHandler.upload_sketch(
+                sketch, port, fqbn, ArduinoCLIHandler.build_path(fqbn), timeout)))
+        uploads = ArduinoCLIHandler._fan_out(jobs, workers, progress)
+        results = [uploads.get(port) or builds[fqbn] for port, fqbn in boards]
+        failed = sum(not r.ok for r in results)
+        print(f"Uploaded {len(results) - failed}/{len(results)} board(s)" + (f", {failed} failed" if failed else ""))
+        return results
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+
+# Files of a sketch that affect its build
+SOURCE_EXTENSIONS = ('.ino', '.pde', '.c', '.cpp', '.cc', '.h', '.hpp', '.hh', '.s', '.S')
+# Build outputs arduino-cli upload needs (--input-dir)
+ARTIFACT_EXTENSIONS = ('.hex', '.bin', '.elf', '.eep', '.uf2', '.map')
+
+_INCLUDE = re.compile(rb'^\s*#\s*include\s*[<"]([^>"]+)[>"]', re.MULTILINE)
+
+
+def default_library_dirs() -> List[str]:
+    """Library folders arduino-cli searches by default (the sketchbook's libraries folder)."""
+    home = os.path.expanduser('~')
+    return [os.path.join(home, 'Arduino', 'libraries'), os.path.join(home, 'Documents', 'Arduino', 'libraries')]
+
+
+def default_data_dirs() -> List[str]:
+    """Where arduino-cli installs board platforms (cores) on Linux, macOS and Windows."""
+    home = os.path.expanduser('~')
+    return [os.path.join(home, '.arduino15'), os.path.join(home, 'Library', 'Arduino15'),
+            os.path.join(os.environ.get('LOCALAPPDATA', home), 'Arduino15')]
+
+
+def sketch_dir(sketch: str) -> str:
+    """A sketch may be given as its folder or its main .ino file."""
+    return sketch if os.path.isdir(sketch) else os.path.dirname(os.path.abspath(sketch))
+
+
+def _source_files(root: str) -> List[str]:
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != 'build')
+        files += [os.path.join(dirpath, f) for f in sorted(filenames) if f.endswith(SOURCE_EXTENSIONS)]
+    return files
+
+
+class BuildCache:
+
+
+    def __init__(self, path: str = 'data/build_cache', max_bytes: int = 512 << 20,
+                 library_dirs: Optional[Sequence[str]] = None, data_dirs: Optional[Sequence[str]] = None):
+        """
+        Content-addressed store of compiled sketches. A build is keyed by a hash of the sketch sources, the libraries
+        they include, the FQBN, the installed core and the arduino-cli version, so an unchanged sketch is never
+        compiled twice for the same board. Least recently used builds are evicted once the cache exceeds max_bytes.
+
+        :param path: Cache directory (default: data/build_cache).
+        :param max_bytes: Size limit of the stored artifacts (default: 512 MiB).
+        :param library_dirs: Folders holding installed libraries (default: default_library_dirs()).
+        :param data_dirs: arduino-cli data folders holding the installed cores (default: default_data_dirs()).
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.library_dirs = list(library_dirs) if library_dirs is not None else default_library_dirs()
+        self.data_dirs = list(data_dirs) if data_dirs is not None else default_data_dirs()
+        self.hits = 0        # this session
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index_file = os.path.join(path, 'index.json')
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self._index_file) as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault('entries', {})
+        index.setdefault('hits', 0)
+        index.setdefault('misses', 0)
+        return index
+
+    def _save_index(self) -> None:
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            tmp = self._index_file + '.tmp'
+            with open(tmp, 'w') as file:
+                json.dump(self._index, file, indent=4)
+            os.replace(tmp, self._index_file)
+        except OSError as e:
+            print(f"Error: Could not save build cache index {self._index_file}: {e}")
+
+    def _libraries(self, headers: set) -> List[str]:
+        # Library folders providing any of the included headers (at their top level or in src/)
+        found = []
+        for root in self.library_dirs:
+            if not os.path.isdir(root):
+                continue
+            for name in sorted(os.listdir(root)):
+                lib = os.path.join(root, name)
+                if any(os.path.isfile(os.path.join(lib, sub, h)) for h in headers for sub in ('', 'src')):
+                    found.append(lib)
+        return found
+
+    def _cores(self, fqbn: str) -> List[str]:
+        # Installed versions of the board's platform, e.g. packages/arduino/hardware/avr/1.8.6
+        vendor, _, rest = fqbn.partition(':')
+        arch = rest.partition(':')[0]
+        versions = []
+        for root in self.data_dirs:
+            hardware = os.path.join(root, 'packages', vendor, 'hardware', arch)
+            if os.path.isdir(hardware):
+                versions += [os.path.join(hardware, v) for v in sorted(os.listdir(hardware))]
+        return versions
+
+    def key(self, sketch: str, fqbn: str, toolchain: str = '', flags: Sequence[str] = ()) -> str:
+        """
+        Hash everything that determines a build.
+
+        Sketch files are hashed by content. Library and core files are fingerprinted by path, size and modification
+        time, which is enough to notice an update without reading every installed file.
+
+        :param sketch: Sketch folder or main .ino file.
+        :param fqbn: Fully qualified board name.
+        :param toolchain: arduino-cli version string.
+        :param flags: Extra compile arguments that change the output.
+        """
+        digest = hashlib.sha256()
+        for part in (fqbn, toolchain, *flags):
+            digest.update(part.encode() + b'\0')
+        root = sketch_dir(sketch)
+        headers = set()
+        for filename in _source_files(root):
+            with open(filename, 'rb') as file:
+                content = file.read()
+            headers.update(h.decode('utf-8', 'replace') for h in _INCLUDE.findall(content))
+            digest.update(os.path.relpath(filename, root).encode() + b'\0' + hashlib.sha256(content).digest())
+        for folder in self._libraries(headers) + self._cores(fqbn):
+            digest.update(folder.encode() + b'\0')
+            for filename in _source_files(folder):
+                st = os.stat(filename)
+                digest.update(f"{os.path.relpath(filename, folder)}:{st.st_size}:{st.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    def restore(self, key: str, build_path: str) -> bool:
+        """Copy the artifacts stored under key into build_path. Returns False (a miss) if there are none."""
+        with self._lock:
+            entry = self._index['entries'].get(key)
+            stored = os.path.join(self.path, key)
+            if entry is None or not os.path.isdir(stored):
+                self._index['entries'].pop(key, None)
+                self.misses += 1
+                self._index['misses'] += 1
+                self._save_index()
+                return False
+            os.makedirs(build_path, exist_ok=True)
+            for name in os.listdir(stored):
+                shutil.copy2(os.path.join(stored, name), os.path.join(build_path, name))
+            entry['last_used'] = time.time()
+            self.hits += 1
+            self._index['hits'] += 1
+            self._save_index()
+            return True
+
+    def store(self, key: str, build_path: str, **meta) -> None:
+        """Keep the artifacts of a successful build under key, then evict old builds beyond max_bytes."""
+        artifacts = [name for name in os.listdir(build_path)
+                     if name.endswith(ARTIFACT_EXTENSIONS) and os.path.isfile(os.path.join(build_path, name))]
+        if not artifacts:
+            return
+        with self._lock:
+            stored = os.path.join(self.path, key)
+            tmp = stored + '.tmp'
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(tmp)
+            size = 0
+            for name in artifacts:
+                shutil.copy2(os.path.join(build_path, name), os.path.join(tmp, name))
+                size += os.path.getsize(os.path.join(tmp, name))
+            shutil.rmtree(stored, ignore_errors=True)
+            os.replace(tmp, stored)
+            self._index['entries'][key] = dict(meta, size=size, created=time.time(), last_used=time.time())
+            self._evict()
+            self._save_index()
+
+    def _evict(self) -> None:
+        entries = self._index['entries']
+        total = sum(e['size'] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= entries.pop(key)['size']
+            shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+
+    def clear(self) -> None:
+        """Remove every stored build (the hit/miss counters are kept)."""
+        with self._lock:
+            for key in list(self._index['entries']):
+                shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+            self._index['entries'] = {}
+            self._save_index()
+
+    @property
+    def size(self) -> int:
+        return sum(e['size'] for e in self._index['entries'].values())
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache this session (NaN before the first lookup)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else float('nan')
+
+    def stats(self) -> Dict[str, float]:
+        """Session and all-time hit counts, hit rates and the cache's size."""
+        lookups = self._index['hits'] + self._index['misses']
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "total_hits": self._index['hits'], "total_misses": self._index['misses'],
+                "total_hit_rate": self._index['hits'] / lookups if lookups else float('nan'),
+                "entries": len(self._index['entries']), "bytes": self.size, "max_bytes": self.max_bytes}
+
+    def report(self) -> str:
+        s = self.stats()
+        return (f"Build cache: {s['hits']} hit(s), {s['misses']} miss(es) ({s['hit_rate']:.0%} this session, "
+                f"{s['total_hit_rate']:.0%} overall); {s['entries']} build(s), {s['bytes'] / 1e6:.1f}/{s['max_bytes'] / 1e6:.0f} MB")
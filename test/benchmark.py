@@ -0,0 +1,180 @@
+
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.SerialReader import SerialReader
+from src.SerialReadWrite.VirtualArduino import VirtualArduino
+import argparse
+import contextlib
+import io
+import json
+import resource
+import tempfile
+import threading
+import time
+
+# Throughput/latency benchmark for the SerialReader read paths, driven by a VirtualArduino on a pseudo-terminal.
+# Each line carries the time.monotonic() at which it was written, so end-to-end latency is measured per line.
+#
+#   python test/benchmark.py --duration 3 --baud 9600 115200 1000000 --length 16 64
+
+PATTERN = "{sent} Data = {data}"
+
+
+class Stats:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.lines = 0
+        self.bytes = 0
+        self.latencies = []
+
+    def add(self, line: str) -> None:
+        now = time.monotonic()
+        self.lines += 1
+        self.bytes += len(line) + 2  # plus the '\r\n' stripped by the reader
+        try:
+            self.latencies.append(now - float(line.split(' ', 1)[0]))
+        except ValueError:
+            pass
+
+
+class LatencyStdout(io.TextIOBase):
+    # Stands in for sys.stdout while display_to_command runs so printed lines are counted rather than shown
+
+    def __init__(self, stats: Stats):
+        self.stats = stats
+
+    def write(self, text: str) -> int:
+        for line in text.splitlines():
+            if ' Data = ' in line:
+                self.stats.add(line)
+        return len(text)
+
+
+def run_read_serial(reader: SerialReader, stats: Stats, stop: threading.Event) -> None:
+    while not stop.is_set():
+        data = reader.read_serial()
+        if data:
+            stats.add(data)
+        time.sleep(0.001)
+
+
+def run_read_serial_bulk(reader: SerialReader, stats: Stats, stop: threading.Event) -> None:
+    while not stop.is_set():
+        for line in reader.read_serial_bulk():
+            stats.add(line)
+        time.sleep(0.001)
+
+
+def run_threaded(reader: SerialReader, stats: Stats, stop: threading.Event) -> None:
+    reader.start_reader()
+    while not stop.is_set():
+        line = reader.get(timeout=0.1)
+        if line is None:
+            continue
+        stats.add(line)
+        for line in reader.get_batch(1024, timeout=0):
+            stats.add(line)
+
+
+def run_display(reader: SerialReader, stats: Stats, stop: threading.Event) -> None:
+    reader._displayToCmd = True
+    stopper = threading.Thread(target=lambda: (stop.wait(), setattr(reader, '_displayToCmd', False)), daemon=True)
+    stopper.start()
+    with contextlib.redirect_stdout(LatencyStdout(stats)):
+        reader.display_to_command()
+
+
+def run_logging(reader: SerialReader, stats: Stats, stop: threading.Event) -> None:
+    while not stop.is_set():
+        for line in reader.read_serial_bulk():
+            reader.write_to_file('bench_log.txt', line)
+            stats.add(line)
+        time.sleep(0.001)
+
+
+MODES = {
+    'read_serial': run_read_serial,
+    'read_serial_bulk': run_read_serial_bulk,
+    'threaded': run_threaded,
+    'display_to_command': run_display,
+    'logging': run_logging,
+}
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def bench(mode: str, baud_rate: int, line_length: int, duration: float, warmup: float = 0.5) -> dict:
+    with VirtualArduino(PATTERN, rate_hz=None, line_length=line_length, baud_rate=baud_rate, use_process=True) as board:
+        reader = SerialReader(board.port, baud_rate, timeout=0.1, display_to_command=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            reader.connect()
+        stats = Stats()
+        stop = threading.Event()
+        worker = threading.Thread(target=MODES[mode], args=(reader, stats, stop), daemon=True)
+        worker.start()
+        time.sleep(warmup)  # skip the backlog built up while connect() waits for the port
+        stats.reset()
+        usage0 = resource.getrusage(resource.RUSAGE_SELF)
+        t0 = time.monotonic()
+        time.sleep(duration)
+        stop.set()
+        worker.join()
+        wall = time.monotonic() - t0
+        usage1 = resource.getrusage(resource.RUSAGE_SELF)
+        with contextlib.redirect_stdout(io.StringIO()):
+            reader.close()
+    cpu = (usage1.ru_utime - usage0.ru_utime) + (usage1.ru_stime - usage0.ru_stime)
+    return {
+        'mode': mode,
+        'baud_rate': baud_rate,
+        'line_length': line_length,
+        'lines_per_s': stats.lines / wall,
+        'bytes_per_s': stats.bytes / wall,
+        'cpu_percent': 100.0 * cpu / wall,
+        'latency_p50_ms': 1000 * percentile(stats.latencies, 0.50),
+        'latency_p99_ms': 1000 * percentile(stats.latencies, 0.99),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SerialReader read paths against a virtual Arduino")
+    parser.add_argument('--duration', type=float, default=2.0, help="Seconds per run (default: 2)")
+    parser.add_argument('--baud', type=int, nargs='+', default=[9600, 115200, 1000000], help="Baud rates to emulate")
+    parser.add_argument('--length', type=int, nargs='+', default=[16, 64], help="Line lengths in characters")
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES), help="Read paths to benchmark")
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    results = []
+    print(f"{'mode':<20}{'baud':>9}{'len':>5}{'lines/s':>11}{'bytes/s':>12}{'cpu%':>7}{'p50 ms':>9}{'p99 ms':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)  # keep data/profile.json and bench logs out of the repo
+        try:
+            for baud_rate in args.baud:
+                for line_length in args.length:
+                    for mode in args.modes:
+                        r = bench(mode, baud_rate, line_length, args.duration)
+                        results.append(r)
+                        print(f"{r['mode']:<20}{r['baud_rate']:>9}{r['line_length']:>5}{r['lines_per_s']:>11.0f}"
+                              f"{r['bytes_per_s']:>12.0f}{r['cpu_percent']:>7.1f}{r['latency_p50_ms']:>9.2f}{r['latency_p99_ms']:>9.2f}")
+        finally:
+            os.chdir(cwd)
+    if json_path:
+        with open(json_path, 'w') as file:
+            json.dump(results, file, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.LineParser import LineParser
+from src.SerialReadWrite.ParallelParser import ParallelParser, init_worker, parse_chunk
+import argparse
+import json
+import time
+
+# Scaling benchmark for the ParallelParser stage: the same multi-port workload (checksummed lines parsed into
+# typed records) is parsed inline on one thread, then by worker pools of increasing size.
+#
+#   python test/benchmark_parallel.py --ports 8 --lines 200000 --workers 1 2 4 8
+
+TEMPLATE = "$SENS,{port:int},{seq:int},{t:float},{ax:float},{ay:float},{az:float},{temp:float},{status:str}"
+
+
+def make_line(port: int, seq: int) -> str:
+    payload = f"SENS,{port},{seq},{seq * 0.01:.3f},{(seq % 97) * 0.1:.2f},{(seq % 89) * -0.1:.2f},9.81,{20 + seq % 7}.5,OK"
+    checksum = 0
+    for char in payload:
+        checksum ^= ord(char)
+    return f"${payload}*{checksum:02X}"
+
+
+def make_chunks(ports: int, lines: int, chunk_bytes: int) -> list:
+    # Round-robin chunks of complete lines per port, as SerialHub would submit them
+    chunks = []
+    per_port = lines // ports
+    for port in range(ports):
+        buf = bytearray()
+        for seq in range(per_port):
+            buf += (make_line(port, seq) + '\r\n').encode('ascii')
+            if len(buf) >= chunk_bytes:
+                chunks.append((f"port{port}", bytes(buf)))
+                buf.clear()
+        if buf:
+            chunks.append((f"port{port}", bytes(buf)))
+    return chunks
+
+
+def run_inline(parser: LineParser, chunks: list) -> int:
+    init_worker(parser, 'nmea')
+    return sum(len(parse_chunk(data)[0]) for _, data in chunks)
+
+
+def run_pool(parser: LineParser, chunks: list, workers: int) -> int:
+    records = 0
+    last_seq = {}
+    with ParallelParser(parser, checksum='nmea', workers=workers) as pool:
+        for port, data in chunks:
+            pool.submit(port, data)
+            for port_out, _, recs in pool.results():
+                records += len(recs)
+                last_seq[port_out] = check_order(last_seq.get(port_out, -1), recs)
+        while pool.pending:
+            for port_out, _, recs in pool.results(timeout=1):
+                records += len(recs)
+                last_seq[port_out] = check_order(last_seq.get(port_out, -1), recs)
+    return records
+
+
+def check_order(previous: int, records: list) -> int:
+    for record in records:
+        if record[1] != previous + 1:
+            raise Exception(f"Out of order: seq {record[1]} after {previous}")
+        previous = record[1]
+    return previous
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ParallelParser scaling against inline parsing")
+    parser.add_argument('--ports', type=int, default=8, help="Simulated ports (default: 8)")
+    parser.add_argument('--lines', type=int, default=200000, help="Total lines (default: 200000)")
+    parser.add_argument('--chunk', type=int, default=65536, help="Chunk size in bytes (default: 65536)")
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, os.cpu_count() or 1}), help="Pool sizes")
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    line_parser = LineParser(TEMPLATE[1:])  # the '$' and '*HH' are removed by the checksum check
+    chunks = make_chunks(args.ports, args.lines, args.chunk)
+    nbytes = sum(len(data) for _, data in chunks)
+    print(f"{len(chunks)} chunks, {nbytes / 1e6:.1f} MB, {os.cpu_count()} CPUs")
+    print(f"{'mode':<12}{'lines/s':>12}{'MB/s':>8}{'speedup':>9}")
+
+    t0 = time.perf_counter()
+    count = run_inline(line_parser, chunks)
+    baseline = time.perf_counter() - t0
+    results = [{'mode': 'inline', 'workers': 0, 'lines_per_s': count / baseline, 'mb_per_s': nbytes / baseline / 1e6, 'speedup': 1.0}]
+    for workers in args.workers:
+        t0 = time.perf_counter()
+        if run_pool(line_parser, chunks, workers) != count:
+            raise Exception("Parallel run returned a different number of records")
+        elapsed = time.perf_counter() - t0
+        results.append({'mode': f'{workers} workers', 'workers': workers, 'lines_per_s': count / elapsed,
+                        'mb_per_s': nbytes / elapsed / 1e6, 'speedup': baseline / elapsed})
+    for r in results:
+        print(f"{r['mode']:<12}{r['lines_per_s']:>12.0f}{r['mb_per_s']:>8.1f}{r['speedup']:>9.2f}")
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import select
+import time
+
+import pytest
+
+
+class PtyBoard:
+
+
+    def __init__(self):
+        """
+        One end of a pseudo-terminal pair standing in for an Arduino: the reader opens `port`, the test writes
+        to (and reads from) the other end.
+        """
+        import pty
+        import tty
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+
+    def write(self, data) -> None:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        view = memoryview(data)
+        while view:
+            select.select([], [self._master], [], 1.0)
+            view = view[os.write(self._master, view):]
+
+    def send_lines(self, lines) -> None:
+        self.write(''.join(f"{line}\r\n" for line in lines))
+
+    def read(self, timeout: float = 1.0) -> bytes:
+        """Bytes the reader wrote to the board (empty if none arrived within timeout)."""
+        ready, _, _ = select.select([self._master], [], [], timeout)
+        return os.read(self._master, 65536) if ready else b''
+
+    def close(self) -> None:
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    """Poll predicate() until it is true or timeout expires."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def board(tmp_path, monkeypatch):
+    pytest.importorskip('pty')  # POSIX only
+    monkeypatch.chdir(tmp_path)  # connect() keeps its configuration under data/
+    pty_board = PtyBoard()
+    yield pty_board
+    pty_board.close()
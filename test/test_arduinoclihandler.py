@@ -0,0 +1,89 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import stat
+
+from src.utils.ArduinoCLIHandler import ArduinoCLIHandler
+
+import pytest
+
+# Stand-in for arduino-cli: logs every invocation, fails compiles for 'bad:*' boards and uploads to ports named '*fail*'
+FAKE_CLI = """#!/bin/sh
+echo "$@" >> "{log}"
+case "$*" in
+  --version) echo "arduino-cli Version: 0.0.0-test" ;;
+  *compile*bad:*) echo "compile error" >&2; exit 1 ;;
+  *upload*fail*) echo "upload error" >&2; exit 1 ;;
+esac
+exit 0
+"""
+
+
+@pytest.fixture
+def cli(tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    log = tmp_path / 'calls.log'
+    script = bin_dir / 'arduino-cli'
+    script.write_text(FAKE_CLI.format(log=log))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', str(bin_dir))
+    monkeypatch.setattr(ArduinoCLIHandler, '_probe_cache', {})
+    monkeypatch.setattr(ArduinoCLIHandler, 'PROBE_CACHE_FILE', str(tmp_path / 'toolchain.json'))
+    monkeypatch.setattr(ArduinoCLIHandler, 'BUILD_DIR', str(tmp_path / 'build'))
+    return log
+
+
+def calls(log):
+    return log.read_text().splitlines() if log.exists() else []
+
+
+def test_probe_is_cached_in_process_and_on_disk(cli):
+    entry = ArduinoCLIHandler.probe('arduino-cli')
+    assert entry['ok'] and '0.0.0-test' in entry['version']
+    ArduinoCLIHandler.probe('arduino-cli')
+    assert calls(cli) == ['--version']
+
+    ArduinoCLIHandler._probe_cache.clear()  # a new process still finds the result in PROBE_CACHE_FILE
+    assert ArduinoCLIHandler.probe('arduino-cli') == entry
+    assert calls(cli) == ['--version']
+
+    ArduinoCLIHandler.probe('arduino-cli', refresh=True)
+    assert calls(cli) == ['--version', '--version']
+
+
+def test_probe_reruns_when_the_executable_changes(cli, tmp_path):
+    ArduinoCLIHandler.probe('arduino-cli')
+    script = tmp_path / 'bin' / 'arduino-cli'
+    os.utime(script, (script.stat().st_atime, script.stat().st_mtime + 10))
+    ArduinoCLIHandler.probe('arduino-cli')
+    assert calls(cli) == ['--version', '--version']
+
+
+def test_missing_cli_is_reported_not_raised(tmp_path, monkeypatch):
+    monkeypatch.setenv('PATH', str(tmp_path))
+    monkeypatch.setattr(ArduinoCLIHandler, '_probe_cache', {})
+    monkeypatch.setattr(ArduinoCLIHandler, 'PROBE_CACHE_FILE', str(tmp_path / 'toolchain.json'))
+    assert ArduinoCLIHandler.probe('arduino-cli') is None
+    result = ArduinoCLIHandler.compile_sketch('sketch', 'arduino:avr:uno')
+    assert not result.ok and 'arduino-cli is required' in result.output
+    with pytest.raises(Exception):
+        ArduinoCLIHandler.compile_many('sketch', ['arduino:avr:uno'], progress=None)
+
+
+def test_compile_many_builds_each_fqbn_once(cli):
+    results = ArduinoCLIHandler.compile_many('sketch', ['arduino:avr:uno', 'bad:avr:x', 'arduino:avr:uno'], progress=None)
+    assert set(results) == {'arduino:avr:uno', 'bad:avr:x'}
+    assert results['arduino:avr:uno'].ok and not results['bad:avr:x'].ok
+    assert 'compile error' in results['bad:avr:x'].output
+    assert sum(line.startswith('compile') for line in calls(cli)) == 2
+
+
+def test_upload_many_skips_boards_whose_build_failed(cli):
+    boards = [('/dev/ttyA', 'arduino:avr:uno'), ('/dev/ttyfail', 'arduino:avr:uno'), ('/dev/ttyB', 'bad:avr:x')]
+    results = ArduinoCLIHandler.upload_many('sketch', boards, progress=None)
+    assert [(r.board, r.action, r.ok) for r in results] == [
+        ('/dev/ttyA', 'upload', True), ('/dev/ttyfail', 'upload', False), ('bad:avr:x', 'compile', False)]
+    uploads = [line for line in calls(cli) if line.startswith('upload')]
+    assert len(uploads) == 2
+    assert all('--input-dir ' + ArduinoCLIHandler.build_path('arduino:avr:uno') in line for line in uploads)
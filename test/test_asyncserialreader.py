@@ -0,0 +1,41 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.AsyncSerialReader import AsyncSerialReader
+import asyncio
+
+LINES = [f"Time since start: {10 * i}  ... Data = {i}" for i in range(50)]
+
+
+def test_lines_arrive_in_order_and_iteration_ends_on_close(board):
+    async def main():
+        async with AsyncSerialReader(board.port) as reader:
+            board.send_lines(LINES)
+            received = [await asyncio.wait_for(reader.readline(), 5) for _ in LINES]
+            await reader.close()
+            rest = [line async for line in reader]
+        return received, rest
+
+    received, rest = asyncio.run(main())
+    assert received == LINES
+    assert rest == []
+
+
+def test_write_reaches_the_board(board):
+    async def main():
+        async with AsyncSerialReader(board.port) as reader:
+            return await reader.write("LED ON\n")
+
+    assert asyncio.run(main()) == 7
+    assert board.read() == b"LED ON\n"
+
+
+def test_full_queue_drops_the_oldest_lines(board):
+    async def main():
+        async with AsyncSerialReader(board.port, queue_size=5, decode=False) as reader:
+            board.send_lines(LINES)
+            while reader.dropped < len(LINES) - 5:
+                await asyncio.sleep(0.01)
+            return [await reader.readline() for _ in range(5)]
+
+    assert asyncio.run(asyncio.wait_for(main(), 10)) == [line.encode() for line in LINES[-5:]]
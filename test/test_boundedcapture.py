@@ -0,0 +1,114 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.BoundedCapture import CaptureBuffer, CaptureResult
+from src.SerialReadWrite.LineParser import LineParser
+from src.SerialReadWrite.SerialReader import SerialReader
+import io
+
+import pytest
+
+from conftest import wait_for
+
+DATA = b''.join(f"{i},{i * 2}\r\n".encode() for i in range(100))
+
+
+def chunks(data: bytes, size: int = 7) -> list:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_buffer_grows_and_keeps_the_partial_line():
+    buffer = CaptureBuffer(16)
+    for chunk in chunks(DATA + b'99,1'):
+        assert buffer.append(chunk) == b''
+    assert buffer.lines == 100
+    assert buffer.finish() == b'99,1'
+    assert bytes(buffer.data) == DATA
+    assert buffer.nbytes == len(DATA)
+
+
+def test_buffer_stops_at_the_line_limit():
+    buffer = CaptureBuffer(1024)
+    rest = b''
+    for chunk in chunks(DATA):
+        rest = buffer.append(chunk, limit=10 - buffer.lines)
+        if rest or buffer.lines == 10:
+            break
+    assert buffer.lines == 10
+    assert bytes(buffer.data) == DATA[:DATA.index(b'10,20')]
+    assert DATA[:DATA.index(b'10,20')].endswith(b'\n')
+
+
+def test_buffer_streams_complete_lines():
+    stream = io.BytesIO()
+    buffer = CaptureBuffer(1024, stream=stream)
+    for chunk in chunks(DATA + b'partial'):
+        buffer.append(chunk)
+    assert stream.getvalue() == DATA
+    assert buffer.finish() == b'partial'
+    assert buffer.nbytes == len(DATA)
+
+
+def test_result_lines_arrays_and_save(tmp_path):
+    result = CaptureResult(memoryview(DATA), 100, len(DATA), started=0.0, elapsed=2.0)
+    assert len(result) == 100
+    assert result.rate == 50.0
+    assert result.lines()[:2] == ['0,0', '1,2']
+    assert result.lines(decode=False)[-1] == b'99,198'
+    columns = result.arrays(LineParser.csv(['a', 'b'], 'int'))
+    assert list(columns['b']) == [2 * i for i in range(100)]
+    path = str(tmp_path / 'capture.txt')
+    result.save(path)
+    assert result.filename == path
+    with open(path, 'rb') as file:
+        assert file.read() == DATA
+
+
+def connect(port: str) -> SerialReader:
+    reader = SerialReader(port, timeout=0.1, display_to_command=False)
+    reader.connect()
+    return reader
+
+
+def test_capture_count_leaves_the_rest_for_the_next_read(board):
+    reader = connect(board.port)
+    try:
+        board.write(DATA[:DATA.index(b'20,40')] + b'20,4')
+        result = reader.capture(count=10)
+        assert result.lines() == [f"{i},{i * 2}" for i in range(10)]
+        board.write(b'0\r\n')
+        lines = []
+        assert wait_for(lambda: lines.extend(reader.read_serial_bulk()) or len(lines) == 11)
+        assert lines == [f"{i},{i * 2}" for i in range(10, 21)]
+    finally:
+        reader.close()
+
+
+def test_capture_duration_keeps_a_partial_line(board, tmp_path):
+    reader = connect(board.port)
+    try:
+        board.write(DATA[:50] + b'partial')
+        path = str(tmp_path / 'capture.txt')
+        result = reader.capture(duration=0.3, filename=path)
+        assert 0.3 <= result.elapsed < 2
+        assert result.raw() == DATA[:DATA.rindex(b'\n', 0, 50) + 1]
+        with open(path, 'rb') as file:
+            assert file.read() == result.raw()
+        assert bytes(reader._rx_buf).endswith(b'partial')
+        with pytest.raises(ValueError):
+            reader.capture()
+    finally:
+        reader.close()
+
+
+def test_log_serial_output_writes_one_line_per_received_line(board):
+    reader = connect(board.port)
+    try:
+        board.write(DATA[:DATA.index(b'5,10')])
+        reader.log_serial_output(0.3, 'out.txt')
+        board.write(DATA[DATA.index(b'5,10'):DATA.index(b'7,14')])
+        reader.log_serial_output(0.3, 'out.txt')
+    finally:
+        reader.close()
+    with open('out.txt') as file:
+        assert file.read() == ''.join(f"{i},{i * 2}\n" for i in range(7))
@@ -0,0 +1,119 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import stat
+
+from src.utils.ArduinoCLIHandler import ArduinoCLIHandler
+from src.utils.BuildCache import BuildCache
+
+import pytest
+
+# Stand-in for arduino-cli: counts compiles and leaves a firmware image in --build-path
+FAKE_CLI = """#!/bin/sh
+case "$1" in
+  --version) echo "arduino-cli Version: 0.0.0-test"; exit 0 ;;
+  compile)
+    echo compile >> "{log}"
+    while [ "$1" != "--build-path" ]; do shift; done
+    mkdir -p "$2" && echo firmware > "$2/sketch.ino.hex" ;;
+esac
+exit 0
+"""
+
+
+@pytest.fixture
+def sketch(tmp_path):
+    folder = tmp_path / 'blink'
+    folder.mkdir()
+    (folder / 'blink.ino').write_text('#include <Servo.h>\nvoid setup() {}\nvoid loop() {}\n')
+    return folder
+
+
+@pytest.fixture
+def libraries(tmp_path):
+    servo = tmp_path / 'libraries' / 'Servo' / 'src'
+    servo.mkdir(parents=True)
+    (servo / 'Servo.h').write_text('// v1\n')
+    (tmp_path / 'libraries' / 'Unused').mkdir()
+    (tmp_path / 'libraries' / 'Unused' / 'Unused.h').write_text('// unused\n')
+    return tmp_path / 'libraries'
+
+
+@pytest.fixture
+def cache(tmp_path, libraries):
+    return BuildCache(str(tmp_path / 'cache'), library_dirs=[str(libraries)], data_dirs=[str(tmp_path / 'arduino15')])
+
+
+def build(tmp_path, name='build', size=1000):
+    folder = tmp_path / name
+    folder.mkdir(exist_ok=True)
+    (folder / 'sketch.ino.hex').write_bytes(b'x' * size)
+    (folder / 'sketch.ino.o').write_bytes(b'not an artifact')
+    return str(folder)
+
+
+def test_key_depends_on_sources_board_and_included_libraries(cache, sketch, libraries):
+    key = cache.key(str(sketch), 'arduino:avr:uno', '1.0')
+    assert cache.key(str(sketch / 'blink.ino'), 'arduino:avr:uno', '1.0') == key
+    assert cache.key(str(sketch), 'arduino:avr:mega', '1.0') != key
+    assert cache.key(str(sketch), 'arduino:avr:uno', '1.1') != key
+
+    (libraries / 'Unused' / 'Unused.h').write_text('// changed, but not included\n')
+    assert cache.key(str(sketch), 'arduino:avr:uno', '1.0') == key
+    (libraries / 'Servo' / 'src' / 'Servo.h').write_text('// v2, a longer header\n')
+    key2 = cache.key(str(sketch), 'arduino:avr:uno', '1.0')
+    assert key2 != key
+    (sketch / 'blink.ino').write_text('#include <Servo.h>\nvoid setup() { }\nvoid loop() {}\n')
+    assert cache.key(str(sketch), 'arduino:avr:uno', '1.0') != key2
+
+
+def test_store_and_restore_artifacts(cache, tmp_path):
+    assert not cache.restore('k', str(tmp_path / 'out'))
+    cache.store('k', build(tmp_path), fqbn='arduino:avr:uno')
+    assert cache.restore('k', str(tmp_path / 'out'))
+    assert sorted(os.listdir(tmp_path / 'out')) == ['sketch.ino.hex']
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    reopened = BuildCache(cache.path, library_dirs=[], data_dirs=[])
+    assert reopened.stats()['total_hits'] == 1 and reopened.stats()['entries'] == 1
+    assert reopened.hits == 0
+
+
+def test_evicts_least_recently_used(cache, tmp_path):
+    cache.max_bytes = 2500
+    cache.store('a', build(tmp_path, 'a'))
+    cache.store('b', build(tmp_path, 'b'))
+    cache.restore('a', str(tmp_path / 'out'))  # 'a' is now the most recently used
+    cache.store('c', build(tmp_path, 'c'))
+    assert set(cache._index['entries']) == {'a', 'c'}
+    assert not os.path.exists(os.path.join(cache.path, 'b'))
+    assert cache.size == 2000
+
+
+def test_compile_sketch_reuses_cached_build(cache, sketch, tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    log = tmp_path / 'compiles.log'
+    script = bin_dir / 'arduino-cli'
+    script.write_text(FAKE_CLI.format(log=log))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', str(bin_dir) + os.pathsep + os.environ.get('PATH', ''))
+    monkeypatch.setattr(ArduinoCLIHandler, '_probe_cache', {})
+    monkeypatch.setattr(ArduinoCLIHandler, 'PROBE_CACHE_FILE', str(tmp_path / 'toolchain.json'))
+    monkeypatch.setattr(ArduinoCLIHandler, 'BUILD_DIR', str(tmp_path / 'build'))
+
+    first = ArduinoCLIHandler.compile_many(str(sketch), ['arduino:avr:uno'], progress=None, cache=cache)
+    assert first['arduino:avr:uno'].ok
+    os.remove(os.path.join(ArduinoCLIHandler.build_path('arduino:avr:uno'), 'sketch.ino.hex'))
+    second = ArduinoCLIHandler.compile_sketch(str(sketch), 'arduino:avr:uno', cache=cache)
+    assert second.ok and 'build cache hit' in second.output
+    assert os.path.isfile(os.path.join(ArduinoCLIHandler.build_path('arduino:avr:uno'), 'sketch.ino.hex'))
+    assert log.read_text().splitlines() == ['compile']
+
+
+def test_missing_cli_with_cache_is_a_failed_result(cache, sketch, tmp_path, monkeypatch):
+    monkeypatch.setenv('PATH', str(tmp_path))
+    monkeypatch.setattr(ArduinoCLIHandler, '_probe_cache', {})
+    monkeypatch.setattr(ArduinoCLIHandler, 'PROBE_CACHE_FILE', str(tmp_path / 'toolchain.json'))
+    result = ArduinoCLIHandler.compile_sketch(str(sketch), 'arduino:avr:uno', cache=cache)
+    assert not result.ok and 'arduino-cli is required' in result.output
@@ -0,0 +1,63 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.Capture import CaptureFile, CaptureWriter
+from src.SerialReadWrite.LineParser import LineParser
+from src.SerialReadWrite.SerialReader import SerialReader
+
+import pytest
+
+
+TEMPLATE = 'Time since start: {time:int}  ... Data = {data:float}'
+LINES = [f"Time since start: {10 * i}  ... Data = {i / 2}" for i in range(50)]
+
+
+def test_write_and_read_back_records_and_lines(tmp_path):
+    path = str(tmp_path / 'run.cap')
+    with CaptureWriter(path, parser=LineParser(TEMPLATE), flush_records=8) as writer:
+        writer.write_lines(LINES[:20], timestamp=100.0, port='/dev/ttyACM0')
+        writer.write_line('noise', timestamp=101.0, port='/dev/ttyACM0')
+        writer.write_lines(LINES[20:], timestamp=102.0, port='/dev/ttyACM1')
+    assert writer.records_written == len(LINES)
+    assert writer.parser.malformed == 1
+    with CaptureFile(path) as capture:
+        assert len(capture) == len(LINES)
+        assert capture.ports == ['/dev/ttyACM0', '/dev/ttyACM1']
+        records = list(capture.records())
+        assert [(r[0], r[1]) for r in records] == [(100.0, 0)] * 20 + [(102.0, 1)] * 30
+        assert [r[-2:] for r in records] == [(10 * i, i / 2) for i in range(50)]
+        assert [capture.line(r[2], r[3]).decode() for r in records] == LINES
+
+
+def test_array_view_matches_records(tmp_path):
+    pytest.importorskip('numpy')
+    path = str(tmp_path / 'run.cap')
+    with CaptureWriter(path, parser=LineParser(TEMPLATE), raw_lines=False) as writer:
+        writer.write_lines(LINES, timestamp=5.0)
+    with CaptureFile(path) as capture:
+        array = capture.array()
+        assert array.dtype.names == ('timestamp', 'port', 'time', 'data')
+        assert list(array['time']) == [10 * i for i in range(50)]
+        assert list(array['data']) == [i / 2 for i in range(50)]
+        del array
+
+
+def test_capture_needs_parser_or_lines(tmp_path):
+    with pytest.raises(ValueError):
+        CaptureWriter(str(tmp_path / 'run.cap'), raw_lines=False)
+    with pytest.raises(ValueError):
+        CaptureWriter(str(tmp_path / 'run.cap'), parser=LineParser('{name:str}'))
+
+
+def test_reader_records_threaded_lines(board):
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False, threaded=True)
+    reader.connect()
+    try:
+        reader.open_capture('run.cap')
+        board.send_lines(LINES)
+        assert reader.get_batch(len(LINES), timeout=5) == LINES
+    finally:
+        reader.close()
+    with CaptureFile('run.cap') as capture:
+        assert capture.ports == [board.port]
+        assert [capture.line(r[2], r[3]).decode() for r in capture.records()] == LINES
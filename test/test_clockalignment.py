@@ -0,0 +1,148 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import random
+import threading
+
+from src.SerialReadWrite.ClockAlignment import AlignedRecord, ClockAlignment, ClockModel
+from src.SerialReadWrite.LineParser import LineParser
+from src.SerialReadWrite.MonitorRenderer import MonitorRenderer
+from src.SerialReadWrite.RollingStats import ChannelStats
+from src.SerialReadWrite.SerialReader import SerialReader
+
+import pytest
+
+from conftest import wait_for
+
+T0 = 1700000000.0
+
+
+def line(ms: int, data: int = 0) -> str:
+    return f"Time since start: {ms}  ... Data = {data}"
+
+
+def feed(alignment: ClockAlignment, seconds: float, drift_ppm: float = 0.0, rate_hz: float = 10.0, seed: int = 1) -> list:
+    # Device prints millis() rate_hz times per second; each line reaches the host 2 ms + random jitter later
+    rng = random.Random(seed)
+    records = []
+    for i in range(int(seconds * rate_hz)):
+        ms = int(i * 1000 / rate_hz)
+        host = T0 + ms / 1e3 * (1 + drift_ppm * 1e-6) + 0.002 + rng.expovariate(200)
+        records.append(alignment.annotate(line(ms, i), host))
+    return records
+
+
+def test_recovers_offset_and_drift():
+    alignment = ClockAlignment(on_alarm=lambda kind, message: None)
+    records = feed(alignment, 400, drift_ppm=50)
+    assert alignment.summary()['drift_ppm'] == pytest.approx(50, abs=1)
+    assert alignment.model.offset == pytest.approx(T0 + 0.002, abs=0.002)
+    assert all(r.latency >= 0 for r in records)
+    assert alignment.percentile(0.5) < 0.01
+    last = records[-1]
+    assert last.item == line(399900, 3999) and last.device_time == pytest.approx(399.9)
+    assert last.corrected_time + last.latency == pytest.approx(last.host_time)
+
+
+def test_latencies_are_never_negative():
+    alignment = ClockAlignment()
+    for second in range(5):
+        alignment.annotate(line(second * 1000), T0 + second + 0.010)
+    record = alignment.annotate(line(5000), T0 + 5 + 0.005)  # faster than the fitted envelope
+    assert record.latency == 0.0
+
+
+def test_drift_alarm_waits_for_enough_buckets():
+    alarms = []
+    alignment = ClockAlignment(drift_alarm_ppm=10, on_alarm=lambda kind, message: alarms.append((kind, alignment.model.buckets)))
+    feed(alignment, 60, drift_ppm=100)
+    assert [kind for kind, _ in alarms] == ['drift']
+    assert alarms[0][1] == alignment.drift_min_buckets == 30
+    assert ClockAlignment(window=10).drift_min_buckets == 10
+
+
+def test_latency_alarm_on_a_stall():
+    alarms = []
+    alignment = ClockAlignment(latency_alarm_s=0.1, on_alarm=lambda kind, message: alarms.append(kind))
+    feed(alignment, 20)
+    stalled = alignment.annotate(line(20000), T0 + 20 + 0.3)
+    assert stalled.latency == pytest.approx(0.3, abs=0.01)
+    assert alarms == ['latency'] and alignment.alarms == 1
+    assert alignment.max_latency == stalled.latency
+
+
+def test_board_reset_restarts_the_fit():
+    model = ClockModel()
+    for second in range(10):
+        model.update(100.0 + second, T0 + second)
+    assert model.fitted and model.buckets == 9
+    model.update(0.5, T0 + 10)
+    assert model.resets == 1 and not model.fitted
+    assert model.host_time(0.5) == pytest.approx(T0 + 10)
+
+
+def test_lines_without_a_timestamp_pass_through():
+    alignment = ClockAlignment()
+    record = alignment.annotate('hello', T0)
+    assert record == AlignedRecord('hello', None, T0, None, None)
+    assert (alignment.aligned, alignment.unaligned) == (0, 1)
+    assert alignment.percentile(0.5) is None
+    assert 'latency p50 -' in alignment.format()
+
+
+def test_extract_from_a_parser_field():
+    parser = LineParser('Time since start: {time:int}  ... Data = {data:int}')
+    alignment = ClockAlignment(parser, field='time')
+    assert alignment.annotate(line(1500, 7), T0).device_time == 1.5
+    assert alignment.annotate((2500, 8), T0 + 1).device_time == 2.5  # already parsed by the reader
+    with pytest.raises(ValueError):
+        ClockAlignment(parser, field='missing')
+
+
+def test_reader_delivers_aligned_records(board):
+    parser = LineParser('Time since start: {time:int}  ... Data = {data:int}')
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False, threaded=True, parser=parser,
+                          alignment=ClockAlignment(parser, field='time'), aggregates=ChannelStats(window=10))
+    reader.connect()
+    try:
+        board.send_lines([line(10 * i, i) for i in range(20)] + ['garbage'])
+        records = reader.get_batch(20, timeout=5)
+        assert wait_for(lambda: parser.malformed == 1)
+    finally:
+        reader.close()
+    assert [r.item for r in records] == [(10 * i, i) for i in range(20)]
+    assert all(isinstance(r, AlignedRecord) and r.latency >= 0 for r in records)
+    reader.update_aggregates(records)
+    assert reader.aggregates.summary()['data']['total']['count'] == 20
+
+
+def test_bulk_reads_are_aligned(board):
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False, alignment=ClockAlignment())
+    reader.connect()
+    try:
+        board.send_lines([line(10 * i, i) for i in range(5)])
+        records = []
+        assert wait_for(lambda: records.extend(reader.read_serial_bulk()) or len(records) == 5)
+    finally:
+        reader.close()
+    assert [r.item for r in records] == [line(10 * i, i) for i in range(5)]
+    assert [r.device_time for r in records] == [i / 100 for i in range(5)]
+    assert reader.alignment.aligned == 5
+
+
+def test_monitor_shows_the_lines_not_the_annotations(board):
+    monitor = MonitorRenderer(refresh_hz=50, out=io.StringIO())
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False, threaded=True, monitor=monitor,
+                          alignment=ClockAlignment())
+    reader.connect()
+    display = threading.Thread(target=reader.display_to_command, daemon=True)
+    try:
+        reader._displayToCmd = True
+        display.start()
+        board.send_lines([line(10 * i, i) for i in range(5)])
+        assert wait_for(lambda: monitor.lines_shown == 5)
+    finally:
+        reader.close()
+        display.join(timeout=5)
+    assert monitor.out.getvalue() == ''.join(line(10 * i, i) + '\n' for i in range(5))
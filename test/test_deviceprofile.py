@@ -0,0 +1,62 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+from types import SimpleNamespace
+
+from serial.tools import list_ports
+from src.SerialReadWrite.DeviceProfile import DeviceProfile, discover
+from src.SerialReadWrite.SerialReader import SerialReader
+
+import pytest
+
+
+def port_info(device, vid, pid=0x0043, serial_number='A1'):
+    return SimpleNamespace(device=device, vid=vid, pid=pid, serial_number=serial_number, description=f"board on {device}")
+
+
+@pytest.fixture
+def ports(monkeypatch):
+    # The system's port list, as pyserial would report it
+    listed = [port_info('/dev/ttyUSB0', 0x1A86), port_info('/dev/ttyS0', None), port_info('/dev/ttyACM0', 0x2341),
+              port_info('/dev/ttyACM9', 0x046D)]
+    monkeypatch.setattr(list_ports, 'comports', lambda: listed)
+    return listed
+
+
+def test_discover_matches_arduino_vids(ports):
+    assert [board['port'] for board in discover()] == ['/dev/ttyACM0', '/dev/ttyUSB0']
+    assert [board['port'] for board in discover(vid=0x046D)] == ['/dev/ttyACM9']
+    assert discover(vid=0x2341, serial_number='other') == []
+
+
+def test_save_and_resolve_a_virtual_port(board):
+    profile = DeviceProfile('data/profile.json')
+    profile.save(board.port, 115200, ready='line')
+    profile.wait()
+    saved = profile.load()
+    assert (saved['port'], saved['baud_rate'], saved['ready']) == (board.port, 115200, 'line')
+    assert profile.resolve()['port'] == board.port
+    board.close()
+    assert profile.resolve() is None  # the node is gone and there is no USB identity to look for
+
+
+def test_resolve_finds_a_replugged_board_by_usb_identity(tmp_path, monkeypatch, ports):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data')
+    with open('data/profile.json', 'w') as file:
+        json.dump({"port": "/dev/ttyACM7", "baud_rate": 9600, "vid": 0x2341, "pid": 0x0043, "serial_number": "A1",
+                   "node": [1, 2]}, file)
+    resolved = DeviceProfile().resolve()
+    assert resolved['port'] == '/dev/ttyACM0' and resolved['baud_rate'] == 9600
+    ports[2].serial_number = 'B2'
+    assert DeviceProfile().resolve() is None
+
+
+def test_connect_saves_the_profile_for_load_last_config(board):
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False, ready='line', ready_timeout=0.2)
+    reader.connect()
+    reader.close()
+    restored = SerialReader.load_last_config(display_to_command=False)
+    assert (restored.port, restored.baud_rate, restored.ready, restored.ready_timeout) == (board.port, 9600, 'line', 0.2)
+    assert SerialReader.load_last_config('data/missing.json') is None
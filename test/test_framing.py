@@ -0,0 +1,62 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.Framing import COBS, LENGTH, FrameDecoder, cobs_decode, cobs_encode, encode_frame
+import struct
+
+import pytest
+
+FMT = '<Ii'  # (uint32 millis, int32 data), as the binary example sketch sends
+
+
+def frames(framing: str, n: int = 5) -> list:
+    return [encode_frame(struct.pack(FMT, 100 * i, i - 2), framing) for i in range(n)]
+
+
+@pytest.mark.parametrize('payload', [b'', b'\0', b'\0\0', b'abc\0def', bytes(range(256)) * 2, b'x' * 254, b'x' * 255])
+def test_cobs_round_trip(payload):
+    encoded = cobs_encode(payload)
+    assert b'\0' not in encoded
+    assert cobs_decode(encoded) == payload
+
+
+@pytest.mark.parametrize('framing', [COBS, LENGTH])
+def test_frames_decode_in_one_chunk_and_byte_by_byte(framing):
+    stream = b''.join(frames(framing))
+    expected = [(100 * i, i - 2) for i in range(5)]
+    assert FrameDecoder(FMT, framing=framing).feed(stream) == expected
+    decoder = FrameDecoder(FMT, framing=framing)
+    records = []
+    for i in range(len(stream)):
+        records += decoder.feed(stream[i:i + 1])
+    assert records == expected
+    assert decoder.frames == 5
+    assert decoder.crc_errors == 0
+
+
+@pytest.mark.parametrize('framing', [COBS, LENGTH])
+def test_decoder_resyncs_after_noise_and_corruption(framing):
+    good = frames(framing)
+    corrupt = bytearray(good[2])
+    corrupt[len(corrupt) // 2] ^= 0xFF
+    noise = b'\x13\x37garbage'
+    if framing == COBS:
+        noise += b'\0'  # a COBS stream is only resynchronised at the next delimiter
+    decoder = FrameDecoder(FMT, framing=framing)
+    records = decoder.feed(noise + good[0] + good[1] + bytes(corrupt) + good[3] + good[4])
+    assert records == [(0, -2), (100, -1), (300, 1), (400, 2)]
+    assert decoder.crc_errors + decoder.resyncs >= 2
+
+
+def test_length_framing_limits_the_payload():
+    with pytest.raises(ValueError):
+        encode_frame(b'x' * 256, LENGTH)
+
+
+def test_raw_payloads_and_numpy_records():
+    np = pytest.importorskip('numpy')
+    decoder = FrameDecoder(FMT, names=['millis', 'data'])
+    payloads = decoder.feed(b''.join(frames(COBS)), raw=True)
+    table = decoder.as_array(payloads)
+    assert list(table['millis']) == [0, 100, 200, 300, 400]
+    assert table['data'].dtype == np.dtype('<i4')
@@ -0,0 +1,62 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.LineParser import LineParser, compile_template
+
+import pytest
+
+SERIALTEST = 'Time since start: {time:int}  ... Data = {data:int}'
+
+
+def scalar_columns(parser: LineParser, lines: list) -> dict:
+    records = [r for r in map(parser.parse, lines) if r is not None]
+    return {name: [r[i] for r in records] for i, name in enumerate(parser.fields)}
+
+
+def batch_columns(parser: LineParser, lines: list) -> dict:
+    parser.parse_batch(lines)
+    return {name: list(values) for name, values in parser.take().items()}
+
+
+def test_template_parses_serialtest_output():
+    parser = LineParser(SERIALTEST)
+    assert parser.fields == {'time': 'int', 'data': 'int'}
+    assert parser.parse('Time since start: 1200  ... Data = 7') == (1200, 7)
+    assert parser.parse(b'Time since start: 1200 ... Data = 7\r'.rstrip()) == (1200, 7)
+    assert parser.parse('Time since start: soon  ... Data = 7') is None
+    assert (parser.parsed, parser.malformed) == (2, 1)
+
+
+def test_template_errors():
+    with pytest.raises(ValueError):
+        compile_template('{a:complex}')
+    with pytest.raises(ValueError):
+        compile_template('{a} {a}')
+    with pytest.raises(ValueError):
+        LineParser()
+
+
+@pytest.mark.parametrize('kind', ['int', 'float'])
+def test_csv_batch_agrees_with_scalar_parse(kind):
+    lines = ['1,2,3', ' 4 , 5,6 ', '7,8', '1,2,3,4', '1 2,3,4', 'nan,1,2', '1,inf,2', '-1,+2,3', '', b'9,9,9']
+    if kind == 'float':
+        lines += ['.5,1e3,-2.5E-1']
+    scalar, batch = LineParser.csv(['a', 'b', 'c'], kind), LineParser.csv(['a', 'b', 'c'], kind)
+    assert batch_columns(batch, lines) == scalar_columns(scalar, lines)
+    assert (batch.parsed, batch.malformed) == (scalar.parsed, scalar.malformed)
+
+
+@pytest.mark.parametrize('kind', ['int', 'float'])
+def test_csv_regular_batch(kind):
+    parser = LineParser.csv(['a', 'b'], kind)
+    assert parser.parse_batch([f"{i},{-i}" for i in range(100)]) == 100
+    columns = parser.take()
+    assert list(columns['a']) == list(range(100))
+    assert list(columns['b']) == [-i for i in range(100)]
+    assert parser.malformed == 0
+    assert len(parser.take()['a']) == 0
+
+
+def test_template_batch_matches_scalar():
+    lines = [f'Time since start: {10 * i}  ... Data = {i}' for i in range(20)] + ['noise', 'Data = 3']
+    assert batch_columns(LineParser(SERIALTEST), lines) == scalar_columns(LineParser(SERIALTEST), lines)
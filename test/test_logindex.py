@@ -0,0 +1,61 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.LogIndex import LogIndex, index_path, split_timestamp
+from src.SerialReadWrite.LogSink import LogSink
+
+import pytest
+
+T0 = 1700000000.0
+
+
+@pytest.fixture
+def logfile(tmp_path):
+    # 1000 timestamped lines, 0.1 s apart, with an untimestamped line in the middle
+    path = str(tmp_path / 'serial.log')
+    with open(path, 'w') as file:
+        for i in range(1000):
+            file.write(f"{T0 + i * 0.1:.6f}\tData = {i}\n")
+            if i == 500:
+                file.write("continuation without a timestamp\n")
+    return path
+
+
+def test_missing_index(logfile):
+    with pytest.raises(FileNotFoundError):
+        LogIndex(logfile)
+
+
+def test_query_ranges(logfile, capsys):
+    index = LogIndex.rebuild(logfile, every_lines=64)
+    assert os.path.exists(index_path(logfile))
+    assert 10 <= len(index) <= 20
+    lines = [line for _, line in index.query(T0 + 10.0, T0 + 11.0)]
+    assert lines == [f"Data = {i}" for i in range(100, 111)]
+    assert [t for t, _ in index.query(T0 + 99.85)] == [T0 + 99.9]
+    assert len(list(index.query())) == 1000
+    assert list(index.query(T0 + 200)) == []
+    assert [line for _, line in index.query(None, T0)] == ["Data = 0"]
+
+
+def test_query_a_log_written_by_logsink(tmp_path):
+    path = str(tmp_path / 'sink.log')
+    sink = LogSink(path, index_every_lines=10)
+    for i in range(100):
+        sink.write(f"line {i}")
+    sink.close()
+    index = LogIndex(path)
+    assert len(index) >= 1
+    assert [line for _, line in index.query()] == [f"line {i}" for i in range(100)]
+
+
+@pytest.mark.parametrize('raw, expected', [
+    (b'1700000000.123456\tData = 1', (1700000000.123456, b'Data = 1')),
+    (b'12\tvalue', (None, b'12\tvalue')),
+    (b'1.5\tvalue', (None, b'1.5\tvalue')),
+    (b'nan\tvalue', (None, b'nan\tvalue')),
+    (b'-1700000000.123456\tvalue', (None, b'-1700000000.123456\tvalue')),
+    (b'1700000000.123456 value', (None, b'1700000000.123456 value')),
+])
+def test_split_timestamp_requires_the_logsink_format(raw, expected):
+    assert split_timestamp(raw) == expected
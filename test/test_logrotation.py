@@ -0,0 +1,53 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.LogIndex import index_path
+from src.SerialReadWrite.LogRotation import SegmentManifest, iter_log, query_segments
+from src.SerialReadWrite.LogSink import LogSink
+from src.SerialReadWrite.program import Program
+
+import pytest
+
+LINES = [f"Time since start: {10 * i}  ... Data = {i}" for i in range(300)]
+
+
+def write_rotated(path: str, **kwargs) -> list:
+    # Returns the timestamps LogSink gave the lines, read back from the log itself
+    sink = LogSink(path, flush_interval_ms=None, index_every_lines=16, rotate_bytes=2048, **kwargs)
+    for line in LINES:
+        sink.write(line)
+    sink.close()
+    return [float(raw.split(b'\t', 1)[0]) for raw in iter_log(path)]
+
+
+@pytest.mark.parametrize('compress', ['gzip', 'lzma', None])
+def test_rotate_compress_and_iterate(tmp_path, compress):
+    path = str(tmp_path / 'serial.log')
+    write_rotated(path, compress=compress)
+    segments = SegmentManifest(path).segments
+    assert len(segments) > 3
+    assert sum(entry["lines"] for entry in segments) < len(LINES)
+    for entry in segments:
+        segment = os.path.join(str(tmp_path), entry["file"])
+        assert entry["compressed"] == compress and os.path.exists(segment)
+        assert os.path.exists(index_path(segment)) == (compress is None)
+    assert [raw.split(b'\t', 1)[1].rstrip(b'\n').decode() for raw in iter_log(path)] == LINES
+
+
+@pytest.mark.parametrize('compress', ['gzip', None])
+def test_query_segments_by_time(tmp_path, compress):
+    path = str(tmp_path / 'serial.log')
+    timestamps = write_rotated(path, compress=compress)
+    in_segments = sum(entry["lines"] for entry in SegmentManifest(path).segments)
+    assert [line for _, line in query_segments(path)] == LINES[:in_segments]
+    t_from, t_to = timestamps[20], timestamps[60]
+    expected = [line for t, line in zip(timestamps[:in_segments], LINES) if t_from <= t <= t_to]
+    assert [line for _, line in query_segments(path, t_from, t_to)] == expected
+
+
+def test_read_log_covers_rotated_segments(tmp_path, capsys):
+    path = str(tmp_path / 'serial.log')
+    write_rotated(path)
+    Program.read_log(path)
+    assert [line.split(' ', 1)[1] for line in capsys.readouterr().out.splitlines() if ' ' in line
+            and not line.startswith('Rebuilt index')] == LINES
@@ -0,0 +1,62 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.LogSink import LogSink
+from src.SerialReadWrite.SerialReader import SerialReader
+
+from conftest import wait_for
+
+
+def on_disk(path: str) -> str:
+    with open(path) as file:
+        return file.read()
+
+
+def test_lines_are_buffered_until_flush_lines(tmp_path):
+    path = str(tmp_path / 'serial.log')
+    with LogSink(path, flush_lines=10, flush_interval_ms=None) as sink:
+        for i in range(9):
+            sink.write(f"line {i}")
+        assert on_disk(path) == ''
+        sink.write("line 9")
+        assert on_disk(path) == ''.join(f"line {i}\n" for i in range(10))
+        sink.write_lines(["a", "b"])
+        assert sink.lines_written == 12
+    assert on_disk(path).endswith("line 9\na\nb\n")
+    assert sink.closed
+
+
+def test_pending_lines_are_flushed_by_the_interval(tmp_path):
+    path = str(tmp_path / 'serial.log')
+    sink = LogSink(path, flush_lines=None, flush_interval_ms=20)
+    try:
+        sink.write("late line")
+        assert wait_for(lambda: on_disk(path) == "late line\n", timeout=2)
+    finally:
+        sink.close()
+
+
+def test_flush_checkpoint_and_append(tmp_path):
+    path = str(tmp_path / 'serial.log')
+    with LogSink(path, flush_lines=None, flush_interval_ms=None, fsync_interval_s=0) as sink:
+        sink.write("one")
+        sink.flush()
+        assert on_disk(path) == "one\n"
+        sink.write("two")
+        sink.checkpoint()
+        assert on_disk(path) == "one\ntwo\n"
+    with LogSink(path) as sink:
+        sink.write("three")
+    assert on_disk(path) == "one\ntwo\nthree\n"
+
+
+def test_write_to_file_keeps_one_sink_per_file(tmp_path):
+    reader = SerialReader('/dev/null', display_to_command=False)
+    path = str(tmp_path / 'out.txt')
+    reader.open_sink(path, flush_lines=None, flush_interval_ms=None)
+    for i in range(3):
+        reader.write_to_file(path, f"line {i}")
+    assert len(reader._sinks) == 1
+    assert on_disk(path) == ''
+    reader.close()
+    assert on_disk(path) == "line 0\nline 1\nline 2\n"
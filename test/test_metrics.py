@@ -0,0 +1,70 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+from src.SerialReadWrite.Metrics import MetricsDumper, ReaderMetrics
+from src.SerialReadWrite.RingBuffer import RingBuffer
+from src.SerialReadWrite.SerialReader import SerialReader
+
+from conftest import wait_for
+
+LINES = [f"Time since start: {10 * i}  ... Data = {i}" for i in range(100)]
+
+
+def test_snapshot_counters_and_rates():
+    metrics = ReaderMetrics()
+    metrics.record_read(100, 4, 100)
+    metrics.record_read(50, 2, 30)
+    for seconds in [1e-6] * 98 + [1e-3, 1e-3]:
+        metrics.record_loop(seconds)
+    first = metrics.snapshot(lines_dropped=3, bytes_dropped=12, buffered=5, buffer_size=10)
+    assert (first["bytes_received"], first["lines_received"], first["peak_in_waiting"]) == (150, 6, 100)
+    assert (first["lines_dropped"], first["bytes_dropped"], first["buffered"], first["buffer_size"]) == (3, 12, 5, 10)
+    assert first["loop_time_p50_s"] == 2e-6 and first["loop_time_p99_s"] == 1024e-6
+    assert sum(first["loop_histogram_us"].values()) == 100
+    metrics.record_read(10, 1, 0)
+    second = metrics.snapshot(since=first)
+    assert second["lines_received"] == 7
+    assert second["lines_per_s"] == 1 / max(second["time"] - first["time"], 1e-9)
+    json.dumps(second)
+
+
+def test_reader_stats_count_lines_and_drops(board):
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False, threaded=True,
+                          buffer_size=10, overflow=RingBuffer.DROP_OLDEST)
+    reader.connect()
+    try:
+        board.send_lines(LINES)
+        assert wait_for(lambda: reader.stats()["lines_received"] == len(LINES))
+        stats = reader.stats()
+        assert stats["bytes_received"] == sum(len(line) + 2 for line in LINES)  # send_lines ends lines with \r\n
+        assert stats["lines_dropped"] == len(LINES) - 10
+        assert stats["bytes_dropped"] == sum(len(line) for line in LINES[:-10])
+        assert (stats["buffered"], stats["buffer_size"]) == (10, 10)
+        assert stats["decode_errors"] == 0
+    finally:
+        reader.close()
+
+
+def test_decode_errors_are_counted(board):
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False)
+    reader.connect()
+    try:
+        board.write(b"ok\n\xff\xfe bad\n")  # two invalid bytes
+        lines = []
+        assert wait_for(lambda: lines.extend(reader.read_serial_bulk()) or len(lines) == 2)
+        assert lines[0] == 'ok' and reader.stats()["decode_errors"] == 2
+    finally:
+        reader.close()
+
+
+def test_metrics_dump_appends_json_lines(tmp_path):
+    path = str(tmp_path / 'stats.jsonl')
+    metrics = ReaderMetrics()
+    dumper = MetricsDumper(lambda since: metrics.snapshot(since=since), path, interval_s=0.05)
+    metrics.record_read(10, 1, 10)
+    assert wait_for(lambda: os.path.exists(path) and len(open(path).readlines()) >= 2)
+    dumper.close()
+    snapshots = [json.loads(line) for line in open(path)]
+    assert snapshots[-1]["lines_received"] == 1
@@ -0,0 +1,116 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import threading
+import time
+
+from src.SerialReadWrite.MonitorRenderer import MonitorRenderer, default_key
+from src.SerialReadWrite.SerialHub import HubLine
+from src.SerialReadWrite.SerialReader import SerialReader
+
+import pytest
+
+from conftest import wait_for
+
+LINES = [f"Time since start: {10 * i}  ... Data = {i}" for i in range(50)]
+
+
+def renderer(**kwargs) -> MonitorRenderer:
+    return MonitorRenderer(out=io.StringIO(), **kwargs)
+
+
+def test_tail_shows_the_newest_lines_and_counts_the_rest():
+    monitor = renderer(max_lines=5)
+    monitor.add(LINES[:20])
+    monitor.flush()
+    assert monitor.out.getvalue() == '\n'.join(['... 15 lines skipped ...'] + LINES[15:20]) + '\n'
+    assert (monitor.lines_in, monitor.lines_shown, monitor.lines_skipped, monitor.renders) == (20, 5, 15, 1)
+    monitor.flush()  # nothing new: no write
+    assert monitor.renders == 1
+
+
+def test_head_shows_the_oldest_lines():
+    monitor = renderer(max_lines=5, view='head')
+    monitor.add(LINES[:20])
+    monitor.flush()
+    assert monitor.out.getvalue() == '\n'.join(LINES[:5] + ['... 15 lines skipped ...']) + '\n'
+
+
+def test_tick_renders_at_most_refresh_hz_times_per_second():
+    monitor = renderer(refresh_hz=5)
+    monitor.add(LINES[:1])
+    assert not monitor.tick()
+    assert 0 < monitor.due <= 0.2
+    time.sleep(monitor.due)
+    assert monitor.tick()
+    assert monitor.out.getvalue() == LINES[0] + '\n'
+
+
+def test_default_key():
+    assert default_key('Temp = 21.5') == 'Temp'
+    assert default_key(LINES[3]) == 'Time since start'
+    assert default_key('no label here') == default_key('another one') == ''
+    assert default_key((7, 1.5)) == '7'
+    assert default_key(HubLine('/dev/ttyA', 0.0, 'x = 1')) == '/dev/ttyA'
+
+
+def test_latest_rows_keep_their_first_seen_order():
+    monitor = renderer(view='latest')
+    monitor.add(['b = 1', 'a = 1', 'b = 2', 'unlabeled', 'also unlabeled'])
+    monitor.flush()
+    monitor.add(['a = 2'])
+    monitor.flush()
+    assert monitor.out.getvalue() == 'b = 2\na = 1\nalso unlabeled\n---\nb = 2\na = 2\nalso unlabeled\n'
+    # 'b = 1' and 'unlabeled' were replaced before they were drawn
+    assert (monitor.lines_in, monitor.lines_shown, monitor.lines_skipped) == (6, 4, 2)
+
+
+def test_latest_keeps_the_most_recently_updated_keys():
+    monitor = renderer(view='latest', max_lines=2)
+    monitor.add(['a = 1', 'b = 1'])
+    monitor.flush()
+    monitor.add(['a = 2', 'c = 1'])  # 'b' is the stalest key and goes
+    monitor.flush()
+    assert monitor.out.getvalue().split('---\n')[-1] == 'a = 2\nc = 1\n'
+    monitor.add([f"k{i} = {i}" for i in range(100)])
+    monitor.flush()
+    assert monitor.out.getvalue().split('---\n')[-1] == 'k98 = 98\nk99 = 99\n'
+    assert monitor.lines_skipped == 98
+    assert monitor.lines_in == monitor.lines_shown + monitor.lines_skipped
+
+
+def test_latest_redraws_in_place_on_a_terminal():
+    class Terminal(io.StringIO):
+        def isatty(self):
+            return True
+
+    monitor = MonitorRenderer(view='latest', out=Terminal())
+    monitor.add(['a = 1', 'b = 1'])
+    monitor.flush()
+    monitor.add(['b = 2'])
+    monitor.flush()
+    assert monitor.out.getvalue() == 'a = 1\nb = 1\n\x1b[2F\x1b[Ja = 1\nb = 2\n'
+
+
+def test_unsupported_view():
+    with pytest.raises(ValueError):
+        MonitorRenderer(view='sideways')
+
+
+def test_reader_display_goes_through_the_monitor(board):
+    monitor = renderer(refresh_hz=50, max_lines=1000)
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False, threaded=True, monitor=monitor)
+    reader.connect()
+    display = threading.Thread(target=reader.display_to_command, daemon=True)
+    try:
+        reader._displayToCmd = True
+        display.start()
+        board.send_lines(LINES)
+        assert wait_for(lambda: monitor.lines_shown == len(LINES))
+    finally:
+        reader.close()
+        display.join(timeout=5)
+    assert not display.is_alive()
+    assert monitor.out.getvalue() == '\n'.join(LINES) + '\n'
+    assert monitor.renders < len(LINES)
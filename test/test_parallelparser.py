@@ -0,0 +1,92 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.LineParser import LineParser
+from src.SerialReadWrite.ParallelParser import ParallelParser, init_worker, nmea_checksum_ok, parse_chunk
+from src.SerialReadWrite.SerialHub import SerialHub
+
+import pytest
+
+from conftest import PtyBoard
+
+TEMPLATE = 'Time since start: {time:int}  ... Data = {data:int}'
+
+
+def nmea(payload: str) -> str:
+    value = 0
+    for char in payload:
+        value ^= ord(char)
+    return f"${payload}*{value:02X}"
+
+
+def chunk(lines) -> bytes:
+    return ''.join(f"{line}\r\n" for line in lines).encode()
+
+
+def test_nmea_checksum():
+    assert nmea_checksum_ok(nmea('GPGLL,4916.45,N')) == (True, 'GPGLL,4916.45,N')
+    assert nmea_checksum_ok('$GPGLL,4916.45,N*00')[0] is False
+    assert nmea_checksum_ok('no checksum')[0] is False
+    assert nmea_checksum_ok('$A*zz')[0] is False
+
+
+def test_parse_chunk_inline():
+    init_worker(LineParser('{name:str} = {value:int}'), 'nmea')
+    try:
+        data = chunk([nmea('a = 1'), nmea('b = x'), '$c = 3*00', '', nmea('d = 4')])
+        assert parse_chunk(data) == ([('a', 1), ('d', 4)], 1, 1)
+    finally:
+        init_worker(None, None)
+    assert parse_chunk(b'one\r\ntwo\n') == (['one', 'two'], 0, 0)
+
+
+def test_results_keep_each_ports_order():
+    with ParallelParser(LineParser(TEMPLATE), workers=2, max_pending=4) as parallel:
+        for n in range(20):
+            for port in ('A', 'B'):
+                lines = [f"Time since start: {n}  ... Data = {i}" for i in range(n * 10, n * 10 + 10)] + ['noise']
+                parallel.submit(port, chunk(lines), timestamp=float(n))
+        results = []
+        while parallel.pending:
+            results += parallel.results(timeout=5)
+    for port in ('A', 'B'):
+        mine = [(timestamp, records) for p, timestamp, records in results if p == port]
+        assert [timestamp for timestamp, _ in mine] == [float(n) for n in range(20)]
+        assert [data for _, records in mine for _, data in records] == list(range(200))
+    assert (parallel.chunks, parallel.malformed, parallel.failed) == (40, 40, 0)
+
+
+def test_a_failing_chunk_is_counted_and_skipped():
+    # int() as the parser raises on a line that is not a number
+    with ParallelParser(int, workers=1) as parallel:
+        parallel.submit('A', b'1\n2\n')
+        parallel.submit('A', b'3\nfour\n')
+        parallel.submit('A', b'5\n')
+        results = []
+        while parallel.pending:
+            results += parallel.results(timeout=5)
+    assert [records for _, _, records in results] == [[1, 2], [5]]
+    assert parallel.failed == 1
+
+
+def test_hub_parses_in_the_pool():
+    pytest.importorskip('pty')
+    boards = [PtyBoard(), PtyBoard()]
+    parallel = ParallelParser(LineParser(TEMPLATE), workers=2)
+    hub = SerialHub([board.port for board in boards], parallel=parallel, chunk_bytes=256)
+    hub.connect()
+    try:
+        for i, board in enumerate(boards):
+            board.send_lines(f"Time since start: {i}  ... Data = {n}" for n in range(100))
+        items = hub.get_batch(200, timeout=10)
+        while len(items) < 200:
+            more = hub.get_batch(200 - len(items), timeout=5)
+            assert more
+            items += more
+    finally:
+        hub.close()
+        parallel.close()
+        for board in boards:
+            board.close()
+    for i, board in enumerate(boards):
+        assert [item.line for item in items if item.port == board.port] == [(i, n) for n in range(100)]
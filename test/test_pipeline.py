@@ -0,0 +1,87 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+
+from src.SerialReadWrite.LineParser import LineParser
+from src.SerialReadWrite.LogSink import LogSink
+from src.SerialReadWrite.Pipeline import CallbackSink, Pipeline, Sink
+from src.SerialReadWrite.SerialReader import SerialReader
+
+import pytest
+
+LINES = [f"Time since start: {10 * i}  ... Data = {i}" for i in range(100)]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # time.monotonic() advances 0.1 s per call, so time-based windows are deterministic
+    now = [0.0]
+
+    def monotonic():
+        now[0] += 0.1
+        return now[0]
+    monkeypatch.setattr(time, 'monotonic', monotonic)
+
+
+def test_stages_are_lazy():
+    pulled = []
+
+    def source():
+        for i in range(1000000):
+            pulled.append(i)
+            yield i
+    assert Pipeline(source()).filter(lambda i: i % 2).map(lambda i: i * 10).take(3) == [10, 30, 50]
+    assert pulled == list(range(6))
+
+
+def test_filter_map_decimate():
+    parser = LineParser('Time since start: {time:int}  ... Data = {data:int}')
+    records = Pipeline(LINES + ['noise']).map(parser.parse, skip_none=True).decimate(10)
+    assert list(records) == [(100 * i, 10 * i) for i in range(10)]
+    assert list(Pipeline(range(5)).map(lambda i: None)) == [None] * 5
+    with pytest.raises(ValueError):
+        list(Pipeline(range(5)).decimate(0))
+
+
+def test_batch_by_count_and_time(clock):
+    assert list(Pipeline(range(7)).batch(3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    # One clock tick (0.1 s) per item: a 0.25 s window holds three items
+    assert list(Pipeline(range(7)).batch(t=0.25)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(Pipeline(range(7)).tumbling(2, t=0.25)) == [[0, 1], [2, 3], [4, 5], [6]]
+    with pytest.raises(ValueError):
+        list(Pipeline(range(3)).batch())
+
+
+def test_sliding_windows(clock):
+    assert list(Pipeline(range(5)).sliding(3)) == [(0, 1, 2), (1, 2, 3), (2, 3, 4)]
+    assert list(Pipeline(range(7)).sliding(3, step=2)) == [(0, 1, 2), (2, 3, 4), (4, 5, 6)]
+    assert list(Pipeline(range(4)).sliding(t=0.15)) == [(0,), (0, 1), (1, 2), (2, 3)]
+    with pytest.raises(ValueError):
+        list(Pipeline(range(3)).sliding())
+
+
+def test_sinks_and_tee():
+    seen, teed = [], []
+    count = Pipeline(range(10)).tee(CallbackSink(teed.append)).filter(lambda i: i > 6).to(CallbackSink(seen.append))
+    assert (count, seen, teed) == (3, [7, 8, 9], list(range(10)))
+    with pytest.raises(TypeError):
+        Sink()  # write() must be implemented
+
+
+def test_logsink_writes_batches_and_records(tmp_path):
+    path = str(tmp_path / 'out.log')
+    Pipeline(range(5)).batch(2).to(LogSink(path, flush_interval_ms=None))
+    Pipeline([(1, 2.5), b'raw']).to(LogSink(path, flush_interval_ms=None))
+    with open(path) as file:
+        assert file.read().splitlines() == ['0', '1', '2', '3', '4', '(1, 2.5)', 'raw']
+
+
+def test_reader_pipeline_over_a_port(board):
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False, threaded=True)
+    reader.connect()
+    try:
+        board.send_lines(LINES)
+        assert reader.pipeline().decimate(10).batch(5).take(2) == [LINES[0:50:10], LINES[50:100:10]]
+    finally:
+        reader.close()
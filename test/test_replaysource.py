@@ -0,0 +1,79 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+
+from src.SerialReadWrite.Capture import CaptureWriter
+from src.SerialReadWrite.LineParser import LineParser
+from src.SerialReadWrite.ReplaySource import ReplaySource, iter_recording
+
+import pytest
+
+from conftest import wait_for
+
+T0 = 1700000000.0
+LINES = [f"Time since start: {10 * i}  ... Data = {i}" for i in range(50)]
+
+
+@pytest.fixture
+def text_log(tmp_path):
+    path = str(tmp_path / 'serial_output.txt')
+    with open(path, 'w') as file:
+        file.write('\n'.join(LINES) + '\n\n')
+    return path
+
+
+@pytest.fixture
+def timed_log(tmp_path):
+    # Lines 10 ms apart, as LogSink(timestamps=True) writes them
+    path = str(tmp_path / 'serial.log')
+    with open(path, 'w') as file:
+        for i, line in enumerate(LINES):
+            file.write(f"{T0 + i * 0.01:.6f}\t{line}\n")
+    return path
+
+
+def test_iter_recording_formats(text_log, timed_log, tmp_path):
+    assert list(iter_recording(text_log)) == [(None, line.encode()) for line in LINES]
+    assert list(iter_recording(timed_log)) == [(T0 + i * 0.01, line.encode()) for i, line in enumerate(LINES)]
+    capture = str(tmp_path / 'run.cap')
+    with CaptureWriter(capture) as writer:
+        writer.write_lines(LINES, timestamp=T0)
+    assert list(iter_recording(capture)) == [(T0, line.encode()) for line in LINES]
+    with CaptureWriter(capture, parser=LineParser('Data = {data:int}'), raw_lines=False):
+        pass
+    with pytest.raises(Exception, match='without raw lines'):
+        list(iter_recording(capture))
+
+
+def test_bulk_reads_until_the_recording_ends(text_log):
+    source = ReplaySource(text_log, speed=None, timeout=0.1)
+    source.connect()
+    received = []
+    while source.serial_connection.is_open:
+        received += source.read_serial_bulk()
+    assert received == LINES and source.lines_replayed == len(LINES)
+
+
+def test_replay_keeps_the_recorded_timing(timed_log):
+    source = ReplaySource(timed_log, speed=2.0, timeout=0.1, threaded=True)
+    started = time.monotonic()
+    source.connect()
+    try:
+        assert list(source) == LINES  # iteration ends with the recording
+    finally:
+        source.close()
+    # 49 intervals of 10 ms at 2x speed
+    assert 0.2 <= time.monotonic() - started < 2.0
+
+
+def test_plain_text_replays_at_rate_hz_and_loops(text_log):
+    source = ReplaySource(text_log, rate_hz=1000, loop=True, timeout=0.1, threaded=True,
+                          parser=LineParser('Time since start: {time:int}  ... Data = {data:int}'))
+    source.connect()
+    try:
+        records = []
+        assert wait_for(lambda: records.extend(source.get_batch(120 - len(records), timeout=0.1)) or len(records) == 120)
+    finally:
+        source.close()
+    assert [data for _, data in records] == [i % 50 for i in range(120)]
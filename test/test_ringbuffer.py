@@ -0,0 +1,70 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.RingBuffer import RingBuffer
+import threading
+import time
+
+import pytest
+
+
+def test_drop_oldest_keeps_the_newest_items():
+    buffer = RingBuffer(3, RingBuffer.DROP_OLDEST)
+    for line in ['a', 'bb', 'ccc', 'dddd', 'eeeee']:
+        assert buffer.put(line)
+    assert buffer.get_batch(10, timeout=0) == ['ccc', 'dddd', 'eeeee']
+    assert buffer.dropped == 2
+
+
+def test_drop_newest_rejects_items_when_full():
+    buffer = RingBuffer(2, RingBuffer.DROP_NEWEST)
+    assert [buffer.put(x) for x in 'abcd'] == [True, True, False, False]
+    assert buffer.get_batch(10, timeout=0) == ['a', 'b']
+    assert buffer.dropped == 2
+
+
+def test_block_waits_for_room():
+    buffer = RingBuffer(1, RingBuffer.BLOCK)
+    buffer.put('a')
+    assert not buffer.put('b', timeout=0.05)  # nobody consumes: the put times out and counts as dropped
+    assert buffer.dropped == 1
+    threading.Timer(0.05, buffer.get).start()
+    assert buffer.put('c', timeout=2)
+    assert buffer.get(timeout=0) == 'c'
+
+
+def test_close_wakes_a_blocked_producer():
+    buffer = RingBuffer(1, RingBuffer.BLOCK)
+    buffer.put('a')
+    result = []
+    producer = threading.Thread(target=lambda: result.append(buffer.put('b')))
+    producer.start()
+    time.sleep(0.05)
+    buffer.close()
+    producer.join(2)
+    assert not producer.is_alive()
+    assert result == [False]
+
+
+def test_iteration_drains_then_stops_after_close():
+    buffer = RingBuffer(8)
+    for x in range(5):
+        buffer.put(x + 1)
+    buffer.close()
+    assert list(buffer) == [1, 2, 3, 4, 5]
+    assert buffer.get(timeout=0) is None
+
+
+def test_get_batch_returns_what_arrived_by_the_timeout():
+    buffer = RingBuffer(8)
+    buffer.put('a')
+    t0 = time.monotonic()
+    assert buffer.get_batch(4, timeout=0.05) == ['a']
+    assert time.monotonic() - t0 >= 0.04
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+    with pytest.raises(ValueError):
+        RingBuffer(4, 'drop_everything')
@@ -0,0 +1,96 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.LineParser import LineParser
+from src.SerialReadWrite.RollingStats import ChannelStats, RunningStats, WindowStats, extract_channels
+from src.SerialReadWrite.SerialReader import SerialReader
+from src.SerialReadWrite.program import Program
+import argparse
+import math
+import random
+import statistics
+
+import pytest
+
+random.seed(7)
+VALUES = [random.gauss(20, 3) for _ in range(500)]
+
+
+def test_running_stats_match_statistics():
+    stats = RunningStats()
+    for i, x in enumerate(VALUES):
+        stats.update(x, now=i * 0.01)
+    assert stats.count == len(VALUES)
+    assert stats.mean == pytest.approx(statistics.fmean(VALUES))
+    assert stats.variance == pytest.approx(statistics.variance(VALUES))
+    assert (stats.min, stats.max) == (min(VALUES), max(VALUES))
+
+
+def test_running_stats_batches_merge_exactly():
+    single, batched = RunningStats(), RunningStats()
+    for x in VALUES:
+        single.update(x, now=0.0)
+    for start in range(0, len(VALUES), 64):
+        batched.update_batch(VALUES[start:start + 64], now=0.0)
+    assert batched.count == single.count
+    assert batched.mean == pytest.approx(single.mean)
+    assert batched.variance == pytest.approx(single.variance)
+    assert (batched.min, batched.max) == (single.min, single.max)
+
+
+def test_window_stats_over_the_last_n_values():
+    window = WindowStats(size=50)
+    for i, x in enumerate(VALUES):
+        window.update(x, now=float(i))
+        recent = VALUES[max(0, i - 49):i + 1]
+        assert len(window) == len(recent)
+        assert (window.min, window.max) == (min(recent), max(recent))
+    assert window.mean == pytest.approx(statistics.fmean(VALUES[-50:]))
+    assert window.variance == pytest.approx(statistics.variance(VALUES[-50:]))
+
+
+def test_window_stats_over_time():
+    window = WindowStats(t=1.0)
+    for i in range(100):
+        window.update(float(i), now=i * 0.1)
+    assert len(window) == 11  # 8.9 s .. 9.9 s
+    assert window.min == 89.0
+    window.expire(now=100.0)
+    assert len(window) == 0
+    assert math.isnan(window.min)
+    with pytest.raises(ValueError):
+        WindowStats()
+
+
+def test_channel_stats_from_lines_and_columns():
+    assert extract_channels("Temp = 21.5, Hum: 40 Data=7") == {'Temp': 21.5, 'Hum': 40.0, 'Data': 7.0}
+    stats = ChannelStats(window=10, channels=['Data'])
+    for i in range(20):
+        stats.update_line(f"Time since start: {i * 10}  ... Data = {i}", now=float(i))
+    stats.update_columns({'Data': [20.0, 21.0], 'Other': [1.0]}, now=21.0)
+    summary = stats.summary()
+    assert list(summary) == ['Data']
+    assert summary['Data']['total']['count'] == 22
+    assert summary['Data']['window']['count'] == 10
+    assert summary['Data']['window']['max'] == 21.0
+
+
+def test_reader_folds_lines_and_records_into_aggregates():
+    reader = SerialReader('/dev/null', display_to_command=False, aggregates=ChannelStats(window=10))
+    reader.update_aggregates([f"Data = {i}  Temp = {i / 2}" for i in range(20)])
+    summary = reader.aggregates.summary()
+    assert summary['Data']['total']['count'] == 20 and summary['Data']['window']['count'] == 10
+    assert summary['Temp']['window']['mean'] == pytest.approx(7.25)
+    reader = SerialReader('/dev/null', display_to_command=False, aggregates=ChannelStats(window=10),
+                          parser=LineParser('{name:str} = {value:float} at {time:int}'))
+    reader.update_aggregates(['Data = 1.5 at 10', 'noise', 'Data = 2.5 at 20'])
+    assert sorted(reader.aggregates.summary()) == ['time', 'value']
+    assert reader.aggregates.summary()['value']['total']['mean'] == 2.0
+
+
+def test_cli_rejects_aggregate_over_several_ports(monkeypatch):
+    monkeypatch.setattr(Program, '_parser', argparse.ArgumentParser())
+    Program.create_parser()
+    args = Program._parser.parse_args(['read', '-p', '/dev/ttyACM0', '-p', '/dev/ttyACM1', '--aggregate'])
+    with pytest.raises(Exception, match='--aggregate reads a single port'):
+        Program.handle_args(args)
@@ -0,0 +1,77 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.SerialReadWrite.MonitorRenderer import MonitorRenderer
+from src.SerialReadWrite.RingBuffer import RingBuffer
+from src.SerialReadWrite.SerialHub import SerialHub
+import io
+import threading
+
+import pytest
+
+from conftest import PtyBoard, wait_for
+
+pytest.importorskip('pty')  # POSIX only
+
+
+@pytest.fixture
+def boards():
+    pair = [PtyBoard(), PtyBoard()]
+    yield pair
+    for board in pair:
+        board.close()
+
+
+def test_lines_of_every_port_are_merged_in_order(boards):
+    hub = SerialHub([board.port for board in boards])
+    hub.connect()
+    try:
+        for i, board in enumerate(boards):
+            board.send_lines(f"board {i} line {n}" for n in range(100))
+        items = hub.get_batch(200, timeout=5)
+    finally:
+        hub.close()
+    assert len(items) == 200
+    for i, board in enumerate(boards):
+        assert [item.line for item in items if item.port == board.port] == [f"board {i} line {n}" for n in range(100)]
+    assert all(item.timestamp > 0 for item in items)
+    assert list(hub) == []  # closed and drained
+
+
+def test_raw_lines(boards):
+    hub = SerialHub([boards[0].port], decode=False)
+    hub.connect()
+    try:
+        boards[0].write(b"abc\r\ndef\n")
+        assert [item.line for item in hub.get_batch(2, timeout=5)] == [b"abc", b"def"]
+    finally:
+        hub.close()
+
+
+def test_close_does_not_wait_for_a_blocked_buffer(boards):
+    hub = SerialHub([boards[0].port], buffer_size=4, overflow=RingBuffer.BLOCK)
+    hub.connect()
+    boards[0].send_lines(f"line {n}" for n in range(50))
+    assert wait_for(lambda: len(hub._buffer) == 4)  # nobody consumes: the selector thread waits for room
+    closer = threading.Thread(target=hub.close, daemon=True)
+    closer.start()
+    closer.join(5)
+    assert not closer.is_alive()
+
+
+def test_monitor_shows_the_latest_line_per_port(boards):
+    monitor = MonitorRenderer(refresh_hz=50, view='latest', out=io.StringIO())
+    hub = SerialHub([board.port for board in boards], monitor=monitor)
+    hub.connect()
+    display = threading.Thread(target=hub.display_to_command, daemon=True)
+    display.start()
+    try:
+        for i, board in enumerate(boards):
+            board.send_lines(f"board {i} line {n}" for n in range(100))
+        assert wait_for(lambda: monitor.lines_in == 200)
+    finally:
+        hub.close()
+        display.join(timeout=5)
+    assert not display.is_alive()
+    rows = monitor.out.getvalue().split('---\n')[-1].splitlines()
+    assert sorted(rows) == [f"[{board.port}] board {i} line 99" for i, board in enumerate(boards)]
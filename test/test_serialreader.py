@@ -0,0 +1,141 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+
+from src.SerialReadWrite.LineParser import LineParser
+from src.SerialReadWrite.RingBuffer import RingBuffer
+from src.SerialReadWrite.SerialReader import SerialReader
+
+import pytest
+
+from conftest import wait_for
+
+LINES = [f"Time since start: {10 * i}  ... Data = {i}" for i in range(100)]
+
+
+def connect(port: str, **kwargs) -> SerialReader:
+    reader = SerialReader(port, timeout=0.1, display_to_command=False, **kwargs)
+    reader.connect()
+    return reader
+
+
+def test_read_serial_returns_one_line(board):
+    reader = connect(board.port)
+    try:
+        assert reader.read_serial() is None
+        board.send_lines(LINES[:2])
+        assert wait_for(lambda: reader.serial_connection.in_waiting > 0)
+        assert reader.read_serial() == LINES[0]
+    finally:
+        reader.close()
+
+
+def test_read_serial_after_close(board):
+    reader = connect(board.port)
+    board.send_lines(LINES[:2])
+    reader.close()
+    assert reader.read_serial() is None
+
+
+def test_threaded_reader_delivers_every_line_in_order(board):
+    reader = connect(board.port, threaded=True)
+    try:
+        board.send_lines(LINES)
+        assert reader.get_batch(len(LINES), timeout=5) == LINES
+        assert reader.get(timeout=0.05) is None
+    finally:
+        reader.close()
+    assert reader.get(timeout=0) is None  # stopped and drained
+    assert list(reader) == []
+
+
+def test_threaded_reader_overflow_keeps_the_newest_lines(board):
+    reader = connect(board.port, threaded=True, buffer_size=10, overflow=RingBuffer.DROP_OLDEST)
+    try:
+        board.send_lines(LINES)
+        assert wait_for(lambda: reader.dropped == len(LINES) - 10)
+        assert reader.get_batch(100, timeout=0) == LINES[-10:]
+    finally:
+        reader.close()
+
+
+def test_read_serial_bulk_completes_partial_lines(board):
+    reader = connect(board.port)
+    try:
+        assert reader.read_serial_bulk() == []
+        board.write(LINES[0] + '\r\n' + LINES[1][:10])
+        assert wait_for(lambda: reader.serial_connection.in_waiting >= len(LINES[0]) + 12)
+        assert reader.read_serial_bulk() == [LINES[0]]
+        board.write(LINES[1][10:] + '\r\n' + LINES[2] + '\n')
+        lines = []
+        assert wait_for(lambda: lines.extend(reader.read_serial_bulk(decode=False)) or len(lines) == 2)
+        assert lines == [LINES[1].encode(), LINES[2].encode()]
+    finally:
+        reader.close()
+    assert reader.read_serial_bulk() == []
+
+
+def test_threaded_reader_delivers_parsed_records(board):
+    reader = connect(board.port, threaded=True, parser=LineParser('Time since start: {time:int}  ... Data = {data:int}'))
+    try:
+        board.send_lines(LINES[:10] + ['garbage'] + LINES[10:20])
+        assert reader.get_batch(20, timeout=5) == [(10 * i, i) for i in range(20)]
+        assert reader.parser.malformed == 1
+    finally:
+        reader.close()
+
+
+def send_later(board, lines, delay=0.3) -> threading.Thread:
+    # connect() blocks until ready, so the board talks from another thread once the port is open
+    sender = threading.Thread(target=lambda: (time.sleep(delay), board.send_lines(lines)), daemon=True)
+    sender.start()
+    return sender
+
+
+def test_ready_line_keeps_the_first_line(board):
+    send_later(board, LINES[:3])
+    reader = connect(board.port, ready='line', ready_timeout=5)
+    try:
+        assert [reader.read_serial() for _ in range(3)] == LINES[:3]
+    finally:
+        reader.close()
+
+
+def test_ready_token_drops_everything_up_to_the_token(board):
+    send_later(board, ['bootloader noise', 'firmware READY v1'] + LINES[:2])
+    reader = connect(board.port, ready='token', ready_token='READY', ready_timeout=5)
+    try:
+        lines = []
+        assert wait_for(lambda: lines.extend(reader.read_serial_bulk()) or len(lines) == 2)
+        assert lines == LINES[:2]
+    finally:
+        reader.close()
+
+
+def test_ready_line_falls_back_when_the_board_is_silent(board, capsys):
+    started = time.monotonic()
+    reader = connect(board.port, ready='line', ready_timeout=0.3)
+    try:
+        assert time.monotonic() - started >= 0.3
+        assert 'Warning: No complete line' in capsys.readouterr().out
+        board.send_lines(LINES[:1])
+        assert wait_for(lambda: reader.serial_connection.in_waiting > 0)
+        assert reader.read_serial() == LINES[0]
+    finally:
+        reader.close()
+
+
+def test_ready_token_times_out(board):
+    with pytest.raises(Exception, match='no ready token'):
+        connect(board.port, ready='token', ready_token='READY', ready_timeout=0.3)
+
+
+def test_threaded_reader_delivers_the_ready_line(board):
+    send_later(board, LINES[:1])
+    reader = connect(board.port, ready='line', ready_timeout=5, threaded=True)
+    try:
+        assert reader.get(timeout=5) == LINES[0]
+    finally:
+        reader.close()
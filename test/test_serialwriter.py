@@ -0,0 +1,118 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+
+from src.SerialReadWrite.SerialReader import SerialReader
+from src.SerialReadWrite.SerialWriter import CommandTimeout, SerialWriter
+
+import pytest
+
+
+class Responder:
+
+
+    def __init__(self, board, batch: int = 1, silent: tuple = ()):
+        """
+        Firmware stand-in for examples/commands: answers each "#<seq> <command>" with "#<seq> OK <command>".
+        Replies are held until `batch` commands have arrived and then sent newest first; commands in `silent` get none.
+        """
+        self.board = board
+        self.batch = batch
+        self.silent = silent
+        self.received = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        buf, held = b'', []
+        while not self._stop.is_set():
+            try:
+                buf += self.board.read(timeout=0.05)
+            except OSError:
+                return
+            *lines, buf = buf.split(b'\n')
+            for line in lines:
+                tag, _, command = line.decode().partition(' ')
+                self.received.append(command)
+                if command not in self.silent:
+                    held.append(f"{tag} OK {command}")
+            if len(held) >= self.batch:
+                self.board.send_lines(['untagged noise'] + held[::-1])
+                held = []
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+@pytest.fixture
+def reader(board):
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False)
+    reader.connect()
+    yield reader
+    reader.close()
+
+
+def test_request_round_trip(board, reader):
+    responder = Responder(board)
+    try:
+        with SerialWriter(reader) as writer:
+            assert writer.request('led on') == 'OK led on'
+            pending = writer.send('millis')
+            assert pending.result(timeout=5) == 'OK millis'
+            assert pending.round_trip >= 0
+        # Untagged lines still reach the reader
+        assert reader.get_batch(2, timeout=5) == ['untagged noise', 'untagged noise']
+    finally:
+        responder.stop()
+
+
+def test_pipelined_responses_are_matched_out_of_order(board, reader):
+    responder = Responder(board, batch=4)
+    try:
+        with SerialWriter(reader, max_in_flight=4, timeout=5) as writer:
+            commands = [f"cmd {i}" for i in range(8)]
+            results = [pending.result(timeout=5) for pending in writer.send_many(commands)]
+            assert results == [f"OK {command}" for command in commands]
+            assert writer.late == 0 and writer.in_flight == 0
+    finally:
+        responder.stop()
+    assert responder.received == commands
+
+
+def test_unanswered_command_times_out(board, reader):
+    responder = Responder(board, silent=('lost',))
+    try:
+        with SerialWriter(reader, timeout=0.2) as writer:
+            lost = writer.send('lost')
+            with pytest.raises(CommandTimeout):
+                lost.result(timeout=5)
+            assert writer.timeouts == 1
+            assert writer.request('after') == 'OK after'  # the writer keeps going
+    finally:
+        responder.stop()
+
+
+def test_send_after_the_reader_closes_fails_instead_of_hanging(board, reader):
+    writer = SerialWriter(reader, timeout=float('inf'))
+    try:
+        reader.close()
+        pending = writer.send('led on')
+        with pytest.raises(Exception, match='not connected'):
+            pending.result(timeout=5)
+        with pytest.raises(Exception, match='closed'):
+            writer.send('led off')
+    finally:
+        writer.close()
+
+
+def test_close_fails_unanswered_commands(board, reader):
+    writer = SerialWriter(reader, timeout=float('inf'))
+    pending = writer.send('nobody answers')
+    writer.close()
+    with pytest.raises(Exception, match='closed before'):
+        pending.result(timeout=5)
+    with pytest.raises(Exception, match='closed'):
+        writer.send('again')
@@ -0,0 +1,79 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import socket
+import threading
+
+from src.SerialReadWrite.RingBuffer import RingBuffer
+from src.SerialReadWrite.SerialHub import HubLine
+from src.SerialReadWrite.SerialReader import SerialReader
+from src.SerialReadWrite.StreamServer import StreamServer, parse_address, subscribe
+
+from conftest import wait_for
+
+LINES = [f"Time since start: {10 * i}  ... Data = {i}" for i in range(100)]
+
+
+def read_lines(stream, n: int) -> list:
+    return [next(stream) for _ in range(n)]
+
+
+def test_parse_address():
+    assert parse_address('localhost:5000') == (socket.AF_INET, ('localhost', 5000))
+    assert parse_address(':5000') == (socket.AF_INET, ('127.0.0.1', 5000))
+    assert parse_address(('0.0.0.0', 1)) == (socket.AF_INET, ('0.0.0.0', 1))
+    assert parse_address('/tmp/serial.sock') == (socket.AF_UNIX, '/tmp/serial.sock')
+
+
+def test_every_subscriber_gets_every_line(tmp_path):
+    source = RingBuffer(1000)
+    with StreamServer(source, str(tmp_path / 'serial.sock')) as server:
+        results = [None] * 3
+
+        def consume(i):
+            # subscribe() connects on the first next(), so each subscriber connects in its own thread
+            results[i] = read_lines(subscribe(server.address), len(LINES) + 1)
+        consumers = [threading.Thread(target=consume, args=(i,)) for i in range(3)]
+        for consumer in consumers:
+            consumer.start()
+        assert wait_for(lambda: server.clients == 3)
+        for line in LINES:
+            source.put(line)
+        source.put(HubLine('/dev/ttyACM0', 1.5, b'raw'))
+        for consumer in consumers:
+            consumer.join(5)
+        assert results == [LINES + ['/dev/ttyACM0\traw']] * 3
+        assert server.lines_sent == len(LINES) + 1
+
+
+def test_slow_subscriber_is_disconnected():
+    source = RingBuffer(100000)
+    with StreamServer(source, ('127.0.0.1', 0), max_queue_bytes=4096) as server:
+        slow = socket.create_connection(server.address)  # never reads
+        slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        assert wait_for(lambda: server.clients == 1)
+        for i in range(20000):
+            source.put(f"line {i} " + '.' * 100)
+        assert wait_for(lambda: server.clients_dropped == 1 and server.clients == 0)
+        slow.close()
+
+
+def test_server_stops_when_the_reader_closes(board):
+    reader = SerialReader(board.port, timeout=0.1, display_to_command=False, threaded=True)
+    reader.connect()
+    server = StreamServer(reader, 'serial.sock')
+    serving = threading.Thread(target=server.serve_forever)
+    serving.start()
+    try:
+        assert wait_for(lambda: os.path.exists('serial.sock'))
+        received = []
+        consumer = threading.Thread(target=lambda: received.extend(read_lines(subscribe('serial.sock'), 10)))
+        consumer.start()
+        assert wait_for(lambda: server.clients == 1)
+        board.send_lines(LINES[:10])
+        consumer.join(5)
+        assert received == LINES[:10]
+    finally:
+        reader.close()
+    serving.join(5)
+    assert not serving.is_alive() and reader.closed
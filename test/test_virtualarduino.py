@@ -0,0 +1,49 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import re
+
+from src.SerialReadWrite.SerialReader import SerialReader
+
+import pytest
+
+pytest.importorskip('pty')
+
+from src.SerialReadWrite.VirtualArduino import VirtualArduino
+
+SERIALTEST = re.compile(r'Time since start: (\d+)  \.\.\. Data = (\d+)')
+
+
+@pytest.mark.parametrize('use_process', [False, True])
+def test_emits_serialtest_lines_in_order(tmp_path, monkeypatch, use_process):
+    monkeypatch.chdir(tmp_path)
+    with VirtualArduino(rate_hz=200, burst=5, use_process=use_process) as board:
+        reader = SerialReader(board.port, timeout=0.1, display_to_command=False, threaded=True)
+        reader.connect()
+        try:
+            lines = reader.get_batch(50, timeout=5)
+        finally:
+            reader.close()
+    # Lines sent before connect() are flushed when the port opens; from then on none are lost
+    matches = [SERIALTEST.fullmatch(line) for line in lines[1:]]
+    assert len(matches) == 49 and all(matches)
+    data = [int(m.group(2)) for m in matches]
+    assert data == list(range(data[0], data[0] + 49))
+    times = [int(m.group(1)) for m in matches]
+    assert times == sorted(times)
+
+
+def test_pads_lines_and_stops_after_count(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    board = VirtualArduino(pattern='{data}', rate_hz=20, line_length=16, count=40)
+    board.start()
+    try:
+        reader = SerialReader(board.port, timeout=0.1, display_to_command=False, threaded=True)
+        reader.connect()
+        board.wait(timeout=5)
+        lines = reader.get_batch(40, timeout=1)
+        reader.close()
+    finally:
+        board.stop()
+    assert len(lines) > 1 and all(len(line) == 16 for line in lines[1:])
+    assert lines[-1] == '39' + '.' * 14